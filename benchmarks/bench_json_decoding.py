@@ -0,0 +1,110 @@
+"""Benchmark JSON decoding backends on large poem payloads.
+
+Compares ``requests.Response.json()`` with the decoders of
+utilities.decoding, untyped and followed by schema validation, and the
+typed decoders that build Poem records with fused schema checks, on a
+synthetic large author response and a synthetic full-corpus dump. Reports
+the best wall time and the memory the decoded result keeps alive. Run from
+the repository root:
+
+    python -m benchmarks.bench_json_decoding --poems 3000 --lines 30
+"""
+import argparse
+import json
+import random
+import tracemalloc
+
+import requests
+
+from benchmarks.bench_schema_validation import best_of, make_author_dump
+from tests.schemas.poem_schema import POEM_SCHEMA, POEMS_ARRAY_SCHEMA
+from utilities.decoding import TypedPoemDecoder, available_decoders
+from utilities.schema_registry import SchemaRegistry
+
+
+def make_corpus_dump(poems, mean_lines, authors=130, seed=0):
+    """Build a synthetic full-corpus response with varied authors and lengths.
+
+    Args:
+        poems (int): Number of poems
+        mean_lines (int): Average lines per poem
+        authors (int, optional): Distinct authors
+        seed (int, optional): Seed for the poem lengths
+
+    Returns:
+        list: Poems shaped like PoetryDB responses
+    """
+    rng = random.Random(seed)
+    dump = []
+    for index in range(poems):
+        count = max(1, int(rng.expovariate(1 / mean_lines)))
+        dump.append({
+            "title": f"Poem {index}: Ode to the Séance of Things",
+            "author": f"Author {index % authors}",
+            "lines": [f"Line {line} of poem {index} — with “quotes” and commas, too" for line in range(count)],
+            "linecount": str(count),
+        })
+    return dump
+
+
+def response_for(data):
+    """Wrap encoded JSON in a requests.Response, as the client would receive it."""
+    response = requests.Response()
+    response._content = data
+    response.status_code = 200
+    return response
+
+
+def retained_bytes(function):
+    """Return the bytes still allocated by ``function``'s result after it returns."""
+    tracemalloc.start()
+    try:
+        result = function()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poems", type=int, default=3000)
+    parser.add_argument("--lines", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    registry = SchemaRegistry()
+
+    def validated(poems):
+        registry.validate(poems, POEMS_ARRAY_SCHEMA)
+        return poems
+
+    payloads = {
+        "author": make_author_dump(args.poems, args.lines),
+        "corpus": make_corpus_dump(args.poems, args.lines),
+    }
+    for label, poems in payloads.items():
+        data = json.dumps(poems, ensure_ascii=False).encode("utf-8")
+        response = response_for(data)
+        functions = {
+            "Response.json()": response.json,
+            "Response.json() + validate": lambda: validated(response.json()),
+        }
+        for name, decoder_class in available_decoders().items():
+            decode = decoder_class().decode
+            functions[name] = lambda decode=decode: decode(data)
+            functions[f"{name} + validate"] = lambda decode=decode: validated(decode(data))
+        for backend in available_decoders():
+            typed = TypedPoemDecoder(POEM_SCHEMA, backend)
+            functions[typed.name] = lambda decode=typed.decode: decode(data)
+
+        print(f"{label}: {len(poems)} poems, {len(data) / 1e6:.1f} MB, best of {args.repeat}")
+        baseline = best_of(args.repeat, response.json)
+        for name, function in functions.items():
+            seconds = best_of(args.repeat, function)
+            print(f"  {name:<28} {seconds * 1e3:>10.2f} ms  {baseline / seconds:>7.2f}x  "
+                  f"{retained_bytes(function) / 1e6:>8.1f} MB retained")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Benchmark process-pool validation of a full-corpus payload.
+
+Validates a synthetic full-corpus dump with the full jsonschema validator
+and linecount checks, serially in this process and through
+utilities.parallel_validation.ValidationPipeline with increasing worker
+counts. Speedups are bounded by the number of cores. Run from the
+repository root:
+
+    python -m benchmarks.bench_parallel_validation --poems 20000 --processes 1 2 4 8
+"""
+import argparse
+import os
+
+from benchmarks.bench_json_decoding import make_corpus_dump
+from benchmarks.bench_schema_validation import best_of
+from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA
+from utilities.parallel_validation import ValidationPipeline
+from utilities.schema_registry import SchemaRegistry
+from utilities.validators import validate_poem_linecount
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poems", type=int, default=20000)
+    parser.add_argument("--lines", type=int, default=30)
+    parser.add_argument("--chunk-size", type=int, default=250)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    parser.add_argument("--fast-path", action="store_true",
+                        help="Use generated fast-path checks instead of the full validator")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    poems = make_corpus_dump(args.poems, args.lines)
+    registry = SchemaRegistry(fast_path=args.fast_path)
+
+    def serial():
+        registry.collect_errors(poems, POEMS_ARRAY_SCHEMA)
+        return [poem for poem in poems if not validate_poem_linecount(poem)]
+
+    baseline = best_of(args.repeat, serial)
+    print(f"{args.poems} poems, {os.cpu_count()} CPUs, best of {args.repeat}")
+    print(f"{'serial':<14} {baseline * 1e3:>10.1f} ms  {1.0:>6.2f}x")
+    for processes in dict.fromkeys(args.processes):
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=processes, chunk_size=args.chunk_size,
+                                check_linecount=True, fast_path=args.fast_path) as pipeline:
+            # Start the workers outside the timing
+            pipeline.validate(poems[:processes * args.chunk_size])
+            seconds = best_of(args.repeat, lambda: pipeline.validate(poems))
+        print(f"{f'{processes} processes':<14} {seconds * 1e3:>10.1f} ms  {baseline / seconds:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
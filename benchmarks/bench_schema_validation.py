@@ -0,0 +1,75 @@
+"""Benchmark schema validation of large poem arrays.
+
+Compares per-call ``jsonschema.validate``, the cached registry validator
+and the registry with generated fast-path checks on a synthetic author
+dump. Run from the repository root:
+
+    python -m benchmarks.bench_schema_validation --poems 5000 --lines 40
+"""
+import argparse
+import time
+
+import jsonschema
+
+from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA
+from utilities.schema_registry import SchemaRegistry
+
+
+def make_author_dump(poems, lines):
+    """Build a synthetic full-author response.
+
+    Args:
+        poems (int): Number of poems
+        lines (int): Lines per poem
+
+    Returns:
+        list: Poems shaped like PoetryDB author responses
+    """
+    return [
+        {
+            "title": f"Sonnet {index}",
+            "author": "William Shakespeare",
+            "lines": [f"Line {line} of sonnet {index}" for line in range(lines)],
+            "linecount": str(lines),
+        }
+        for index in range(poems)
+    ]
+
+
+def best_of(repeat, function):
+    """Return the best wall time of ``repeat`` runs of ``function``."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--poems", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    data = make_author_dump(args.poems, args.lines)
+    cached = SchemaRegistry(fast_path=False)
+    fast = SchemaRegistry()
+
+    results = {
+        "jsonschema.validate": best_of(
+            args.repeat, lambda: jsonschema.validate(data, POEMS_ARRAY_SCHEMA)
+        ),
+        "registry (cached)": best_of(args.repeat, lambda: cached.validate(data, POEMS_ARRAY_SCHEMA)),
+        "registry (fast path)": best_of(args.repeat, lambda: fast.validate(data, POEMS_ARRAY_SCHEMA)),
+    }
+
+    baseline = results["jsonschema.validate"]
+    print(f"{args.poems} poems x {args.lines} lines, best of {args.repeat}")
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds * 1e3:>10.2f} ms  {baseline / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark test harness start-up: imports and collection per worker.
+
+Every pytest-xdist worker is a fresh interpreter that imports the
+conftest and collects the tests it runs, so each measurement here runs in
+a new process: the bare interpreter, importing tests.conftest, and
+``pytest --collect-only`` over the given targets. Also lists the heavy
+libraries the harness import pulled in. With budgets it exits non-zero
+when start-up regresses past them. Run from the repository root:
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --max-import-ms 150 --max-collect-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_schema_validation import best_of
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("requests", "urllib3", "jsonschema", "asyncio", "multiprocessing")
+
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import tests.conftest
+print(json.dumps([time.perf_counter() - started, [name for name in {heavy!r} if name in sys.modules]]))
+"""
+
+
+def run(args):
+    return subprocess.run([sys.executable] + args, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+
+def import_harness(repeat):
+    """Time importing tests.conftest in fresh interpreters.
+
+    Returns:
+        tuple: (best seconds, heavy modules it imported)
+    """
+    probe = _IMPORT_PROBE.format(heavy=HEAVY_MODULES)
+    runs = [json.loads(run(["-c", probe])) for _ in range(repeat)]
+    return min(seconds for seconds, _ in runs), runs[0][1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("targets", nargs="*", default=["tests/unit_tests/test_search_index.py", "tests"],
+                        help="Paths to collect, one measurement each")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-import-ms", type=float, help="Fail when importing the harness takes longer")
+    parser.add_argument("--max-collect-ms", type=float,
+                        help="Fail when collecting any target takes longer, interpreter start excluded")
+    args = parser.parse_args(argv)
+
+    # Warm the schema cache and bytecode so every run measures the steady state
+    run(["-m", "pytest", "--collect-only", "-q"] + args.targets)
+    interpreter = best_of(args.repeat, lambda: run(["-c", "pass"]))
+    harness, heavy = import_harness(args.repeat)
+    print(f"best of {args.repeat} fresh interpreters")
+    print(f"{'interpreter':<48} {interpreter * 1e3:>9.1f} ms")
+    print(f"{'import tests.conftest':<48} {harness * 1e3:>9.1f} ms  loads: {', '.join(heavy) or 'none'}")
+    failures = []
+    if args.max_import_ms is not None and harness * 1e3 > args.max_import_ms:
+        failures.append(f"import {harness * 1e3:.1f} ms > {args.max_import_ms} ms")
+    for target in args.targets:
+        seconds = best_of(args.repeat, lambda: run(["-m", "pytest", "--collect-only", "-q", target])) - interpreter
+        print(f"{'collect ' + target:<48} {seconds * 1e3:>9.1f} ms")
+        if args.max_collect_ms is not None and seconds * 1e3 > args.max_collect_ms:
+            failures.append(f"collect {target} {seconds * 1e3:.1f} ms > {args.max_collect_ms} ms")
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
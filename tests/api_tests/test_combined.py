@@ -1,6 +1,8 @@
 import pytest
 from http import HTTPStatus
 from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA, TITLE_ONLY_ARRAY_SCHEMA
+from utilities.poetrydb_query import parse_search
+from utilities.streaming import iter_text_poems
 from utilities.validators import (
     validate_response_schema, 
     validate_poem_title, 
@@ -8,10 +10,14 @@ from utilities.validators import (
     validate_text_format
 )
 
+def poem_keys(poems):
+    """(title, author) of each poem; the seed corpus text may differ from the public API."""
+    return {(poem["title"], poem["author"]) for poem in poems}
+
 class TestCombinedSearchEndpoint:
     """Tests for the combined search functionality of the PoetryDB API."""
     
-    def test_combined_search_title_author(self, api_client, expected_author):
+    def test_combined_search_title_author(self, api_client, expected_author, seed_index):
         """
         Test Case ID: TC-003
         
@@ -36,7 +42,7 @@ class TestCombinedSearchEndpoint:
         assert response.status_code == HTTPStatus.OK
         
         # Step 3: Validate response structure
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, POEMS_ARRAY_SCHEMA)
         
         # Step 4-5: Verify all poems match both criteria
@@ -44,8 +50,13 @@ class TestCombinedSearchEndpoint:
             # Check for case-insensitive match for "winter"
             assert "Winter" in poem['title'] or "winter" in poem['title'].lower()
             assert validate_poem_author(poem, expected_author)
+        
+        # Every indexed poem matching both criteria must be in the response
+        expected = seed_index.search(parse_search(input_fields, search_terms))
+        assert expected
+        assert poem_keys(expected) <= poem_keys(response_json)
     
-    def test_absolute_match_search(self, api_client):
+    def test_absolute_match_search(self, api_client, seed_index):
         """
         Test Case ID: TC-004
         
@@ -66,11 +77,13 @@ class TestCombinedSearchEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, POEMS_ARRAY_SCHEMA)
         
         for poem in response_json:
             assert poem['title'] == "Winter"  # Exact match, not just containing
+        
+        assert poem_keys(seed_index.search([("title", title)])) <= poem_keys(response_json)
     
     def test_combined_search_with_output_format(self, api_client, expected_author):
         """Test that combined search with specified output fields works correctly."""
@@ -82,7 +95,7 @@ class TestCombinedSearchEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, TITLE_ONLY_ARRAY_SCHEMA)
         
         for poem in response_json:
@@ -122,4 +135,12 @@ class TestCombinedSearchEndpoint:
         # Should have multiple titles since Shakespeare wrote many poems
         assert len(response_text) > 0
         # Should contain the word "title" as part of the format
-        assert "title" in response_text.lower() 
\ No newline at end of file
+        assert "title" in response_text.lower()
+        assert validate_text_format(response_text, "title")
+        
+        # Streamed and parsed, the titles match the JSON output and its schema
+        response = api_client.get_by_author(search_term, output_format, stream=True)
+        poems = list(iter_text_poems(response, output_format))
+        validate_response_schema(iter(poems), TITLE_ONLY_ARRAY_SCHEMA)
+        assert len(poems) > 1
+        assert poems == api_client.get_by_author(search_term, "title").json() 
\ No newline at end of file
@@ -0,0 +1,54 @@
+import pytest
+from http import HTTPStatus
+from utilities.api_client import PoetryDBClient
+from utilities.fault_proxy import FaultProfile, check_budget
+from utilities.loadgen import LoadRunner
+
+class TestFaultProfiles:
+    """Client behaviour behind the fault-injecting proxy."""
+    
+    def test_budget(self, request, fault_proxy, fault_profile):
+        """
+        Test that the client meets a profile's latency and throughput budget.
+        
+        Runs --fault-requests requests of the default load mix through the
+        proxy with the client's default retries, then checks the profile's
+        budget. Profiles without a budget are skipped.
+        """
+        count = request.config.getoption("--fault-requests")
+        if not count:
+            pytest.skip("fault budgets not requested (--fault-requests N)")
+        if not fault_profile.budget:
+            pytest.skip(f"profile {fault_profile.name} has no budget")
+        
+        fault_proxy.set_profile(fault_profile)
+        result = LoadRunner(fault_proxy.base_url, concurrency=4, requests=count, seed=0,
+                            retries=PoetryDBClient.DEFAULT_RETRIES).run()
+        
+        violations = check_budget(result, fault_profile.budget)
+        assert not violations, f"{fault_profile.name}: {violations}\n{result.format_table()}"
+    
+    def test_throttled_burst_is_retried(self, fault_proxy, faulty_client, expected_author):
+        """Test that a 429 burst shorter than the client's retries is ridden out."""
+        fault_proxy.set_profile("throttled")
+        
+        response = faulty_client.get_by_author(expected_author, "title")
+        
+        assert response.status_code == HTTPStatus.OK
+        assert fault_proxy.stats["throttled"] == 2
+    
+    def test_truncated_body_fails_loudly(self, fault_proxy, faulty_client, expected_author):
+        """Test that truncated JSON surfaces as an error instead of partial data."""
+        import requests
+        
+        fault_proxy.set_profile(FaultProfile("truncated", truncate={"rate": 1}))
+        
+        response = faulty_client.get_by_author(expected_author, "title")
+        
+        assert response.status_code == HTTPStatus.OK
+        with pytest.raises(ValueError):
+            faulty_client.json(response)
+        
+        fault_proxy.set_profile(FaultProfile("cut-off", truncate={"rate": 1, "short_read": True}))
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            faulty_client.get_by_author(expected_author, "title")
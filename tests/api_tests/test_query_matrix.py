@@ -0,0 +1,34 @@
+import pytest
+from tests.schemas.poem_schema import POEM_SCHEMA
+from utilities.query_matrix import generate_queries, run_matrix
+
+class TestQueryMatrix:
+    """Generated queries across every search field, output field and format."""
+    
+    def test_query_matrix(self, request, api_client, seed_index):
+        """
+        Run the generated query matrix through the API client.
+        
+        Against --local-poetrydb the responses must equal the corpus exactly;
+        against the public API every seed poem a query matches must be among
+        the results by title and author, and no query searches the seed
+        text, which may differ from upstream. Enabled with --query-matrix N; --matrix-budget and
+        --matrix-checkpoint bound and resume the run.
+        """
+        size = request.config.getoption("--query-matrix")
+        if not size:
+            pytest.skip("query matrix not requested (--query-matrix N)")
+        
+        strict = bool(request.config.getoption("--local-poetrydb"))
+        report = run_matrix(
+            api_client,
+            generate_queries(seed_index.poems, limit=size, text_terms=strict),
+            seed_index,
+            POEM_SCHEMA,
+            checkpoint=request.config.getoption("--matrix-checkpoint"),
+            budget=request.config.getoption("--matrix-budget"),
+            max_workers=request.config.getoption("--io-threads"),
+            strict=strict,
+        )
+        
+        assert report.ok, report.format()
@@ -1,6 +1,7 @@
 import pytest
 from http import HTTPStatus
 from tests.schemas.poem_schema import AUTHOR_TITLE_LINECOUNT_ARRAY_SCHEMA, TITLE_ONLY_ARRAY_SCHEMA
+from utilities.randomness import SKEWED, RandomnessAnalyzer, sample_random
 from utilities.validators import validate_response_schema, validate_response_count
 
 class TestRandomEndpoint:
@@ -31,7 +32,7 @@ class TestRandomEndpoint:
         assert response.status_code == HTTPStatus.OK
         
         # Step 3: Validate response structure
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, AUTHOR_TITLE_LINECOUNT_ARRAY_SCHEMA)
         
         # Step 4: Verify response contains exactly 3 poems
@@ -52,7 +53,7 @@ class TestRandomEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, TITLE_ONLY_ARRAY_SCHEMA)
         assert validate_response_count(response_json, count)
         
@@ -61,19 +62,19 @@ class TestRandomEndpoint:
             assert "author" not in poem
             assert "lines" not in poem
     
-    def test_random_distribution(self, api_client):
+    def test_random_distribution(self, api_client, io_pool):
         """Test that random poems appear to have a reasonable distribution."""
-        # Make multiple requests and collect titles
+        # Make multiple requests concurrently and collect titles
         count = 5
         fields = "title"
         iterations = 3
         all_titles = set()
         
-        for _ in range(iterations):
-            response = api_client.get_random(count, fields)
+        responses = io_pool.map(lambda _: api_client.get_random(count, fields), range(iterations))
+        for response in responses:
             assert response.status_code == HTTPStatus.OK
             
-            response_json = response.json()
+            response_json = api_client.json(response)
             assert validate_response_count(response_json, count)
             
             # Extract and add titles to our collection
@@ -92,9 +93,32 @@ class TestRandomEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         assert validate_response_count(response_json, count)
         
         # Check that all titles are unique within this response
         titles = [poem['title'] for poem in response_json]
-        assert len(titles) == len(set(titles)) 
\ No newline at end of file
+        assert len(titles) == len(set(titles)) 
+    
+    def test_random_uniformity(self, request, api_client, seed_index):
+        """
+        Test that /random samples every poem with equal probability.
+        
+        Samples until the chi-square test decides, or --random-samples poems
+        were drawn. The population is the --local-poetrydb corpus; against the
+        public API it is unknown, so only within-response duplicates can fail
+        the test. Enabled with --random-samples N.
+        """
+        max_samples = request.config.getoption("--random-samples")
+        if not max_samples:
+            pytest.skip("randomness analysis not requested (--random-samples N)")
+        
+        population = len(seed_index) if request.config.getoption("--local-poetrydb") else None
+        analyzer = RandomnessAnalyzer(population)
+        # Asking for most of a small corpus per call would hide any skew
+        count = 20 if population is None else max(1, min(20, population // 4))
+        sample_random(api_client, analyzer, per_request=count,
+                      max_samples=max_samples, max_workers=request.config.getoption("--io-threads"))
+        
+        assert analyzer.decision() != SKEWED, analyzer.format()
+        assert not analyzer.within_response_duplicates, analyzer.format()
\ No newline at end of file
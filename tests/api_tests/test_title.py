@@ -1,6 +1,7 @@
 import pytest
 from http import HTTPStatus
 from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA, TITLE_ONLY_ARRAY_SCHEMA
+from utilities.streaming import parse_text_poems
 from utilities.validators import (
     validate_response_schema, 
     validate_poem_title, 
@@ -33,7 +34,7 @@ class TestTitleEndpoint:
         assert response.status_code == HTTPStatus.OK
         
         # Step 3: Validate response structure
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, POEMS_ARRAY_SCHEMA)
         
         # Step 4: Verify poem title matches expected
@@ -46,7 +47,7 @@ class TestTitleEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         validate_response_schema(response_json, TITLE_ONLY_ARRAY_SCHEMA)
         
         for poem in response_json:
@@ -57,7 +58,8 @@ class TestTitleEndpoint:
     
     def test_get_title_text_format(self, api_client, expected_title):
         """Test that a poem can be retrieved in text format."""
-        response = api_client.get_by_title(expected_title, "title.text")
+        output_format = "title.text"
+        response = api_client.get_by_title(expected_title, output_format)
         
         assert response.status_code == HTTPStatus.OK
         # The API actually returns JSON content type even for .text format
@@ -68,6 +70,12 @@ class TestTitleEndpoint:
         
         # Verify the title appears in the response text
         assert expected_title in response_text
+        assert validate_text_format(response_text, "title")
+        
+        # The parsed records match the JSON output and its schema
+        poems = list(parse_text_poems(response_text.splitlines(), output_format))
+        validate_response_schema(poems, TITLE_ONLY_ARRAY_SCHEMA)
+        assert poems == api_client.get_by_title(expected_title, "title").json()
     
     def test_get_poem_by_title_linecount_validation(self, api_client, expected_title):
         """Test that a poem's linecount matches the actual number of lines."""
@@ -75,7 +83,7 @@ class TestTitleEndpoint:
         
         assert response.status_code == HTTPStatus.OK
         
-        response_json = response.json()
+        response_json = api_client.json(response)
         assert response_json
         
         for poem in response_json:
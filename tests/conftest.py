@@ -1,10 +1,317 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from tests.schemas import poem_schema
 from utilities.api_client import PoetryDBClient
+from utilities.fault_proxy import PROFILES as FAULT_PROFILES, FaultInjectingProxy, load_profiles as load_fault_profiles
+from utilities.instrumentation import default_instrumentation
+from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+from utilities.resilience import AdaptiveRateLimiter, CircuitBreaker
+from utilities.response_cache import MODES as CACHE_MODES, RECORD, ResponseCache
+from utilities.schema_registry import default_registry
+from utilities.search_index import PoemIndex
+from utilities.singleflight import SingleFlight
+
+SEED_CORPUS = os.path.join(os.path.dirname(__file__), "data", "poems.json")
+API_TESTS = os.path.join(os.path.dirname(__file__), "api_tests")
+
+# Per-file test seconds and session start, for --parallel-timings
+_test_seconds = defaultdict(float)
+_session_started = [None]
+# MetricsCollector fed by default_instrumentation, when --metrics/--metrics-json is given
+_metrics = [None]
+
+def pytest_addoption(parser):
+    """Register command line options for the suite."""
+    parser.addoption(
+        "--schema-timings",
+        action="store_true",
+        help="Print per-schema validation timings at the end of the run",
+    )
+    parser.addoption(
+        "--poetrydb-url",
+        default=os.environ.get("POETRYDB_BASE_URL"),
+        help="Base URL of the PoetryDB API under test (env: POETRYDB_BASE_URL)",
+    )
+    parser.addoption(
+        "--local-poetrydb",
+        action="store_true",
+        help="Run against a local stand-in server instead of the public API",
+    )
+    parser.addoption(
+        "--local-corpus",
+        default=SEED_CORPUS,
+        metavar="CORPUS",
+        help="Poem corpus served by --local-poetrydb (default: the seed corpus)",
+    )
+    parser.addoption(
+        "--cache-dir",
+        default=None,
+        help="Record/replay API responses in this directory",
+    )
+    parser.addoption(
+        "--cache-mode",
+        choices=CACHE_MODES,
+        default=RECORD,
+        help="Cache mode used with --cache-dir (default: record)",
+    )
+    parser.addoption(
+        "--cache-ttl",
+        type=float,
+        default=None,
+        help="Seconds a cached response stays valid (default: forever)",
+    )
+    parser.addoption(
+        "--rate-limit",
+        type=float,
+        default=None,
+        metavar="RPS",
+        help="Start an adaptive rate limiter at RPS requests per second per worker "
+             "and enable per-endpoint circuit breaking",
+    )
+    parser.addoption(
+        "--io-threads",
+        type=int,
+        default=8,
+        help="Threads per worker for concurrent requests inside a test (default: 8)",
+    )
+    parser.addoption(
+        "--parallel-timings",
+        action="store_true",
+        help="Print serial-equivalent vs wall-clock time and the speedup at the end of the run",
+    )
+    parser.addoption(
+        "--metrics",
+        action="store_true",
+        help="Instrument the API client and print per-endpoint phase timings",
+    )
+    parser.addoption(
+        "--metrics-json",
+        default=None,
+        metavar="PATH",
+        help="Instrument the API client and write per-endpoint metrics as JSON to PATH",
+    )
+    parser.addoption(
+        "--query-matrix",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Run N generated queries derived from the seed corpus (0 skips the matrix test)",
+    )
+    parser.addoption(
+        "--matrix-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Stop starting new matrix queries after SECONDS",
+    )
+    parser.addoption(
+        "--matrix-checkpoint",
+        default=None,
+        metavar="PATH",
+        help="Resume the query matrix from, and append its results to, this JSONL file",
+    )
+    parser.addoption(
+        "--random-samples",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Sample /random up to N poems for the uniformity test (0 skips it)",
+    )
+    parser.addoption(
+        "--fault-requests",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Issue N requests through the fault-injecting proxy per profile (0 skips the budget tests)",
+    )
+    parser.addoption(
+        "--fault-profiles",
+        default=None,
+        metavar="PATH",
+        help="JSON or YAML file of extra fault profiles for the budget tests",
+    )
+
+def pytest_configure(config):
+    """Compile the poem schemas once, up front, under their constant names.
+    
+    Compiled fast paths are kept in the pytest cache directory, so later
+    runs and xdist workers load them instead of importing jsonschema.
+    """
+    if getattr(config, "cache", None) is not None:
+        default_registry.cache_dir = str(config.cache.mkdir("schemas"))
+    default_registry.register_module(poem_schema)
+    if config.getoption("--metrics") or config.getoption("--metrics-json"):
+        from utilities.metrics import MetricsCollector
+        _metrics[0] = MetricsCollector().attach(default_instrumentation)
+
+def pytest_unconfigure(config):
+    if _metrics[0] is not None:
+        default_instrumentation.remove(_metrics[0])
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """Group API tests by endpoint for ``pytest -n auto --dist loadgroup``.
+    
+    Tests hitting the same endpoint then run on the same xdist worker, so
+    that worker's session client, connections and cache stay warm. The
+    group is the ``endpoint`` marker's name, else the module name. Runs
+    before xdist reads the ``xdist_group`` markers.
+    """
+    for item in items:
+        if not str(item.path).startswith(API_TESTS) or item.get_closest_marker("xdist_group"):
+            continue
+        marker = item.get_closest_marker("endpoint")
+        group = marker.args[0] if marker else item.module.__name__.rsplit(".", 1)[-1][len("test_"):]
+        item.add_marker(pytest.mark.xdist_group(group))
+
+def pytest_generate_tests(metafunc):
+    """Parametrize ``fault_profile`` with the built-in and --fault-profiles profiles."""
+    if "fault_profile" in metafunc.fixturenames:
+        profiles = dict(FAULT_PROFILES)
+        path = metafunc.config.getoption("--fault-profiles")
+        if path:
+            profiles.update(load_fault_profiles(path))
+        metafunc.parametrize("fault_profile", list(profiles.values()), ids=list(profiles))
+
+def pytest_sessionstart(session):
+    _session_started[0] = time.perf_counter()
+
+def pytest_runtest_logreport(report):
+    """Sum test durations per file; under xdist the controller sees every worker's reports."""
+    _test_seconds[report.nodeid.split("::", 1)[0]] += report.duration
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Merge the metrics collected by a pytest-xdist worker into the controller's."""
+    metrics = getattr(node, "workeroutput", {}).get("metrics")
+    if _metrics[0] is not None and metrics:
+        _metrics[0].merge(type(_metrics[0]).from_dict(metrics))
+
+def pytest_sessionfinish(session):
+    """Hand worker metrics to the controller, or write the JSON report."""
+    collector = _metrics[0]
+    if collector is None:
+        return
+    if hasattr(session.config, "workeroutput"):
+        session.config.workeroutput["metrics"] = collector.to_dict()
+        return
+    path = session.config.getoption("--metrics-json")
+    if path:
+        with open(path, "w", encoding="utf-8") as metrics_file:
+            metrics_file.write(collector.to_json())
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    """Add the request metrics table to the pytest-html report."""
+    if _metrics[0] is not None:
+        from py.xml import html
+        prefix.extend([html.h2("Request metrics"), html.pre(_metrics[0].format_table())])
+
+def pytest_terminal_summary(terminalreporter, config):
+    """Report per-schema validation timings, parallel speedup and request metrics when requested."""
+    if config.getoption("--schema-timings"):
+        terminalreporter.write_sep("-", "schema validation timings")
+        terminalreporter.write_line(default_registry.report())
+    if config.getoption("--parallel-timings") and not hasattr(config, "workerinput"):
+        wall = time.perf_counter() - _session_started[0]
+        serial = sum(_test_seconds.values())
+        workers = getattr(config.option, "numprocesses", None) or 1
+        terminalreporter.write_sep("-", "parallel timings")
+        for path, seconds in sorted(_test_seconds.items(), key=lambda entry: -entry[1]):
+            terminalreporter.write_line(f"{seconds:8.2f}s  {path}")
+        terminalreporter.write_line(
+            f"serial-equivalent {serial:.2f}s, wall {wall:.2f}s with {workers} worker(s): "
+            f"speedup {serial / wall if wall else 0:.2f}x"
+        )
+    if config.getoption("--metrics") and not hasattr(config, "workeroutput"):
+        terminalreporter.write_sep("-", "request metrics")
+        terminalreporter.write_line(_metrics[0].format_table())
+
+@pytest.fixture(scope="session")
+def local_poetrydb():
+    """Fixture to provide a local PoetryDB stand-in serving the seed corpus."""
+    with LocalPoetryDBServer(PoemCorpus.from_file(SEED_CORPUS), seed=0) as server:
+        yield server
+
+@pytest.fixture(scope="session")
+def poetrydb_base_url(request):
+    """Fixture for the base URL of the API under test.
+    
+    Defaults to the public PoetryDB; --local-poetrydb starts a stand-in.
+    """
+    if request.config.getoption("--local-poetrydb"):
+        corpus = PoemCorpus.from_file(request.config.getoption("--local-corpus"))
+        with LocalPoetryDBServer(corpus) as server:
+            yield server.base_url
+    else:
+        yield request.config.getoption("--poetrydb-url") or PoetryDBClient.BASE_URL
+
+@pytest.fixture(scope="session")
+def seed_index(request):
+    """Fixture for an inverted index over the corpus served by --local-poetrydb, else the seed corpus.
+    
+    Its results are exactly what a local stand-in returns, and a subset of
+    what the public API returns.
+    """
+    if request.config.getoption("--local-poetrydb"):
+        return PoemIndex.from_file(request.config.getoption("--local-corpus"))
+    return PoemIndex.from_file(SEED_CORPUS)
+
+@pytest.fixture(scope="session")
+def response_cache(request):
+    """Fixture for the response cache configured by --cache-dir, or None."""
+    directory = request.config.getoption("--cache-dir")
+    if not directory:
+        return None
+    return ResponseCache(
+        directory,
+        mode=request.config.getoption("--cache-mode"),
+        ttl=request.config.getoption("--cache-ttl"),
+    )
+
+@pytest.fixture(scope="session")
+def api_client(request, poetrydb_base_url, response_cache):
+    """Fixture to provide a PoetryDB API client.
+
+    Session-scoped so every test shares one pooled, keep-alive connection.
+    Each pytest-xdist worker is its own process and gets its own client.
+    With --metrics or --metrics-json the client is instrumented, and with
+    --rate-limit it is throttled and circuit-broken.
+    """
+    instrumentation = default_instrumentation if _metrics[0] is not None else None
+    rate = request.config.getoption("--rate-limit")
+    with PoetryDBClient(poetrydb_base_url, cache=response_cache,
+                        single_flight=SingleFlight(),
+                        instrumentation=instrumentation,
+                        rate_limiter=AdaptiveRateLimiter(rate) if rate else None,
+                        circuit_breaker=CircuitBreaker() if rate else None) as client:
+        yield client
 
 @pytest.fixture
-def api_client():
-    """Fixture to provide a PoetryDB API client."""
-    return PoetryDBClient()
+def fault_proxy(poetrydb_base_url):
+    """Fixture for a fault-injecting proxy in front of the API under test.
+    
+    Starts with the 'clean' profile; tests apply one with ``set_profile``.
+    """
+    with FaultInjectingProxy(poetrydb_base_url, seed=0) as proxy:
+        yield proxy
+
+@pytest.fixture
+def faulty_client(fault_proxy):
+    """Fixture to provide a PoetryDB API client talking through ``fault_proxy``."""
+    with PoetryDBClient(fault_proxy.base_url) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def io_pool(request):
+    """Fixture for a per-worker thread pool to overlap I/O-bound requests within a test."""
+    with ThreadPoolExecutor(request.config.getoption("--io-threads"),
+                            thread_name_prefix="io") as pool:
+        yield pool
 
 @pytest.fixture
 def expected_title():
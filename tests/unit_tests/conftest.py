@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+import pytest
+
+
+class StubServer:
+    """Tiny scripted HTTP server for exercising the client offline.
+
+    Responses are registered per path; a path can be given a queue of
+    responses that are served in order, with the last one repeated.
+    """
+
+    def __init__(self):
+        self.routes = defaultdict(deque)
+        self.requests = []
+        self.client_ports = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address
+        return f"http://{host}:{port}/"
+
+    def add(self, path, body, status=200, headers=None, delay=0):
+        """Queue a response for a path (without the leading slash)."""
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.routes[path].append((status, body, headers or {}, delay))
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _respond(self, handler):
+        path = unquote(handler.path.lstrip("/"))
+        with self._lock:
+            self.requests.append(path)
+            self.client_ports.add(handler.client_address[1])
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            queue = self.routes.get(path)
+            if not queue:
+                status, body, headers, delay = 404, b'{"status":404,"reason":"Not found"}', {}, 0
+            elif len(queue) > 1:
+                status, body, headers, delay = queue.popleft()
+            else:
+                status, body, headers, delay = queue[0]
+        time.sleep(delay)
+        with self._lock:
+            self.in_flight -= 1
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(body)))
+        for name, value in headers.items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY
+            # the body waits on the client's delayed ACK (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                server._respond(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def stub_server():
+    """Fixture to provide a running scripted HTTP stub server."""
+    server = StubServer().start()
+    yield server
+    server.stop()
@@ -0,0 +1,53 @@
+import pytest
+from http import HTTPStatus
+from utilities.api_client import PoetryDBClient
+
+
+class TestPoetryDBClientTransport:
+    """Tests for the pooled HTTP transport of PoetryDBClient."""
+
+    def test_connections_are_reused(self, stub_server):
+        """Sequential requests should share a single keep-alive connection."""
+        stub_server.add("title/Ozymandias", [{"title": "Ozymandias"}])
+
+        with PoetryDBClient(base_url=stub_server.base_url) as client:
+            for _ in range(5):
+                response = client.get_by_title("Ozymandias")
+                assert response.status_code == HTTPStatus.OK
+
+        assert len(stub_server.requests) == 5
+        assert len(stub_server.client_ports) == 1
+
+    def test_keep_alive_disabled_opens_new_connections(self, stub_server):
+        """With keep-alive off every request should use a fresh connection."""
+        stub_server.add("title/Ozymandias", [{"title": "Ozymandias"}])
+
+        with PoetryDBClient(base_url=stub_server.base_url, keep_alive=False) as client:
+            for _ in range(3):
+                client.get_by_title("Ozymandias")
+
+        assert len(stub_server.client_ports) == 3
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_retries_on_retryable_status(self, stub_server, status):
+        """429 and 5xx responses should be retried until a success arrives."""
+        stub_server.add("random/1/title", {"reason": "busy"}, status=status,
+                        headers={"Retry-After": "0"})
+        stub_server.add("random/1/title", [{"title": "Ozymandias"}])
+
+        with PoetryDBClient(base_url=stub_server.base_url, backoff_factor=0) as client:
+            response = client.get_random(1, "title")
+
+        assert response.status_code == HTTPStatus.OK
+        assert len(stub_server.requests) == 2
+
+    def test_gives_up_after_retries(self, stub_server):
+        """The last error response should be returned once retries run out."""
+        stub_server.add("random/1/title", {"reason": "down"}, status=503)
+
+        with PoetryDBClient(base_url=stub_server.base_url, retries=2,
+                            backoff_factor=0) as client:
+            response = client.get_random(1, "title")
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert len(stub_server.requests) == 3
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from http import HTTPStatus
+from utilities.async_api_client import AsyncPoetryDBClient
+
+
+class TestAsyncPoetryDBClient:
+    """Tests for the asyncio PoetryDB client."""
+
+    @pytest.mark.asyncio
+    async def test_endpoint_methods(self, stub_server):
+        """Each coroutine should hit the same URL as its sync counterpart."""
+        stub_server.add("title/Ozymandias/title", [{"title": "Ozymandias"}])
+        stub_server.add("author/Emily Dickinson", [])
+        stub_server.add("random/2/title", [{"title": "a"}, {"title": "b"}])
+        stub_server.add("title,author/Winter;Shakespeare", [])
+
+        async with AsyncPoetryDBClient(base_url=stub_server.base_url) as client:
+            responses = [
+                await client.get_by_title("Ozymandias", "title"),
+                await client.get_by_author("Emily Dickinson"),
+                await client.get_random(2, "title"),
+                await client.combined_search("title,author", "Winter;Shakespeare"),
+            ]
+
+        assert all(response.status_code == HTTPStatus.OK for response in responses)
+        assert responses[0].json() == [{"title": "Ozymandias"}]
+
+    @pytest.mark.asyncio
+    async def test_gather_many_respects_concurrency(self, stub_server):
+        """gather_many should keep order and never exceed the concurrency cap."""
+        titles = [f"Poem {index}" for index in range(12)]
+        for title in titles:
+            stub_server.add(f"title/{title}", [{"title": title}], delay=0.05)
+
+        async with AsyncPoetryDBClient(base_url=stub_server.base_url, concurrency=3) as client:
+            responses = await client.gather_many(("get_by_title", title) for title in titles)
+
+        assert [response.json()[0]["title"] for response in responses] == titles
+        assert stub_server.max_in_flight == 3
+        assert len(stub_server.client_ports) <= 3
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("method_name", ["_call", "close", "gather_many", "base_url"])
+    async def test_gather_many_rejects_unknown_method(self, stub_server, method_name):
+        """Only endpoint methods may be dispatched through gather_many."""
+        async with AsyncPoetryDBClient(base_url=stub_server.base_url) as client:
+            with pytest.raises(ValueError):
+                await client.gather_many([(method_name, "get_by_title")])
+
+        assert stub_server.requests == []
+
+    @pytest.mark.asyncio
+    async def test_close_does_not_block_event_loop(self, stub_server):
+        """close() should wait for in-flight calls without stalling other tasks."""
+        stub_server.add("title/Slow", [{"title": "Slow"}], delay=0.3)
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0.01)
+
+        client = AsyncPoetryDBClient(base_url=stub_server.base_url)
+        pending = asyncio.create_task(client.get_by_title("Slow"))
+        await asyncio.sleep(0.05)
+        ticker = asyncio.create_task(tick())
+        await client.close()
+        ticker.cancel()
+
+        assert (await pending).status_code == HTTPStatus.OK
+        assert len(ticks) > 5
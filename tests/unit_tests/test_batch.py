@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+import requests
+from utilities.api_client import PoetryDBClient
+from utilities.async_api_client import AsyncPoetryDBClient
+from utilities.batch import Lookup, plan_batch, run_batch, run_batch_async
+from utilities.poetrydb_query import matches, project
+
+LOOKUPS = [
+    ("title", "Winter"),
+    ("title", "winter:abs", "title"),
+    ("title", "Winter:abs", "title,linecount"),
+    ("title", "Ozymandias", "author"),
+    ("title", "Ozymandias", "author"),
+    ("author", "Dickinson", "title"),
+    ("author", "Emily Dickinson:abs", "title"),
+    ("lines", "heigh-ho", "title"),
+    ("linecount", "14", "title"),
+    ("title", "No Such Poem Anywhere"),
+]
+
+
+def expected(corpus, lookup):
+    return [project(poem, lookup.output) for poem in corpus.poems if matches(poem, lookup.field, lookup.term)]
+
+
+class TestPlanBatch:
+    """Tests for planning lookups into upstream requests."""
+
+    def test_duplicates_share_a_request(self):
+        plan = plan_batch([("title", "Ozymandias", "author"), ("title", "Ozymandias", "title")])
+
+        assert len(plan) == 1
+        assert plan[0].output == ("title", "author")
+        assert not plan[0].filters
+
+    def test_substring_covers_longer_terms(self):
+        plan = plan_batch([("title", "Winter Wind"), ("title", "winter"), ("title", "Winter:abs", "title")])
+
+        assert [(request.field, request.term) for request in plan] == [("title", "winter")]
+        assert len(plan[0].lookups) == 3
+
+    def test_filtering_requests_the_lookup_field(self):
+        plan = plan_batch([("author", "Dickinson", "title"), ("author", "Emily Dickinson:abs", "title")])
+
+        assert plan[0].output == ("title", "author")
+
+    def test_no_cover_across_fields_or_for_short_terms(self):
+        plan = plan_batch([("title", "Wi"), ("title", "Winter"), ("author", "Winter"), ("linecount", "14")])
+
+        assert len(plan) == 4
+
+    def test_subsume_off(self):
+        assert len(plan_batch([("title", "Winter"), ("title", "Winter:abs")], subsume=False)) == 2
+
+
+class TestRunBatch:
+    """Tests for running a batch against the local stand-in server."""
+
+    def test_results_match_individual_lookups(self, local_poetrydb):
+        lookups = [Lookup(*lookup) for lookup in LOOKUPS]
+
+        with PoetryDBClient(local_poetrydb.base_url) as client:
+            results = run_batch(client, lookups)
+
+        for lookup in lookups:
+            assert results[lookup] == expected(local_poetrydb.corpus, lookup), lookup
+
+    def test_async_results_match(self, local_poetrydb):
+        lookups = [Lookup(*lookup) for lookup in LOOKUPS]
+
+        async def main():
+            async with AsyncPoetryDBClient(local_poetrydb.base_url) as client:
+                return await run_batch_async(client, lookups)
+
+        results = asyncio.run(main())
+
+        for lookup in lookups:
+            assert results[lookup] == expected(local_poetrydb.corpus, lookup), lookup
+
+    def test_sends_one_request_per_planned_lookup(self, stub_server):
+        stub_server.add("title/Winter/title", [{"title": "Winter"}, {"title": "Winter Wind"}])
+
+        with PoetryDBClient(stub_server.base_url) as client:
+            results = run_batch(client, [("title", "Winter", "title"), ("title", "Winter:abs", "title")])
+
+        assert len(stub_server.requests) == 1
+        assert results[Lookup("title", "Winter:abs", "title")] == [{"title": "Winter"}]
+
+    def test_http_error_raises(self, stub_server):
+        stub_server.add("title/Winter/title", {"reason": "boom"}, status=404)
+
+        with PoetryDBClient(stub_server.base_url, retries=0) as client:
+            with pytest.raises(requests.HTTPError):
+                run_batch(client, [("title", "Winter", "title")])
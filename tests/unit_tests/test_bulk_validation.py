@@ -0,0 +1,102 @@
+import json
+
+import pytest
+from utilities import bulk_validation
+from utilities.bulk_validation import (
+    DUPLICATE,
+    LINECOUNT_MISMATCH,
+    MISSING_FIELDS,
+    UNEXPECTED_FIELDS,
+    check_poems,
+)
+from utilities.validators import validate_poem_linecount
+
+
+def poem(title, author="Anon", lines=("a", "b"), linecount=None):
+    return {
+        "title": title,
+        "author": author,
+        "lines": list(lines),
+        "linecount": str(len(lines)) if linecount is None else linecount,
+    }
+
+
+@pytest.fixture
+def poems():
+    return [
+        poem("Winter"),
+        poem("Spring", linecount="3"),
+        poem("Winter", author="Shakespeare"),
+        dict(poem("Summer"), extra=1),
+        {"title": "Autumn", "author": "Anon", "lines": []},
+        poem("Fall", linecount="many"),
+        poem("Spring"),
+        "not a poem",
+    ]
+
+
+class TestCheckPoems:
+    """Tests for the columnar corpus-wide checks."""
+
+    def test_seed_corpus_is_clean(self, local_poetrydb):
+        report = check_poems(local_poetrydb.corpus.poems)
+
+        assert report.ok
+        assert report.rows == len(local_poetrydb.corpus)
+
+    def test_every_violation_is_reported(self, poems):
+        report = check_poems(poems)
+
+        assert report.rows_with(LINECOUNT_MISMATCH) == [1, 5]
+        assert report.rows_with(DUPLICATE) == [2, 6]
+        assert report.rows_with(UNEXPECTED_FIELDS) == [3]
+        assert report.rows_with(MISSING_FIELDS) == [4, 7]
+        assert report.counts() == {LINECOUNT_MISMATCH: 2, DUPLICATE: 2, UNEXPECTED_FIELDS: 1, MISSING_FIELDS: 2}
+
+    def test_details(self, poems):
+        details = {(violation.row, violation.kind): violation.detail for violation in check_poems(poems).violations}
+
+        assert details[1, LINECOUNT_MISMATCH] == {"reported": 3, "actual": 2}
+        assert details[5, LINECOUNT_MISMATCH] == {"reported": None, "actual": 2}
+        assert details[2, DUPLICATE] == {"key": {"title": "Winter"}, "first_row": 0}
+        assert details[3, UNEXPECTED_FIELDS] == ["extra"]
+        assert details[4, MISSING_FIELDS] == ["linecount"]
+
+    def test_combined_key(self, poems):
+        report = check_poems(poems, key_fields=("title", "author"))
+
+        assert report.rows_with(DUPLICATE) == [6]
+
+    def test_agrees_with_per_poem_validator(self, poems):
+        dicts = [item for item in poems if isinstance(item, dict) and str(item.get("linecount")).isdigit()]
+        expected = [item["title"] for item in dicts if not validate_poem_linecount(item)]
+
+        report = check_poems(iter(dicts))
+
+        assert [dicts[row]["title"] for row in report.rows_with(LINECOUNT_MISMATCH)] == expected
+
+    def test_hash_collisions_are_not_duplicates(self, monkeypatch):
+        monkeypatch.setattr(bulk_validation, "hash", lambda key: 7, raising=False)
+
+        report = check_poems([poem("A"), poem("B"), poem("A")])
+
+        assert report.rows_with(DUPLICATE) == [2]
+
+    def test_report_is_serializable_and_compact(self, poems):
+        report = check_poems(poems)
+
+        assert json.loads(json.dumps(report.to_dict()))["counts"][DUPLICATE] == 2
+        assert report.format(limit=2).splitlines()[-1] == f"  ... {len(report.violations) - 2} more"
+
+
+class TestMain:
+    """Tests for the command line entry point."""
+
+    def test_exit_status(self, tmp_path, poems, capsys):
+        dump = tmp_path / "dump.json"
+        dump.write_text(json.dumps(poems))
+
+        assert bulk_validation.main([str(dump), "--json"]) == 1
+        assert json.loads(capsys.readouterr().out)["rows"] == len(poems)
+        dump.write_text(json.dumps(poems[:1]))
+        assert bulk_validation.main([str(dump)]) == 0
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+from jsonschema.exceptions import ValidationError
+from tests.schemas.poem_schema import POEM_SCHEMA, TITLE_ONLY_SCHEMA
+from utilities.api_client import PoetryDBClient
+from utilities.decoding import (
+    Poem,
+    StdlibDecoder,
+    TypedPoemDecoder,
+    available_decoders,
+    default_decoder,
+)
+from utilities.instrumentation import Instrumentation
+from utilities.schema_codegen import UnsupportedSchema
+
+
+POEMS = [
+    {"title": f"Poem {index}", "author": "Anne Brontë", "lines": ["a", "b"][:index], "linecount": str(index)}
+    for index in range(3)
+]
+
+BACKENDS = list(available_decoders())
+
+
+class TestDecoders:
+    """Tests for the untyped decoders."""
+
+    @pytest.mark.parametrize("name", BACKENDS)
+    def test_decode(self, name):
+        assert available_decoders()[name]().decode(json.dumps(POEMS).encode("utf-8")) == POEMS
+
+    def test_default_is_fastest_available(self):
+        assert default_decoder().name == BACKENDS[0]
+        assert BACKENDS[-1] == "json"
+
+    @pytest.mark.parametrize("name", BACKENDS)
+    def test_invalid_json(self, name):
+        with pytest.raises(ValueError):
+            available_decoders()[name]().decode(b"[{")
+
+
+class TestTypedPoemDecoder:
+    """Tests for decoding into Poem records with fused schema checks."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_records(self, backend):
+        poems = TypedPoemDecoder(POEM_SCHEMA, backend).decode(json.dumps(POEMS))
+
+        assert all(type(poem) is Poem for poem in poems)
+        assert poems == POEMS
+        assert poems[1].lines == ["a"] and poems[1]["linecount"] == "1"
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_projected_schema(self, backend):
+        poems = TypedPoemDecoder(TITLE_ONLY_SCHEMA, backend).decode('[{"title": "Winter"}]')
+
+        assert poems == [{"title": "Winter"}]
+        assert "author" not in poems[0] and poems[0].get("author", "-") == "-"
+        with pytest.raises(KeyError):
+            poems[0]["lines"]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    @pytest.mark.parametrize("item, path", [
+        (dict(POEMS[0], title=None), "$[2].title"),
+        (dict(POEMS[0], extra=1), "$[2]"),
+        ({"title": "Winter"}, "$[2]"),
+        ("Winter", "$[2]"),
+    ])
+    def test_schema_error_reports_item_index(self, backend, item, path):
+        with pytest.raises(ValidationError) as excinfo:
+            TypedPoemDecoder(POEM_SCHEMA, backend).decode(json.dumps(POEMS[:2] + [item]))
+
+        assert excinfo.value.json_path == path
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_schema_valid_item_rejected_by_fast_check(self, backend):
+        item = dict(POEMS[0], linecount=14.0)
+        decoder = TypedPoemDecoder(POEM_SCHEMA, backend)
+        assert not decoder.fast_check(item)
+
+        poems = decoder.decode(json.dumps(POEMS[:2] + [item]))
+
+        assert all(type(poem) is Poem for poem in poems)
+        assert poems[2] == item
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_status_object_passes_through(self, backend):
+        decoder = TypedPoemDecoder(POEM_SCHEMA, backend)
+
+        assert decoder.decode('{"status": 404, "reason": "Not found"}') == {"status": 404, "reason": "Not found"}
+
+    def test_unsupported_schemas(self):
+        with pytest.raises(UnsupportedSchema):
+            TypedPoemDecoder({"type": "array", "items": POEM_SCHEMA})
+        with pytest.raises(UnsupportedSchema):
+            TypedPoemDecoder(dict(POEM_SCHEMA, additionalProperties=True))
+        with pytest.raises(ValueError):
+            TypedPoemDecoder(POEM_SCHEMA, backend="simdjson")
+
+
+class TestClientDecoder:
+    """Tests for the client's pluggable decoder."""
+
+    def test_client_decoder_and_override(self, stub_server):
+        stub_server.add("author/Anne Brontë", POEMS)
+
+        with PoetryDBClient(base_url=stub_server.base_url, decoder=StdlibDecoder()) as client:
+            response = client.get_by_author("Anne Brontë")
+
+            assert client.json(response) == POEMS
+            assert type(client.json(response, TypedPoemDecoder(POEM_SCHEMA))[0]) is Poem
+
+    def test_instrumented_parse_uses_decoder(self, stub_server):
+        stub_server.add("author/Anne Brontë", POEMS)
+        events = []
+
+        class Recorder:
+            def on_parse(self, event):
+                events.append(event)
+
+        with PoetryDBClient(base_url=stub_server.base_url, instrumentation=Instrumentation([Recorder()]),
+                            decoder=TypedPoemDecoder(POEM_SCHEMA)) as client:
+            poems = client.json(client.get_by_author("Anne Brontë"))
+
+        assert poems == POEMS and type(poems[0]) is Poem
+        assert [event.name for event in events] == ["author"]
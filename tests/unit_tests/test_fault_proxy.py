@@ -0,0 +1,169 @@
+import random
+import time
+
+import pytest
+import requests
+from utilities.api_client import PoetryDBClient
+from utilities.fault_proxy import (
+    PROFILES, FaultInjectingProxy, FaultProfile, check_budget, latency_sampler, load_profiles,
+)
+from utilities.loadgen import LoadRunner, RequestMix
+
+BODY = [{"title": f"Poem {index}", "lines": ["x" * 60] * 10} for index in range(20)]
+
+
+@pytest.fixture
+def upstream(stub_server):
+    stub_server.add("author/Clare", BODY)
+    return stub_server
+
+
+@pytest.fixture
+def proxy(upstream):
+    with FaultInjectingProxy(upstream.base_url, seed=1) as proxy:
+        yield proxy
+
+
+def fetch(proxy, retries=0, read_timeout=5):
+    with PoetryDBClient(proxy.base_url, retries=retries, read_timeout=read_timeout) as client:
+        return client.get_by_author("Clare")
+
+
+class TestFaultProfile:
+    """Tests for profile settings and fault planning."""
+
+    @pytest.mark.parametrize("spec, low, high", [
+        (0.25, 0.25, 0.25),
+        ({"distribution": "uniform", "low": 0.1, "high": 0.2}, 0.1, 0.2),
+        ({"distribution": "normal", "mean": 0.01, "stddev": 0.1}, 0.0, 1.0),
+        ({"distribution": "lognormal", "median": 0.05, "sigma": 0.5}, 0.0, 1.0),
+        ({"distribution": "exponential", "mean": 0.05}, 0.0, 1.0),
+        ({"distribution": "pareto", "scale": 0.01, "alpha": 1.2, "max": 0.5}, 0.01, 0.5),
+    ])
+    def test_latency_sampler(self, spec, low, high):
+        sample = latency_sampler(spec)
+        rng = random.Random(0)
+
+        assert all(low <= sample(rng) <= high for _ in range(1000))
+
+    def test_latency_sampler_rejects_bad_specs(self):
+        with pytest.raises(ValueError):
+            latency_sampler({"distribution": "gamma"})
+        with pytest.raises(ValueError):
+            latency_sampler({"distribution": "uniform", "low": 0.1})
+
+    def test_throttle_bursts(self):
+        profile = FaultProfile(throttle={"burst": 2, "period": 5})
+        rng = random.Random(0)
+
+        assert [profile.plan(number, rng).throttle for number in range(1, 11)] == [True, True, False, False, False] * 2
+
+    def test_load_profiles(self, tmp_path):
+        path = tmp_path / "faults.yaml"
+        path.write_text(
+            "slow-3g:\n"
+            "  latency: {distribution: lognormal, median: 0.3, sigma: 0.4}\n"
+            "  bandwidth: 50000\n"
+            "  budget: {p99_ms: 3000}\n"
+        )
+
+        profiles = load_profiles(str(path))
+
+        assert profiles["slow-3g"].bandwidth == 50000
+        assert profiles["slow-3g"].budget == {"p99_ms": 3000}
+        path.write_text("broken:\n  jitter: 1\n")
+        with pytest.raises(ValueError):
+            load_profiles(str(path))
+
+
+class TestFaultInjectingProxy:
+    """Tests for the faults the client sees through the proxy."""
+
+    def test_clean_passthrough(self, proxy):
+        response = fetch(proxy)
+
+        assert response.status_code == 200
+        assert response.json() == BODY
+        assert proxy.stats == {"requests": 1}
+
+    def test_latency_beyond_read_timeout_raises(self, proxy):
+        proxy.set_profile(FaultProfile(latency=0.5))
+
+        with pytest.raises(requests.exceptions.ConnectionError, match="Read timed out"):
+            fetch(proxy, read_timeout=0.1)
+
+    def test_drip_slower_than_read_timeout_raises(self, proxy):
+        proxy.set_profile(FaultProfile(drip={"chunk": 64, "interval": 0.3}))
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            fetch(proxy, read_timeout=0.1).content
+
+    def test_bandwidth(self, proxy):
+        proxy.set_profile(FaultProfile(bandwidth=40000))
+        started = time.perf_counter()
+
+        response = fetch(proxy)
+
+        assert response.json() == BODY
+        assert time.perf_counter() - started >= len(response.content) / 40000 * 0.9
+
+    def test_reset_before_response_is_retried(self, proxy):
+        proxy.set_profile(FaultProfile(reset={"rate": 1}))
+        with pytest.raises(requests.exceptions.ConnectionError):
+            fetch(proxy)
+
+        proxy.set_profile(FaultProfile(reset={"rate": 0.5}))
+        responses = [fetch(proxy, retries=5) for _ in range(5)]
+
+        assert all(response.json() == BODY for response in responses)
+        assert proxy.stats["reset"] > 0
+
+    def test_reset_mid_body_is_not_retried(self, proxy):
+        proxy.set_profile(FaultProfile(reset={"rate": 1, "when": "body"}))
+
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            fetch(proxy, retries=3)
+
+    def test_throttle(self, proxy):
+        proxy.set_profile(FaultProfile(throttle={"burst": 2, "period": 10, "retry_after": 0}))
+
+        assert [fetch(proxy).status_code for _ in range(3)] == [429, 429, 200]
+
+        proxy.set_profile(proxy.profile)
+        assert fetch(proxy, retries=3).status_code == 200
+        assert proxy.stats["throttled"] == 2
+
+    def test_truncate(self, proxy):
+        proxy.set_profile(FaultProfile(truncate={"rate": 1, "fraction": 0.5}))
+        response = fetch(proxy)
+
+        with pytest.raises(ValueError):
+            response.json()
+
+        proxy.set_profile(FaultProfile(truncate={"rate": 1, "short_read": True}))
+        with pytest.raises(requests.exceptions.ChunkedEncodingError):
+            fetch(proxy)
+
+    def test_upstream_down(self):
+        with FaultInjectingProxy("http://127.0.0.1:9/") as proxy:
+            assert fetch(proxy).status_code == 502
+
+    def test_budget(self, proxy):
+        proxy.set_profile(FaultProfile(latency=0.02))
+        mix = RequestMix([{"endpoint": "get_by_author", "args": ["Clare"]}])
+        result = LoadRunner(proxy.base_url, mix, concurrency=2, requests=10, seed=0).run()
+
+        assert check_budget(result, {"p50_ms": 1000, "max_error_rate": 0}) == []
+        assert check_budget(result, {"p50_ms": 10, "min_rps": 1000}) == [
+            f"p50_ms {result.summary()['all']['p50_ms']:.1f} > 10",
+            f"rps {result.summary()['all']['rps']:.1f} < 1000",
+        ]
+
+    def test_builtin_profiles_apply(self, proxy):
+        for name in PROFILES:
+            proxy.set_profile(name)
+            try:
+                fetch(proxy)
+            except requests.RequestException:
+                pass
+            assert proxy.stats["requests"] >= 1
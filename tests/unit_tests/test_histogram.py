@@ -0,0 +1,36 @@
+import json
+
+import pytest
+from utilities.histogram import LatencyHistogram
+
+
+class TestLatencyHistogram:
+    """Tests for the HDR-style latency histogram."""
+
+    def test_percentiles_within_one_percent(self):
+        histogram = LatencyHistogram()
+        values = [index / 1e4 for index in range(1, 10001)]  # 0.1 ms .. 1 s
+        for value in values:
+            histogram.record(value)
+
+        for percent in (50, 95, 99, 99.9):
+            exact = values[int(percent / 100 * len(values)) - 1]
+            assert histogram.percentile(percent) == pytest.approx(exact, rel=0.01)
+        assert histogram.percentile(100) == pytest.approx(1.0)
+        assert histogram.mean == pytest.approx(sum(values) / len(values), rel=1e-3)
+
+    def test_merge_and_round_trip(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for index in range(100):
+            first.record(index / 1e3)
+            second.record(index / 1e2)
+        first.merge(second)
+
+        restored = LatencyHistogram.from_dict(json.loads(json.dumps(first.to_dict())))
+
+        assert restored.total_count == 200
+        assert restored.percentile(99) == first.percentile(99)
+        assert restored.min_micros == 0
+
+    def test_empty(self):
+        assert LatencyHistogram().percentile(99) == 0.0
@@ -0,0 +1,161 @@
+import json
+
+import jsonschema
+import pytest
+import requests
+from tests.schemas.poem_schema import TITLE_ONLY_ARRAY_SCHEMA
+from utilities.api_client import PoetryDBClient
+from utilities.instrumentation import Instrumentation, default_instrumentation, endpoint_name
+from utilities.metrics import MetricsCollector
+from utilities.response_cache import ResponseCache
+from utilities.validators import collect_schema_errors, validate_response_schema
+
+
+class Recorder:
+    """Hook keeping every event it receives."""
+
+    def __init__(self):
+        self.events = []
+
+    def on_request_start(self, event):
+        self.events.append(("start", event))
+
+    def on_request_end(self, event):
+        self.events.append(("end", event))
+
+    def on_parse(self, event):
+        self.events.append(("parse", event))
+
+    def on_validate(self, event):
+        self.events.append(("validate", event))
+
+    def of(self, kind):
+        return [event for event_kind, event in self.events if event_kind == kind]
+
+
+@pytest.fixture
+def recorder():
+    recorder = Recorder()
+    default_instrumentation.add(recorder)
+    yield recorder
+    default_instrumentation.remove(recorder)
+
+
+class TestInstrumentation:
+    """Tests for the client request instrumentation."""
+
+    def test_phases_and_payload(self, stub_server):
+        stub_server.add("title/Winter/title", [{"title": "Winter"}])
+        recorder = Recorder()
+
+        with PoetryDBClient(stub_server.base_url, instrumentation=Instrumentation([recorder])) as client:
+            first = client.get_by_title("Winter", "title")
+            second = client.get_by_title("Winter", "title")
+
+        assert [kind for kind, _ in recorder.events] == ["start", "end", "start", "end"]
+        opened, reused = recorder.of("end")
+        assert opened.name == "title" and opened.status == 200
+        assert opened.bytes == len(first.content)
+        assert set(opened.phases) == {"connect", "ttfb", "download"}
+        # The keep-alive connection is reused, so no connect phase
+        assert set(reused.phases) == {"ttfb", "download"}
+        assert second.request_event is reused
+        assert reused.seconds >= reused.phases["ttfb"]
+
+    def test_streamed_requests_have_no_download_phase(self, stub_server):
+        stub_server.add("author/Frost", [{"title": "Fire and Ice"}])
+        recorder = Recorder()
+
+        with PoetryDBClient(stub_server.base_url, instrumentation=Instrumentation([recorder])) as client:
+            response = client.get_by_author("Frost", stream=True)
+            assert response.json() == [{"title": "Fire and Ice"}]
+
+        assert "download" not in recorder.of("end")[0].phases
+
+    def test_errors_are_reported(self):
+        recorder = Recorder()
+
+        with PoetryDBClient("http://127.0.0.1:9/", retries=0, instrumentation=Instrumentation([recorder])) as client:
+            with pytest.raises(requests.ConnectionError):
+                client.get_by_title("Winter")
+
+        assert isinstance(recorder.of("end")[0].error, requests.ConnectionError)
+
+    def test_cache_hits(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+        recorder = Recorder()
+
+        with PoetryDBClient(stub_server.base_url, cache=ResponseCache(),
+                            instrumentation=Instrumentation([recorder])) as client:
+            client.get_by_title("Winter")
+            client.get_by_title("Winter")
+
+        hit = recorder.of("end")[1]
+        assert hit.from_cache and hit.phases == {}
+        assert hit.bytes == len(json.dumps([{"title": "Winter"}]))
+
+    def test_parse(self, stub_server):
+        stub_server.add("random/1/title", [{"title": "Winter"}])
+        recorder = Recorder()
+
+        with PoetryDBClient(stub_server.base_url, instrumentation=Instrumentation([recorder])) as client:
+            assert client.json(client.get_random(1, "title")) == [{"title": "Winter"}]
+
+        parse = recorder.of("parse")[0]
+        assert parse.name == "random" and parse.error is None
+
+    def test_uninstrumented_client_json(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+
+        with PoetryDBClient(stub_server.base_url) as client:
+            response = client.get_by_title("Winter")
+
+        assert client.json(response) == [{"title": "Winter"}]
+        assert not hasattr(response, "request_event")
+
+    def test_endpoint_name(self):
+        assert endpoint_name("/title,author/Winter;Shakespeare/title") == "title,author"
+        assert endpoint_name("random/3/title") == "random"
+
+
+class TestValidationHooks:
+    """Tests for validation events from utilities.validators."""
+
+    def test_validate_events(self, recorder):
+        validate_response_schema([{"title": "Winter"}], TITLE_ONLY_ARRAY_SCHEMA)
+        with pytest.raises(jsonschema.ValidationError):
+            validate_response_schema([{"title": 1}], TITLE_ONLY_ARRAY_SCHEMA)
+        collect_schema_errors([{"author": "x"}], TITLE_ONLY_ARRAY_SCHEMA)
+
+        events = recorder.of("validate")
+        assert [event.schema for event in events] == ["TITLE_ONLY_ARRAY_SCHEMA"] * 3
+        assert [event.ok for event in events] == [True, False, False]
+
+
+class TestMetricsCollector:
+    """Tests for the built-in metrics collector."""
+
+    def test_collects_and_merges(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+        instrumentation = Instrumentation()
+        collector = MetricsCollector().attach(instrumentation)
+
+        with PoetryDBClient(stub_server.base_url, instrumentation=instrumentation) as client:
+            for _ in range(3):
+                client.json(client.get_by_title("Winter"))
+            client.get_by_title("Missing")
+        with pytest.raises(ValueError):
+            with instrumentation.validating("S"):
+                raise ValueError("invalid")
+
+        data = collector.to_dict()
+        title = data["endpoints"]["title"]
+        assert title["requests"] == 4 and title["errors"] == 1
+        assert title["phases"]["total"]["count"] == 4
+        assert title["phases"]["parse"]["count"] == 3
+        assert data["validation"]["S"]["failures"] == 1
+
+        merged = MetricsCollector.from_dict(json.loads(collector.to_json()))
+        merged.merge(collector)
+        assert merged.to_dict()["endpoints"]["title"]["requests"] == 8
+        assert "title" in merged.format_table()
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import multiprocessing
+
+import pytest
+from utilities.loadgen import LoadRunner, RequestMix, RunResult, compare
+
+
+class TestLoadRunner:
+    """Tests for running load against the local stand-in server."""
+
+    @pytest.mark.parametrize("mode", ["threads", "asyncio", "processes"])
+    def test_fixed_request_count(self, local_poetrydb, mode):
+        runner = LoadRunner(local_poetrydb.base_url, mode=mode, concurrency=4,
+                            requests=40, processes=2, seed=1)
+
+        summary = runner.run().summary()
+
+        assert summary["all"]["count"] == 40
+        assert summary["all"]["errors"] == 0
+        assert set(summary) == {"title", "author", "random", "combined", "all"}
+
+    def test_processes_are_not_forked(self, local_poetrydb, monkeypatch):
+        methods = []
+        get_context = multiprocessing.get_context
+
+        def recording_get_context(method=None):
+            methods.append(method)
+            return get_context(method)
+
+        monkeypatch.setattr(multiprocessing, "get_context", recording_get_context)
+        runner = LoadRunner(local_poetrydb.base_url, mode="processes", concurrency=2,
+                            requests=4, processes=2)
+
+        assert runner.run().summary()["all"]["count"] == 4
+        assert methods and "fork" not in methods
+
+    def test_errors_counted(self, local_poetrydb):
+        mix = RequestMix([{"endpoint": "get_by_title", "args": ["x"], "name": "broken"}])
+        runner = LoadRunner("http://127.0.0.1:9/", mix, concurrency=2, requests=4)
+
+        assert runner.run().summary()["broken"]["errors"] == 4
+
+    @pytest.mark.parametrize("mode", ["threads", "asyncio"])
+    def test_status_in_body_counted(self, local_poetrydb, mode):
+        mix = RequestMix([
+            {"endpoint": "get_by_title", "args": ["No Such Poem"], "name": "miss"},
+            {"endpoint": "get_by_title", "args": ["Ozymandias"], "name": "hit"},
+        ])
+        runner = LoadRunner(local_poetrydb.base_url, mix, mode=mode, concurrency=2, requests=20, seed=0)
+
+        summary = runner.run().summary()
+
+        assert summary["miss"]["errors"] == summary["miss"]["count"] > 0
+        assert summary["hit"]["errors"] == 0
+
+    def test_exports(self, local_poetrydb):
+        result = LoadRunner(local_poetrydb.base_url, concurrency=2, requests=10).run()
+
+        rows = list(csv.DictReader(io.StringIO(result.to_csv())))
+        assert rows[-1]["endpoint"] == "all"
+        assert int(rows[-1]["count"]) == 10
+        assert RunResult.from_dict(json.loads(result.to_json())).summary()["all"]["count"] == 10
+
+
+class TestCompare:
+    """Tests for flagging regressions between runs."""
+
+    def make_result(self, latency, count=100, errors=0, wall=1.0):
+        result = RunResult(wall_seconds=wall)
+        for index in range(count):
+            result.record("title", latency, index < errors)
+        return result
+
+    def test_no_regression_within_tolerance(self):
+        assert compare(self.make_result(0.010), self.make_result(0.0105)) == []
+
+    def test_flags_latency_throughput_and_errors(self):
+        regressions = compare(self.make_result(0.010), self.make_result(0.020, errors=1, wall=2.0))
+
+        assert any("p99_ms" in regression for regression in regressions)
+        assert any("rps" in regression for regression in regressions)
+        assert any("error rate" in regression for regression in regressions)
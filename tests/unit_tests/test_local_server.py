@@ -0,0 +1,80 @@
+import pytest
+from http import HTTPStatus
+from utilities.api_client import PoetryDBClient
+from utilities.poetrydb_query import NOT_FOUND, matches_all
+
+
+@pytest.fixture(scope="module")
+def client(local_poetrydb):
+    with PoetryDBClient(local_poetrydb.base_url) as client:
+        yield client
+
+
+class TestPoemCorpus:
+    """Tests for the indexed in-memory corpus."""
+
+    @pytest.mark.parametrize("criteria", [
+        [("title", "winter")],
+        [("title", "WIN")],
+        [("title", "Wi")],
+        [("title", "Winter:abs")],
+        [("title", "winter:abs")],
+        [("author", "shakespeare")],
+        [("author", "William Shakespeare:abs")],
+        [("lines", "heigh-ho")],
+        [("lines", "Cuckoo;:abs")],
+        [("linecount", "14")],
+        [("title", "Sonnet"), ("lines", "summer")],
+        [("title", "zzz")],
+    ])
+    def test_index_agrees_with_scan(self, local_poetrydb, criteria):
+        """Indexed search returns exactly what a full scan would."""
+        corpus = local_poetrydb.corpus
+        expected = [poem for poem in corpus.poems if matches_all(poem, criteria)]
+
+        assert corpus.search(criteria) == expected
+
+    def test_author_index(self, local_poetrydb):
+        corpus = local_poetrydb.corpus
+
+        assert len(corpus.poems_by_author("Emily Dickinson")) == 2
+        assert corpus.poems_by_author("Dickinson") == []
+
+
+class TestLocalPoetryDBServer:
+    """Tests for the local PoetryDB stand-in server."""
+
+    def test_title_search_and_output_fields(self, client):
+        response = client.get_by_title("ozymandias", "title,linecount")
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [{"title": "Ozymandias", "linecount": "14"}]
+
+    def test_combined_search(self, client):
+        response = client.combined_search("title,author", "Winter;Shakespeare", "title")
+
+        titles = [poem["title"] for poem in response.json()]
+        assert titles == ["Winter", "Spring and Winter i", "Spring and Winter ii",
+                          "Blow, Blow, Thou Winter Wind",
+                          "Sonnet 2: When forty winters shall besiege thy brow"]
+
+    def test_absolute_match(self, client):
+        response = client.get_by_title("Winter:abs", "author")
+
+        assert response.json() == [{"author": "William Shakespeare"}]
+
+    def test_text_output(self, client):
+        response = client.get_by_author("Robert Frost", "title,linecount.text")
+
+        assert response.text == "title\nNothing Gold Can Stay\nlinecount\n8\n"
+
+    def test_listings_and_not_found(self, client):
+        assert "Emily Dickinson" in client.list_authors().json()["authors"]
+        assert client.get_by_title("No Such Poem").json() == NOT_FOUND
+        assert client.combined_search("title,author", "Winter").json()["status"] == 405
+
+    def test_random(self, client):
+        response = client.get_random(20, "title")
+
+        titles = [poem["title"] for poem in response.json()]
+        assert len(titles) == len(set(titles)) == 14
@@ -0,0 +1,96 @@
+from functools import partial
+
+import pytest
+import requests
+from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA
+from utilities.api_client import PoetryDBClient
+from utilities.parallel_validation import LINECOUNT, RESPONSE, SCHEMA, ValidationPipeline
+
+
+POEMS = [
+    {"title": f"Poem {index}", "author": "John Clare", "lines": ["line"] * (index % 5), "linecount": str(index % 5)}
+    for index in range(40)
+]
+
+
+def broken_poems():
+    poems = [dict(poem) for poem in POEMS]
+    poems[3]["title"] = None
+    poems[17]["linecount"] = "9"
+    poems[17]["extra"] = True
+    poems[38]["linecount"] = "many"
+    return poems
+
+
+class TestValidationPipeline:
+    """Tests for chunked, multi-process validation."""
+
+    @pytest.mark.parametrize("processes", [0, 2])
+    def test_ordered_report(self, processes):
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=processes, chunk_size=7,
+                                check_linecount=True) as pipeline:
+            report = pipeline.validate(broken_poems(), source="dump")
+
+        assert report.poems == 40 and not report.ok
+        assert [(issue.index, issue.path, issue.kind) for issue in report.issues] == [
+            (3, "$[3].title", SCHEMA),
+            (17, "$[17]", SCHEMA),
+            (17, "$[17].linecount", LINECOUNT),
+            (38, "$[38].linecount", LINECOUNT),
+        ]
+        assert {issue.source for issue in report.issues} == {"dump"}
+
+    @pytest.mark.parametrize("processes", [0, 2])
+    def test_poem_order_without_linecount(self, processes):
+        poems = [dict(poem) for poem in POEMS]
+        poems[2]["title"] = None
+        poems[10]["author"] = None
+
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=processes, check_linecount=False) as pipeline:
+            report = pipeline.validate(poems)
+
+        assert [issue.path for issue in report.issues] == ["$[2].title", "$[10].author"]
+
+    def test_processes_match_inline(self):
+        poems = broken_poems() * 5
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=0, check_linecount=True) as inline, \
+                ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=2, chunk_size=11, check_linecount=True) as pool:
+            assert pool.validate(poems).issues == inline.validate(poems).issues
+
+    def test_workers_are_not_forked(self):
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=1) as pipeline:
+            assert pipeline.mp_context.get_start_method() != "fork"
+            assert pipeline.validate(POEMS).ok
+
+    def test_valid(self):
+        with ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=0, chunk_size=8) as pipeline:
+            report = pipeline.validate(POEMS)
+
+        assert report.ok and report.poems == 40
+
+    def test_run_fetches_in_source_order(self, stub_server):
+        stub_server.add("author/Clare", POEMS, delay=0.2)
+        stub_server.add("author/Broken", broken_poems())
+        stub_server.add("author/Nobody", {"status": 404, "reason": "Not found"})
+
+        with PoetryDBClient(base_url=stub_server.base_url) as client, \
+                ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=2, chunk_size=10) as pipeline:
+            report = pipeline.run({
+                author: partial(client.get_by_author, author) for author in ("Clare", "Broken", "Nobody")
+            })
+
+        assert report.sources == ["Clare", "Broken", "Nobody"]
+        assert report.poems == 80
+        grouped = report.by_source()
+        assert grouped["Clare"] == []
+        assert [issue.index for issue in grouped["Broken"]] == [3, 17]
+        assert [issue.kind for issue in grouped["Nobody"]] == [RESPONSE]
+        assert report.issues == grouped["Broken"] + grouped["Nobody"]
+
+    def test_http_error_raises(self, stub_server):
+        stub_server.add("author/Clare", {"status": 500}, status=500)
+
+        with PoetryDBClient(base_url=stub_server.base_url, retries=0) as client, \
+                ValidationPipeline(POEMS_ARRAY_SCHEMA, processes=0) as pipeline:
+            with pytest.raises(requests.HTTPError):
+                pipeline.run([("Clare", partial(client.get_by_author, "Clare"))])
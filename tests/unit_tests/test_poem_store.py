@@ -0,0 +1,98 @@
+import pytest
+from utilities.api_client import PoetryDBClient
+from utilities.poem_store import PoemStore, PoemStoreWriter, build_store, build_store_from_response
+from utilities.validators import validate_poem_linecount, validate_response_schema
+from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA
+
+
+@pytest.fixture
+def corpus_poems(local_poetrydb):
+    return [dict(poem) for poem in local_poetrydb.corpus.poems]
+
+
+@pytest.fixture
+def store(tmp_path, corpus_poems):
+    path = tmp_path / "corpus.store"
+    build_store(str(path), corpus_poems)
+    with PoemStore.open(str(path)) as store:
+        yield store
+
+
+class TestPoemStore:
+    """Tests for the memory-mapped poem store."""
+
+    def test_round_trip(self, store, corpus_poems):
+        assert len(store) == len(corpus_poems)
+        assert [record.to_dict() for record in store] == corpus_poems
+        assert list(store.iter_dicts()) == corpus_poems
+
+    def test_records_read_like_poems(self, store, corpus_poems):
+        record = store[-1]
+
+        assert record["title"] == corpus_poems[-1]["title"]
+        assert record.lines[-1] == corpus_poems[-1]["lines"][-1]
+        assert record.lines[:2] == corpus_poems[-1]["lines"][:2]
+        assert validate_poem_linecount(record)
+        with pytest.raises(KeyError):
+            record["extra"]
+
+    def test_authors_are_shared(self, store, corpus_poems):
+        dickinson = store.by_author("Emily Dickinson")
+
+        assert len(dickinson) == 2
+        assert dickinson[0].author is dickinson[1].author
+        assert len(store.authors) == len({poem["author"] for poem in corpus_poems})
+        assert store.by_author("Nobody") == []
+
+    def test_raw_lines_are_zero_copy(self, store, corpus_poems):
+        view = store[0].lines.raw(0)
+
+        assert isinstance(view, memoryview)
+        assert bytes(view) == corpus_poems[0]["lines"][0].encode("utf-8")
+        view.release()
+
+    def test_validates_against_schema(self, store):
+        validate_response_schema(store.iter_dicts(), POEMS_ARRAY_SCHEMA)
+
+    def test_non_ascii_and_empty_lines(self, tmp_path):
+        poems = [{"title": "Ç", "author": "Émile Verhaeren", "lines": ["", "été", ""], "linecount": "3"},
+                 {"title": "Empty", "author": "Émile Verhaeren", "lines": [], "linecount": "0"}]
+        path = str(tmp_path / "small.store")
+
+        assert build_store(path, poems) == 2
+        with PoemStore.open(path) as store:
+            assert [record.to_dict() for record in store] == poems
+
+    def test_empty_store(self, tmp_path):
+        path = str(tmp_path / "empty.store")
+        build_store(path, [])
+
+        with PoemStore.open(path) as store:
+            assert len(store) == 0
+            assert store.line_count == 0
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "other.json"
+        path.write_bytes(b"[]" * 40)
+
+        with pytest.raises(ValueError, match="not a version 1 poem store"):
+            PoemStore.open(str(path))
+
+    def test_failed_build_leaves_no_file(self, tmp_path):
+        path = tmp_path / "broken.store"
+
+        with pytest.raises(KeyError):
+            with PoemStoreWriter(str(path)) as writer:
+                writer.add({"title": "No author"})
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_build_from_streamed_response(self, tmp_path, local_poetrydb):
+        path = str(tmp_path / "shakespeare.store")
+
+        with PoetryDBClient(local_poetrydb.base_url) as client:
+            count = build_store_from_response(path, client.get_by_author("Shakespeare", stream=True))
+
+        with PoemStore.open(path) as store:
+            assert len(store) == count > 0
+            assert {record.author for record in store} == {"William Shakespeare"}
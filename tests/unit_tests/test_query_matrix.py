@@ -0,0 +1,140 @@
+import json
+
+import pytest
+from tests.schemas.poem_schema import POEM_SCHEMA
+from utilities import query_matrix as matrix_cli
+from utilities.api_client import PoetryDBClient
+from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+from utilities.query_matrix import Query, generate_queries, load_checkpoint, run_matrix
+from utilities.schema_registry import default_registry
+
+
+@pytest.fixture
+def corpus(local_poetrydb):
+    return local_poetrydb.corpus
+
+
+@pytest.fixture
+def client(local_poetrydb):
+    with PoetryDBClient(local_poetrydb.base_url) as client:
+        yield client
+
+
+class TestGenerateQueries:
+    """Tests for deriving the query matrix from a seed corpus."""
+
+    def test_unique_and_deterministic(self, corpus):
+        queries = generate_queries(corpus.poems, seed=3)
+
+        assert len(queries) > 1000
+        assert len({query.path for query in queries}) == len(queries)
+        assert queries == generate_queries(corpus.poems, seed=3)
+        assert generate_queries(corpus.poems, seed=3, limit=50) == queries[:50]
+
+    def test_covers_fields_formats_and_abs(self, corpus):
+        queries = generate_queries(corpus.poems)
+        shapes = {query.shape for query in queries}
+
+        assert "title:abs/title" in shapes
+        assert "lines/author,lines,linecount.text" in shapes
+        assert "author:abs,linecount/title,author" in shapes
+        assert {len(query.criteria) for query in queries} == {1, 2}
+
+    def test_without_text_terms(self, corpus):
+        queries = generate_queries(corpus.poems, text_terms=False)
+        terms = {(field, term) for query in queries for field, term in query.criteria}
+
+        assert {term for field, term in terms if field in ("lines", "linecount")} == {"qzxv", "99999"}
+        assert ("title", corpus.poems[0]["title"] + ":abs") in terms
+
+    def test_path(self):
+        query = Query((("title", "Winter"), ("author", "Shakespeare:abs")), ("title", "lines"), "text")
+
+        assert query.path == "title,author/Winter;Shakespeare:abs/title,lines.text"
+        assert query.shape == "title,author:abs/title,lines.text"
+
+
+class TestRunMatrix:
+    """Tests for running and checking the matrix."""
+
+    def test_local_server_passes(self, client, corpus):
+        queries = generate_queries(corpus.poems, limit=400)
+
+        report = run_matrix(client, queries + queries[:10], corpus, POEM_SCHEMA)
+
+        assert report.ok, report.format()
+        assert report.planned == report.run == report.passed == 400
+
+    def test_detects_wrong_results(self, corpus):
+        """A server whose corpus lost a poem fails the queries that should find it."""
+        with LocalPoetryDBServer(PoemCorpus(corpus.poems[1:])) as server, \
+                PoetryDBClient(server.base_url) as client:
+            missing = corpus.poems[0]
+            queries = [Query((("title", missing["title"] + ":abs"),), ("title", "lines"), output_format)
+                       for output_format in ("json", "text")]
+
+            strict = run_matrix(client, queries, corpus, POEM_SCHEMA)
+            absent = run_matrix(client, [Query((("title", "qzxv"),), ("title",), "json")],
+                            PoemCorpus(corpus.poems[1:2]), POEM_SCHEMA)
+
+        assert [problem for _, problem in strict.failures] == ["not found, expected 1 poems"] * 2
+        assert absent.ok
+
+    def test_lenient_allows_extra_poems(self, client, corpus):
+        """Against a larger corpus than the seed, only missing poems fail."""
+        seed = PoemCorpus(corpus.poems[:1])
+        queries = [Query((("linecount", str(len(corpus.poems[0]["lines"]))),), ("title",), "json")]
+
+        assert run_matrix(client, queries, seed, POEM_SCHEMA, strict=False).ok
+
+    def test_lenient_ignores_seed_text(self, corpus):
+        """Against a server whose text differs from the seed, lenient runs match by title and author."""
+        upstream = [dict(corpus.poems[0], lines=["Retyped line"], linecount="1")] + corpus.poems[1:]
+        queries = [Query((("title", corpus.poems[0]["title"] + ":abs"),), fields, "json")
+                   for fields in [("title", "lines"), ("lines",), ("author", "linecount")]]
+
+        with LocalPoetryDBServer(PoemCorpus(upstream)) as server, \
+                PoetryDBClient(server.base_url) as client:
+            strict = run_matrix(client, queries, corpus, POEM_SCHEMA)
+            lenient = run_matrix(client, queries, corpus, POEM_SCHEMA, strict=False)
+
+        assert len(strict.failures) == 3
+        assert lenient.ok, lenient.format()
+
+    def test_projected_schemas_registered_once(self, client, corpus):
+        queries = generate_queries(corpus.poems, limit=100)
+        before = set(default_registry.stats())
+        run_matrix(client, queries, corpus, POEM_SCHEMA)
+        registered = set(default_registry.stats())
+
+        run_matrix(client, queries, corpus, POEM_SCHEMA)
+
+        assert set(default_registry.stats()) == registered
+        assert all(name.startswith("poem[") for name in registered - before)
+        assert "poem[title,lines]" in registered
+
+    def test_budget_and_resume(self, client, corpus, tmp_path):
+        checkpoint = str(tmp_path / "matrix.jsonl")
+        queries = generate_queries(corpus.poems, limit=60)
+
+        nothing = run_matrix(client, queries, corpus, POEM_SCHEMA, checkpoint, budget=0)
+        first = run_matrix(client, queries[:25], corpus, POEM_SCHEMA, checkpoint)
+        with open(checkpoint, "a", encoding="utf-8") as checkpoint_file:
+            checkpoint_file.write('{"path": "cut off')
+        second = run_matrix(client, queries, corpus, POEM_SCHEMA, checkpoint)
+
+        assert nothing.not_run == 60 and nothing.run == 0
+        assert first.run == 25
+        assert (second.resumed, second.run, second.passed) == (25, 35, 60)
+        assert set(load_checkpoint(checkpoint)) == {query.path for query in queries}
+
+    def test_cli(self, tmp_path, capsys):
+        corpus_path = tmp_path / "poems.json"
+        corpus_path.write_text(json.dumps([
+            {"title": "Winter", "author": "Anon", "lines": ["Cold wind blows", "Snow falls"], "linecount": "2"},
+        ]))
+
+        code = matrix_cli.main(["--local-corpus", str(corpus_path), "--limit", "40", "--json"])
+
+        assert code == 0
+        assert json.loads(capsys.readouterr().out)["passed"] == 40
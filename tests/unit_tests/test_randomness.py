@@ -0,0 +1,144 @@
+import random
+
+import pytest
+from utilities.api_client import PoetryDBClient
+from utilities.randomness import (
+    CONTINUE, INCONCLUSIVE, SKEWED, UNIFORM, CountTable, RandomnessAnalyzer, chi_square_sf,
+    required_samples, sample_key, sample_random,
+)
+
+
+class FakeResponse:
+    def __init__(self, poems):
+        self.poems = poems
+
+    def raise_for_status(self):
+        pass
+
+
+class SkewedClient:
+    """Serves /random from a corpus where the first poem is twice as likely."""
+
+    def __init__(self, population, seed=0):
+        self.poems = [{"title": f"Poem {index}", "author": "John Clare"} for index in range(population)]
+        self.weights = [2] + [1] * (population - 1)
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    def get_random(self, count, fields):
+        self.calls += 1
+        return FakeResponse(self.random.choices(self.poems, self.weights, k=count))
+
+    def json(self, response):
+        return response.poems
+
+
+class TestCountTable:
+    """Tests for the open-addressing sample counts."""
+
+    def test_counts_survive_growth(self):
+        table = CountTable(capacity=4)
+        keys = [sample_key({"title": f"Poem {index}", "author": "Anon"}) for index in range(500)]
+        for repeat in range(3):
+            for key in keys[:100 * (repeat + 1)]:
+                table.increment(key)
+
+        assert table.distinct == 300
+        assert [table.get(key) for key in keys[::100]] == [3, 2, 1, 0, 0]
+        assert sum(table.counts()) == 600
+
+
+class TestRandomnessAnalyzer:
+    """Tests for the online uniformity statistics."""
+
+    def test_statistics_match_recount(self):
+        rng = random.Random(3)
+        analyzer = RandomnessAnalyzer(population=50)
+        for _ in range(200):
+            analyzer.add_response([{"title": f"Poem {rng.randrange(50)}", "author": "Anon"}])
+
+        counts = list(analyzer.table.counts())
+        assert analyzer.samples == sum(counts) == 200
+        assert analyzer.singletons == counts.count(1)
+        assert analyzer.doubletons == counts.count(2)
+        assert analyzer.collisions == sum(count * (count - 1) // 2 for count in counts)
+        expected = sum((count - 4) ** 2 / 4 for count in counts) + 4 * (50 - len(counts))
+        assert analyzer.chi_square == pytest.approx(expected)
+        assert 20 < analyzer.estimated_population() < 120
+
+    def test_chi_square_sf(self):
+        # Reference values from the series expansion of the regularized gamma function
+        assert chi_square_sf(124.3, 100) == pytest.approx(0.05027, abs=0.001)
+        assert chi_square_sf(3010, 3009) == pytest.approx(0.49143, abs=0.001)
+        assert chi_square_sf(20, 13) == pytest.approx(0.09521, abs=0.001)
+        assert chi_square_sf(0, 10) == 1.0
+
+    def test_required_samples(self):
+        assert required_samples(14, 0.1, 0.01, 0.9) > 5 * 14
+        assert required_samples(3000, 0.3, 0.01, 0.9) == 5 * 3000
+        assert required_samples(3000, 0.05, 0.01, 0.9) > required_samples(3000, 0.1, 0.01, 0.9)
+
+    def test_within_response_duplicates_are_skewed(self):
+        analyzer = RandomnessAnalyzer(population=10, min_samples=4)
+        analyzer.add_response([{"title": "A", "author": "Anon"}] * 2 + [{"title": "B", "author": "Anon"}] * 2)
+
+        assert analyzer.within_response_duplicates == 2
+        assert analyzer.decision() == SKEWED
+
+    def test_waits_for_next_look(self):
+        analyzer = RandomnessAnalyzer(population=100)
+
+        analyzer.add_response([{"title": "A", "author": "Anon"}])
+
+        assert analyzer.decision() == CONTINUE
+        assert analyzer.finish() == analyzer.decision() == INCONCLUSIVE
+        assert RandomnessAnalyzer().decision() == INCONCLUSIVE
+
+    @pytest.mark.parametrize("population", [0, 1])
+    def test_rejects_degenerate_population(self, population):
+        with pytest.raises(ValueError):
+            RandomnessAnalyzer(population=population)
+
+
+class TestSampleRandom:
+    """Tests for concurrent sampling with early stopping."""
+
+    def test_local_server_is_uniform(self, local_poetrydb):
+        analyzer = RandomnessAnalyzer(population=len(local_poetrydb.corpus))
+
+        with PoetryDBClient(base_url=local_poetrydb.base_url) as client:
+            sample_random(client, analyzer, per_request=3, max_samples=50000, max_workers=4)
+
+        assert analyzer.decision() == UNIFORM, analyzer.format()
+        assert analyzer.samples < 50000
+        assert analyzer.table.distinct == len(local_poetrydb.corpus)
+        assert analyzer.to_dict()["coverage"] == 1.0
+
+    def test_skew_stops_early(self):
+        client = SkewedClient(population=200)
+        analyzer = RandomnessAnalyzer(population=200, effect=0.05)
+
+        sample_random(client, analyzer, per_request=20, max_samples=200000, max_workers=2)
+
+        assert analyzer.decision() == SKEWED, analyzer.format()
+        assert analyzer.samples < analyzer.required
+        assert client.calls * 20 == analyzer.samples
+
+    def test_sample_cap(self):
+        client = SkewedClient(population=200)
+        analyzer = RandomnessAnalyzer()
+
+        sample_random(client, analyzer, per_request=7, max_samples=100, max_workers=3)
+
+        assert 100 <= analyzer.samples < 107
+        assert analyzer.decision() == INCONCLUSIVE
+        assert "p=" not in analyzer.format()
+
+    def test_sample_cap_before_verdict_is_inconclusive(self):
+        client = SkewedClient(population=200)
+        analyzer = RandomnessAnalyzer(population=200)
+
+        sample_random(client, analyzer, per_request=10, max_samples=100, max_workers=2)
+
+        assert analyzer.samples == 100
+        assert analyzer.decision() == INCONCLUSIVE
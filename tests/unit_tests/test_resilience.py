@@ -0,0 +1,194 @@
+import asyncio
+from email.utils import formatdate
+
+import pytest
+import requests
+from utilities.api_client import PoetryDBClient
+from utilities.async_api_client import AsyncPoetryDBClient
+from utilities.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    AdaptiveRateLimiter,
+    CircuitBreaker,
+    CircuitOpenError,
+    parse_retry_after,
+)
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep moves time forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+class TestAdaptiveRateLimiter:
+    """Tests for the AIMD token bucket."""
+
+    def test_burst_then_paced(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+
+        waits = [limiter.acquire() for _ in range(4)]
+
+        assert waits[:2] == [0.0, 0.0]
+        assert waits[2:] == pytest.approx([0.1, 0.1])
+
+    def test_throttling_pauses_and_halves_rate(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10, clock=clock, sleep=clock.sleep)
+
+        limiter.feedback(429, retry_after="2")
+
+        assert limiter.rate == 5
+        assert limiter.acquire() == pytest.approx(2.0)
+        assert limiter.stats["throttled"] == 1
+
+    def test_additive_increase_once_per_interval(self, clock):
+        limiter = AdaptiveRateLimiter(rate=10, increase=2, adjust_interval=1.0, clock=clock, sleep=clock.sleep)
+
+        for _ in range(5):
+            limiter.feedback(200, latency=0.01)
+        clock.now += 1.0
+        limiter.feedback(200, latency=0.01)
+
+        assert limiter.rate == 14
+
+    def test_slow_responses_decrease_within_bounds(self, clock):
+        limiter = AdaptiveRateLimiter(rate=1, min_rate=0.5, latency_target=0.2, adjust_interval=0,
+                                      clock=clock, sleep=clock.sleep)
+
+        for _ in range(3):
+            limiter.feedback(200, latency=1.0)
+
+        assert limiter.rate == 0.5
+        assert limiter.stats["slow"] == 3
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3.0
+        assert parse_retry_after(formatdate(1030.0, usegmt=True), now=1000.0) == 30.0
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(None) is None
+
+
+class TestCircuitBreaker:
+    """Tests for the per-endpoint circuit breaker."""
+
+    def test_opens_probes_and_closes(self, clock):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+
+        for _ in range(2):
+            breaker.before("title")
+            breaker.record("title", False)
+
+        assert breaker.state("title") == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before("title")
+        breaker.before("author")
+
+        clock.now += 10
+        breaker.before("title")
+        assert breaker.state("title") == HALF_OPEN
+        with pytest.raises(CircuitOpenError, match="probe in flight"):
+            breaker.before("title")
+        breaker.record("title", True)
+        assert breaker.states() == {"title": CLOSED, "author": CLOSED}
+
+    def test_failed_probe_reopens(self, clock):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record("random", False)
+        clock.now += 5
+
+        breaker.before("random")
+        breaker.record("random", False)
+
+        assert breaker.state("random") == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before("random")
+
+
+class TestClientResilience:
+    """Tests for rate limiting and circuit breaking in the clients."""
+
+    def test_breaker_isolates_failing_endpoint(self, stub_server):
+        stub_server.add("title/Winter", {"reason": "down"}, status=500)
+        stub_server.add("author/Frost", [{"title": "Fire and Ice"}])
+        breaker = CircuitBreaker(failure_threshold=2)
+
+        with PoetryDBClient(stub_server.base_url, retries=0, circuit_breaker=breaker) as client:
+            for _ in range(2):
+                assert client.get_by_title("Winter").status_code == 500
+            with pytest.raises(CircuitOpenError):
+                client.get_by_title("Winter")
+            assert client.get_by_author("Frost").status_code == 200
+
+        assert stub_server.requests == ["title/Winter", "title/Winter", "author/Frost"]
+
+    def test_connection_errors_count_as_failures(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+
+        with PoetryDBClient("http://127.0.0.1:9/", retries=0, circuit_breaker=breaker) as client:
+            with pytest.raises(requests.ConnectionError):
+                client.get_by_title("Winter")
+
+        assert breaker.state("title") == OPEN
+
+    def test_other_errors_release_the_probe(self, stub_server, clock, monkeypatch):
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=5, clock=clock)
+        breaker.record("title", False)
+        clock.now += 5
+
+        def broken_hook(url, stream=False):
+            raise ValueError("decoder hook failed")
+
+        with PoetryDBClient(stub_server.base_url, retries=0, circuit_breaker=breaker) as client:
+            with monkeypatch.context() as patch:
+                patch.setattr(client, "_send", broken_hook)
+                with pytest.raises(ValueError):
+                    client.get_by_title("Winter")
+            assert breaker.state("title") == OPEN
+
+            clock.now += 5
+            assert client.get_by_title("Winter").status_code == 200
+
+        assert breaker.state("title") == CLOSED
+
+    def test_retried_429_feeds_the_limiter(self, stub_server):
+        stub_server.add("title/Winter", {"reason": "slow down"}, status=429, headers={"Retry-After": "0"})
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+        limiter = AdaptiveRateLimiter(rate=50)
+
+        with PoetryDBClient(stub_server.base_url, rate_limiter=limiter) as client:
+            assert client.get_by_title("Winter").status_code == 200
+
+        assert limiter.stats["throttled"] == 1
+        assert limiter.rate == 25
+        assert limiter.stats["acquired"] == 2
+
+    def test_shared_between_sync_and_async_clients(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}])
+        limiter = AdaptiveRateLimiter(rate=1000)
+        breaker = CircuitBreaker()
+
+        async def fetch():
+            async with AsyncPoetryDBClient(stub_server.base_url, rate_limiter=limiter,
+                                           circuit_breaker=breaker) as client:
+                return await client.gather_many([("get_by_title", "Winter")] * 3)
+
+        with PoetryDBClient(stub_server.base_url, rate_limiter=limiter, circuit_breaker=breaker) as client:
+            client.get_by_title("Winter")
+        asyncio.run(fetch())
+
+        assert limiter.stats["acquired"] == 4
+        assert breaker.state("title") == CLOSED
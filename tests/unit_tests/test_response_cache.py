@@ -0,0 +1,139 @@
+import os
+import time
+
+import pytest
+from http import HTTPStatus
+from utilities.api_client import PoetryDBClient
+from utilities.response_cache import (
+    PASSTHROUGH,
+    REPLAY,
+    CacheMiss,
+    DiskStore,
+    MemoryTier,
+    ResponseCache,
+    normalize_url,
+)
+
+
+class TestNormalizeUrl:
+    """Tests for cache key normalization."""
+
+    @pytest.mark.parametrize("url", [
+        "HTTPS://PoetryDB.org:443/title/Winter%20Wind",
+        "https://poetrydb.org/title/Winter Wind#top",
+        "https://poetrydb.org/title/Winter%20Wind",
+    ])
+    def test_equivalent_spellings(self, url):
+        assert normalize_url(url) == "https://poetrydb.org/title/Winter%20Wind"
+
+    def test_query_order_and_ports(self):
+        assert normalize_url("http://h:8000/a?b=2&a=1") == "http://h:8000/a?a=1&b=2"
+        assert normalize_url("http://h:8000/a") != normalize_url("http://h:8001/a")
+
+
+class TestResponseCache:
+    """Tests for the record/replay response cache."""
+
+    def test_record_then_replay_from_disk(self, stub_server, tmp_path):
+        stub_server.add("title/Ozymandias", [{"title": "Ozymandias"}])
+
+        with PoetryDBClient(stub_server.base_url, cache=ResponseCache(str(tmp_path))) as client:
+            first = client.get_by_title("Ozymandias")
+            second = client.get_by_title("Ozymandias")
+        replay = ResponseCache(str(tmp_path), mode=REPLAY)
+        with PoetryDBClient(stub_server.base_url, cache=replay) as client:
+            third = client.get_by_title("Ozymandias")
+            with pytest.raises(CacheMiss):
+                client.get_by_title("Winter")
+
+        assert len(stub_server.requests) == 1
+        assert first.json() == second.json() == third.json() == [{"title": "Ozymandias"}]
+        assert third.status_code == HTTPStatus.OK
+        assert third.headers["Content-Type"] == "application/json"
+        assert replay.stats["disk_hits"] == 1
+
+    def test_random_opts_out_by_default(self, stub_server):
+        stub_server.add("random/1/title", [{"title": "Winter"}])
+        cache = ResponseCache()
+
+        with PoetryDBClient(stub_server.base_url, cache=cache) as client:
+            client.get_random(1, "title")
+            client.get_random(1, "title")
+
+        assert len(stub_server.requests) == 2
+        assert cache.stats["bypassed"] == 2
+        assert ResponseCache(cache_random=True).cacheable("random/1/title")
+
+    def test_passthrough_and_errors_not_stored(self, stub_server):
+        stub_server.add("title/Winter", {"reason": "down"}, status=503)
+        cache = ResponseCache()
+
+        with PoetryDBClient(stub_server.base_url, cache=cache, retries=0) as client:
+            client.get_by_title("Winter")
+            client.get_by_title("Winter")
+        assert cache.stats["stores"] == 0
+        assert not ResponseCache(mode=PASSTHROUGH).cacheable("title/Winter")
+
+    def test_streamed_response_bypasses_cache(self, stub_server):
+        stub_server.add("author/Frost", [{"title": "Nothing Gold Can Stay"}] * 1000)
+        cache = ResponseCache()
+
+        with PoetryDBClient(stub_server.base_url, cache=cache) as client:
+            streamed = client.get_by_author("Frost", stream=True)
+            assert not streamed._content_consumed
+            next(streamed.iter_content(64))
+            streamed.close()
+            client.get_by_author("Frost", stream=True).close()
+
+        assert len(stub_server.requests) == 2
+        assert cache.stats["stores"] == cache.stats["misses"] == 0
+
+
+class TestTiers:
+    """Tests for TTL and LRU eviction in both tiers."""
+
+    def entry(self, age=0):
+        return {"status_code": 200, "stored_at": time.time() - age}
+
+    def test_memory_lru_and_ttl(self):
+        tier = MemoryTier(max_entries=3, ttl=60)
+        tier.put("a", self.entry())
+        tier.put("b", self.entry())
+        tier.get("a")
+        tier.put("c", self.entry())
+        tier.put("old", self.entry(age=120))
+
+        assert tier.get("b") is None
+        assert tier.get("old") is None
+        assert tier.get("a") is not None
+
+    def test_disk_lru_and_ttl(self, tmp_path):
+        store = DiskStore(str(tmp_path), max_entries=2, ttl=60)
+        store.put("a", self.entry())
+        store.put("b", self.entry())
+        past = time.time() - 30
+        os.utime(store.path("a"), (past, past))
+        os.utime(store.path("b"), (past - 1, past - 1))
+        store.get("a")
+        store.put("c", self.entry())
+
+        assert len(store) == 2
+        assert store.get("b") is None
+        assert store.get("a") is not None
+        store.put("old", self.entry(age=120))
+        assert store.get("old") is None
+
+    def test_disk_evicts_in_batches(self, tmp_path, monkeypatch):
+        store = DiskStore(str(tmp_path), max_entries=100)
+        listings = []
+        files = store._files
+        monkeypatch.setattr(store, "_files", lambda: listings.append(None) or files())
+        for index in range(200):
+            store.put(f"key{index}", self.entry())
+            past = time.time() - 1000 + index
+            os.utime(store.path(f"key{index}"), (past, past))
+
+        assert len(listings) == 10
+        assert 90 <= len(store) <= 100
+        assert store.get("key199") is not None
+        assert store.get("key0") is None
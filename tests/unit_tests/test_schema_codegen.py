@@ -0,0 +1,82 @@
+import jsonschema
+import pytest
+from tests.schemas import poem_schema
+from tests.schemas.poem_schema import POEM_SCHEMA, POEMS_ARRAY_SCHEMA, TITLE_ONLY_ARRAY_SCHEMA
+from utilities.schema_codegen import build_fast_check
+from utilities.schema_registry import SchemaRegistry
+
+
+POEM = {
+    "title": "Ozymandias",
+    "author": "Percy Bysshe Shelley",
+    "lines": ["I met a traveller from an antique land"],
+    "linecount": "1",
+}
+
+CASES = [
+    [POEM],
+    [dict(POEM, linecount=1)],
+    [],
+    [dict(POEM, title=None)],
+    [dict(POEM, lines="not a list")],
+    [dict(POEM, lines=["ok", 3])],
+    [dict(POEM, extra="field")],
+    [{key: value for key, value in POEM.items() if key != "author"}],
+    [dict(POEM, linecount=True)],
+    [dict(POEM, linecount=1.0)],
+    {"status": 404, "reason": "Not found"},
+    ["not an object"],
+]
+
+
+class TestSchemaCodegen:
+    """Tests for generated fast-path schema validators."""
+
+    @pytest.mark.parametrize("name", [name for name in vars(poem_schema) if name.endswith("_SCHEMA")])
+    def test_all_poem_schemas_supported(self, name):
+        """Every schema in poem_schema.py should get a fast path."""
+        assert build_fast_check(getattr(poem_schema, name)) is not None
+
+    @pytest.mark.parametrize("instance", CASES)
+    def test_never_accepts_invalid_data(self, instance):
+        """The fast path may only say True when jsonschema agrees."""
+        fast_check = build_fast_check(POEMS_ARRAY_SCHEMA)
+        valid = jsonschema.Draft202012Validator(POEMS_ARRAY_SCHEMA).is_valid(instance)
+
+        if fast_check(instance):
+            assert valid
+        elif valid:
+            # Conservative rejections must still pass the full fallback
+            SchemaRegistry().validate(instance, POEMS_ARRAY_SCHEMA)
+
+    def test_optional_properties(self):
+        """Optional properties are only type-checked when present."""
+        schema = {
+            "type": "object",
+            "required": ["title"],
+            "properties": {"title": {"type": "string"}, "linecount": {"type": "integer"}},
+            "additionalProperties": False,
+        }
+        fast_check = build_fast_check(schema)
+
+        assert fast_check({"title": "Winter"})
+        assert fast_check({"title": "Winter", "linecount": 18})
+        assert not fast_check({"title": "Winter", "linecount": "18"})
+        assert not fast_check({"title": "Winter", "author": "x"})
+
+    def test_unsupported_keywords(self):
+        """Schemas outside the supported subset get no fast path."""
+        assert build_fast_check({"type": "string", "minLength": 1}) is None
+        assert build_fast_check({"type": "array", "items": {"enum": [1]}}) is None
+
+    def test_registry_falls_back_for_precise_errors(self):
+        """A fast-path miss should surface the full validator's error."""
+        registry = SchemaRegistry()
+        registry.validate([POEM], POEMS_ARRAY_SCHEMA)
+
+        with pytest.raises(jsonschema.ValidationError) as excinfo:
+            registry.validate([{"title": 5}], TITLE_ONLY_ARRAY_SCHEMA)
+
+        assert excinfo.value.json_path == "$[0].title"
+        assert registry.stats()[registry.compile(POEMS_ARRAY_SCHEMA).name]["fast_path_hits"] == 1
+        assert registry.collect_errors(POEM, POEM_SCHEMA) == []
@@ -0,0 +1,113 @@
+import jsonschema
+import pytest
+from tests.schemas import poem_schema
+from tests.schemas.poem_schema import POEM_SCHEMA, POEMS_ARRAY_SCHEMA
+from utilities.schema_registry import SchemaRegistry
+from utilities.validators import collect_schema_errors, validate_response_schema
+
+
+POEM = {
+    "title": "Ozymandias",
+    "author": "Percy Bysshe Shelley",
+    "lines": ["I met a traveller from an antique land"],
+    "linecount": "1",
+}
+
+
+class TestSchemaRegistry:
+    """Tests for the compiled, cached schema validator registry."""
+
+    def test_schema_compiled_once(self):
+        """Repeated lookups should return the same compiled validator."""
+        registry = SchemaRegistry()
+        compiled = registry.compile(POEM_SCHEMA)
+
+        assert registry.compile(POEM_SCHEMA) is compiled
+        assert registry.compile(dict(POEM_SCHEMA)) is not compiled
+
+    def test_picks_draft_from_schema(self):
+        """The declared $schema should decide the validator class."""
+        registry = SchemaRegistry()
+        schema = {"$schema": "http://json-schema.org/draft-07/schema#", "type": "string"}
+
+        assert isinstance(registry.compile(schema).validator, jsonschema.Draft7Validator)
+        assert isinstance(registry.compile(POEM_SCHEMA).validator, jsonschema.Draft202012Validator)
+
+    def test_invalid_schema_rejected(self):
+        """Schemas are checked against their metaschema when compiled."""
+        with pytest.raises(jsonschema.exceptions.SchemaError):
+            SchemaRegistry().compile({"type": "no-such-type"})
+
+    def test_fast_fail_and_collect_all(self):
+        """Fast-fail raises one error; collect-all returns every error in path order."""
+        registry = SchemaRegistry()
+        poems = [dict(POEM), dict(POEM, title=1), dict(POEM, linecount=None)]
+
+        with pytest.raises(jsonschema.ValidationError):
+            registry.validate(poems, POEMS_ARRAY_SCHEMA)
+        errors = registry.collect_errors(poems, POEMS_ARRAY_SCHEMA)
+
+        assert [error.json_path for error in errors] == ["$[1].title", "$[2].linecount"]
+
+    def test_collect_all_orders_indexes_numerically(self):
+        """Errors come back in document order, so $[2] precedes $[10]."""
+        poems = [dict(POEM) for _ in range(12)]
+        poems[2]["title"] = 1
+        poems[10]["author"] = None
+        poems[10]["title"] = 2
+
+        errors = SchemaRegistry(fast_path=False).collect_errors(poems, POEMS_ARRAY_SCHEMA)
+
+        assert [error.json_path for error in errors] == ["$[2].title", "$[10].author", "$[10].title"]
+
+    def test_register_module_names_and_stats(self):
+        """Module schemas are reported under their constant names with timings."""
+        registry = SchemaRegistry()
+        registry.register_module(poem_schema)
+        registry.validate([POEM], POEMS_ARRAY_SCHEMA)
+        registry.collect_errors({}, POEM_SCHEMA)
+
+        stats = registry.stats()
+        assert stats["POEMS_ARRAY_SCHEMA"]["calls"] == 1
+        assert stats["POEM_SCHEMA"]["failures"] == 1
+        assert "POEMS_ARRAY_SCHEMA" in registry.report()
+
+    def test_validators_use_registry(self):
+        """The public validators should keep their behaviour."""
+        validate_response_schema([POEM], POEMS_ARRAY_SCHEMA)
+        assert collect_schema_errors([POEM], POEMS_ARRAY_SCHEMA) == []
+        with pytest.raises(jsonschema.ValidationError):
+            validate_response_schema([{"title": "x"}], POEMS_ARRAY_SCHEMA)
+
+    def test_disk_cache_defers_full_validator(self, tmp_path):
+        """A schema found in the cache loads its fast path and builds its validator on first failure."""
+        unsupported = {"type": "string", "minLength": 1}
+        SchemaRegistry(cache_dir=str(tmp_path)).compile(POEMS_ARRAY_SCHEMA)
+        SchemaRegistry(cache_dir=str(tmp_path)).compile(unsupported)
+        assert len(list(tmp_path.iterdir())) == 2
+
+        registry = SchemaRegistry(cache_dir=str(tmp_path))
+        compiled = registry.compile(POEMS_ARRAY_SCHEMA)
+        assert compiled._validator is None and compiled.fast_check is not None
+        registry.validate([POEM], POEMS_ARRAY_SCHEMA)
+        assert compiled._validator is None
+        assert [error.json_path for error in registry.collect_errors([{"title": 1}], POEMS_ARRAY_SCHEMA)] == [
+            error.json_path for error in SchemaRegistry().collect_errors([{"title": 1}], POEMS_ARRAY_SCHEMA)
+        ]
+        assert isinstance(compiled.validator, jsonschema.Draft202012Validator)
+        assert registry.compile(unsupported).fast_check is None
+        with pytest.raises(jsonschema.ValidationError):
+            registry.validate("", unsupported)
+
+    def test_disk_cache_ignores_corrupt_entries(self, tmp_path):
+        """Unreadable entries are rebuilt, and invalid schemas are never cached."""
+        SchemaRegistry(cache_dir=str(tmp_path)).compile(POEM_SCHEMA)
+        entry = next(tmp_path.iterdir())
+        entry.write_bytes(b"not marshal data")
+
+        compiled = SchemaRegistry(cache_dir=str(tmp_path)).compile(POEM_SCHEMA)
+
+        assert compiled._validator is not None and compiled.fast_check(POEM)
+        with pytest.raises(jsonschema.exceptions.SchemaError):
+            SchemaRegistry(cache_dir=str(tmp_path)).compile({"type": "no-such-type"})
+        assert len(list(tmp_path.iterdir())) == 1
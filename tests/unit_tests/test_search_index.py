@@ -0,0 +1,85 @@
+import random
+
+import pytest
+from utilities.poetrydb_query import NOT_FOUND, QueryError, matches_all
+from utilities.query_matrix import generate_queries
+from utilities.search_index import PoemIndex, pack, tokenize, unpack
+from utilities.snapshot import Snapshot, content_hash
+
+
+@pytest.fixture(scope="module")
+def index(local_poetrydb):
+    return PoemIndex(local_poetrydb.corpus.poems)
+
+
+def scan(index, criteria):
+    return [poem for poem in index.poems if matches_all(poem, criteria)]
+
+
+class TestPoemIndex:
+    """Tests for the offline inverted index."""
+
+    @pytest.mark.parametrize("criteria", [
+        [("title", "winter")],
+        [("title", "INTER")],
+        [("title", "Wi")],
+        [("title", "Winter:abs")],
+        [("title", "winter:abs")],
+        [("title", "blow, thou"), ("author", "Shakespeare")],
+        [("title", "Winter;Shakespeare")],
+        [("author", "william shakes")],
+        [("author", "William Shakespeare:abs")],
+        [("lines", "heigh-ho")],
+        [("lines", "o! the")],
+        [("lines", " ")],
+        [("lines", ","), ("linecount", "14")],
+        [("linecount", "14")],
+        [("linecount", "many")],
+        [("title", "Sonnet"), ("lines", "summer")],
+        [("title", "zzz")],
+    ])
+    def test_agrees_with_scan(self, index, criteria):
+        assert index.search(criteria) == scan(index, criteria)
+
+    def test_agrees_with_scan_on_query_matrix(self, index):
+        for criteria in {query.criteria for query in generate_queries(index.poems)}:
+            assert index.search(criteria) == scan(index, criteria), criteria
+
+    def test_agrees_with_scan_on_random_substrings(self, index):
+        """Fragments cut anywhere, across words and punctuation, match like PoetryDB."""
+        rng = random.Random(7)
+        texts = [(field, value) for poem in index.poems for field in ("title", "lines")
+                 for value in ([poem[field]] if field == "title" else poem[field]) if value]
+        for _ in range(2000):
+            field, value = rng.choice(texts)
+            start = rng.randrange(len(value))
+            term = value[start:start + rng.randint(1, 12)]
+            if "/" in term:
+                continue
+            assert index.search([(field, term)]) == scan(index, [(field, term)]), (field, term)
+
+    def test_positions(self, index):
+        for poem_id, line, position in index.positions("lines", "Winter"):
+            assert tokenize(index.poems[poem_id]["lines"][line])[position] == "winter"
+        assert index.positions("lines", "winter")
+        assert unpack(pack(12345, 678, 9)) == (12345, 678, 9)
+
+    def test_answer(self, index):
+        assert index.answer("title,author/Winter;Shakespeare/title") == [
+            {"title": poem["title"]} for poem in scan(index, [("title", "Winter"), ("author", "Shakespeare")])
+        ]
+        assert index.answer("/title/zzz") == NOT_FOUND
+        with pytest.raises(QueryError):
+            index.answer("title,author/Winter")
+
+    def test_from_snapshot(self, index):
+        snapshot = Snapshot()
+        for poem in index.poems:
+            poem_hash = content_hash(poem)
+            snapshot.poems[poem_hash] = poem
+            snapshot.authors.setdefault(poem["author"], {"poems": []})["poems"].append(poem_hash)
+
+        rebuilt = PoemIndex.from_snapshot(snapshot)
+
+        assert len(rebuilt) == len(index)
+        assert rebuilt.search([("author", "Dickinson")]) == index.search([("author", "Dickinson")])
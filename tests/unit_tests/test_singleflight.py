@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from utilities.api_client import PoetryDBClient
+from utilities.async_api_client import AsyncPoetryDBClient
+from utilities.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for coalescing concurrent identical requests."""
+
+    def test_threads_share_one_request(self, stub_server):
+        stub_server.add("author/Dickinson", [{"title": "Hope"}], delay=0.2)
+        single_flight = SingleFlight()
+
+        with PoetryDBClient(stub_server.base_url, single_flight=single_flight) as client:
+            with ThreadPoolExecutor(8) as pool:
+                responses = list(pool.map(lambda _: client.get_by_author("Dickinson"), range(8)))
+
+        assert len(stub_server.requests) == 1
+        assert all(response.json() == [{"title": "Hope"}] for response in responses)
+        assert single_flight.stats() == {"calls": 8, "executions": 1, "coalesced": 7, "in_flight": 0}
+
+    def test_random_not_coalesced(self, stub_server):
+        stub_server.add("random/1/title", [{"title": "Winter"}], delay=0.1)
+
+        with PoetryDBClient(stub_server.base_url, single_flight=SingleFlight()) as client:
+            with ThreadPoolExecutor(4) as pool:
+                list(pool.map(lambda _: client.get_random(1, "title"), range(4)))
+
+        assert len(stub_server.requests) == 4
+
+    def test_errors_reach_every_waiter(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            started.set()
+            release.wait()
+            raise ConnectionError("boom")
+
+        def call():
+            try:
+                single_flight.do("key", failing)
+            except ConnectionError as exc:
+                errors.append(exc)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=call) for _ in range(3)]
+        for follower in followers:
+            follower.start()
+        while single_flight.stats()["coalesced"] < 3:
+            time.sleep(0.001)
+        release.set()
+        for thread in [leader] + followers:
+            thread.join()
+
+        assert len(errors) == 4
+        assert single_flight.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_tasks_share_one_request(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}], delay=0.2)
+        single_flight = SingleFlight()
+
+        async with AsyncPoetryDBClient(stub_server.base_url, single_flight=single_flight) as client:
+            responses = await client.gather_many([("get_by_title", "Winter")] * 10)
+
+        assert len(stub_server.requests) == 1
+        assert {response.text for response in responses} == {'[{"title": "Winter"}]'}
+        assert single_flight.stats()["coalesced"] == 9
+
+    @pytest.mark.asyncio
+    async def test_async_keys_are_urls(self, stub_server):
+        stub_server.add("title/Winter", [{"title": "Winter"}], delay=0.2)
+        single_flight = SingleFlight()
+
+        async with AsyncPoetryDBClient(stub_server.base_url, single_flight=single_flight) as client:
+            await client.gather_many([("get_by_title", "Winter"), ("get_by_title", "Winter", None)])
+
+        assert len(stub_server.requests) == 1
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("sync_first", [True, False])
+    async def test_sync_and_async_clients_coalesce(self, stub_server, sync_first):
+        stub_server.add("title/Winter", [{"title": "Winter"}], delay=0.3)
+        single_flight = SingleFlight()
+
+        with PoetryDBClient(stub_server.base_url, single_flight=single_flight) as sync_client:
+            async with AsyncPoetryDBClient(stub_server.base_url, single_flight=single_flight) as client:
+                loop = asyncio.get_running_loop()
+                if sync_first:
+                    sync_call = loop.run_in_executor(None, sync_client.get_by_title, "Winter")
+                    await asyncio.sleep(0.1)
+                    responses = await client.gather_many([("get_by_title", "Winter")] * 3)
+                else:
+                    async_calls = asyncio.ensure_future(client.gather_many([("get_by_title", "Winter")] * 3))
+                    await asyncio.sleep(0.1)
+                    sync_call = loop.run_in_executor(None, sync_client.get_by_title, "Winter")
+                    responses = await async_calls
+                responses.append(await sync_call)
+
+        assert len(stub_server.requests) == 1
+        assert {response.text for response in responses} == {'[{"title": "Winter"}]'}
+        assert single_flight.stats() == {"calls": 4, "executions": 1, "coalesced": 3, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_async_errors_propagate(self):
+        single_flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ValueError("bad")
+
+        results = await asyncio.gather(
+            *(single_flight.do_async("key", failing) for _ in range(3)), return_exceptions=True
+        )
+
+        assert all(isinstance(result, ValueError) for result in results)
+        assert single_flight.stats()["executions"] == 1
@@ -0,0 +1,129 @@
+import copy
+import json
+
+import pytest
+from utilities import snapshot as snapshot_cli
+from utilities.api_client import PoetryDBClient
+from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+from utilities.snapshot import Snapshot, capture, content_hash, diff_snapshots
+
+
+@pytest.fixture
+def seed_poems(local_poetrydb):
+    return copy.deepcopy(local_poetrydb.corpus.poems)
+
+
+@pytest.fixture
+def server(seed_poems):
+    with LocalPoetryDBServer(PoemCorpus(seed_poems)) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with PoetryDBClient(server.base_url) as client:
+        yield client
+
+
+def edited(poems):
+    """Seed corpus with one poem added, one removed, one reworded and one lengthened."""
+    poems = copy.deepcopy(poems)
+    frost = next(poem for poem in poems if poem["author"] == "Robert Frost")
+    frost["lines"][0] = frost["lines"][0].upper()
+    ozymandias = next(poem for poem in poems if poem["title"] == "Ozymandias")
+    ozymandias["lines"].append("Added line")
+    removed = next(poem for poem in poems if poem["author"] == "Emily Dickinson")
+    poems.remove(removed)
+    poems.append({"title": "New Poem", "author": "William Blake", "lines": ["Tyger"], "linecount": "1"})
+    return poems, removed
+
+
+class TestCapture:
+    """Tests for capturing snapshots."""
+
+    def test_captures_every_author(self, client, seed_poems):
+        snapshot = capture(client)
+
+        assert len(snapshot) == len(seed_poems)
+        assert snapshot.meta["fetched"] == len(snapshot.authors)
+        assert all(content_hash(poem) == poem_hash for poem_hash, poem in snapshot.poems.items())
+        assert snapshot.poems_of("Emily Dickinson") == [
+            poem for poem in seed_poems if poem["author"] == "Emily Dickinson"
+        ]
+
+    def test_unchanged_authors_are_reused(self, client, server, seed_poems):
+        first = capture(client)
+        poems, _ = edited(seed_poems)
+        server.corpus = PoemCorpus(poems)
+
+        second = capture(client, previous=first)
+
+        # Frost's edit keeps titles and linecounts, so his fingerprint still matches
+        changed = {"Percy Bysshe Shelley", "Emily Dickinson", "William Blake"}
+        assert second.meta["fetched"] == len(changed & set(second.authors))
+        assert second.meta["reused"] == len(second.authors) - second.meta["fetched"]
+        assert capture(client, previous=first, verify=True).meta["reused"] == 0
+
+    def test_selected_authors(self, client):
+        snapshot = capture(client, authors=["Robert Frost", "Nobody"])
+
+        assert set(snapshot.authors) == {"Robert Frost", "Nobody"}
+        assert snapshot.poems_of("Nobody") == []
+
+    def test_save_and_load(self, client, tmp_path):
+        snapshot = capture(client)
+        path = str(tmp_path / "snapshot.json")
+
+        snapshot.save(path)
+
+        loaded = Snapshot.load(path)
+        assert loaded.authors == snapshot.authors
+        assert loaded.poems == snapshot.poems
+        assert not diff_snapshots(snapshot, loaded)
+
+
+class TestDiff:
+    """Tests for diffing snapshots."""
+
+    def test_reports_every_change(self, client, server, seed_poems):
+        first = capture(client)
+        poems, removed = edited(seed_poems)
+        server.corpus = PoemCorpus(poems)
+
+        diff = diff_snapshots(first, capture(client, verify=True))
+
+        assert [poem["title"] for poem in diff.added] == ["New Poem"]
+        assert diff.removed == [removed]
+        assert sorted(change.title for change in diff.changed) == ["Nothing Gold Can Stay", "Ozymandias"]
+        assert [(change.title, change.old["linecount"], change.new["linecount"])
+                for change in diff.linecount_changes] == [("Ozymandias", "14", "15")]
+        assert diff.authors_compared - diff.authors_skipped == 4
+
+    def test_repeated_titles(self):
+        def snapshot(poems):
+            hashes = [content_hash(poem) for poem in poems]
+            return Snapshot(
+                {"A": {"fingerprint": "", "digest": content_hash(hashes), "poems": hashes}},
+                dict(zip(hashes, poems)),
+            )
+
+        untitled = [{"title": "Untitled", "author": "A", "lines": [str(index)], "linecount": "1"}
+                    for index in range(3)]
+        reworded = copy.deepcopy(untitled)
+        reworded[1]["lines"] = ["x"]
+
+        diff = diff_snapshots(snapshot(untitled), snapshot(reworded[:2]))
+
+        assert [change.new["lines"] for change in diff.changed] == [["x"]]
+        assert diff.removed == [untitled[2]]
+
+    def test_cli(self, client, server, seed_poems, tmp_path, capsys):
+        old, new = str(tmp_path / "old.json"), str(tmp_path / "new.json")
+        assert snapshot_cli.main(["capture", old, "--base-url", server.base_url]) == 0
+        server.corpus = PoemCorpus(edited(seed_poems)[0])
+        assert snapshot_cli.main(["capture", new, "--base-url", server.base_url, "--previous", old]) == 0
+        capsys.readouterr()
+
+        assert snapshot_cli.main(["diff", old, new, "--json"]) == 1
+        assert len(json.loads(capsys.readouterr().out)["changed"]) == 1
+        assert snapshot_cli.main(["diff", old, old]) == 0
@@ -0,0 +1,57 @@
+import glob
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY_MODULES = ("requests", "urllib3", "jsonschema", "asyncio", "multiprocessing")
+
+
+def loaded_after(code):
+    """Run code in a fresh interpreter and return the heavy modules it imported."""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+class TestStartup:
+    """Guards against start-up regressions of the test harness (see benchmarks.bench_startup)."""
+
+    def test_harness_import_is_light(self):
+        assert loaded_after(
+            "import tests.conftest, utilities.validators, utilities.api_client, utilities.query_matrix, utilities.metrics"
+        ) == []
+
+    def test_api_test_modules_import_light(self):
+        modules = [
+            os.path.relpath(path, ROOT)[:-len(".py")].replace(os.sep, ".")
+            for path in sorted(glob.glob(os.path.join(ROOT, "tests", "api_tests", "*.py")))
+        ]
+
+        assert "tests.api_tests.test_fault_profiles" in modules
+        assert loaded_after("import " + ", ".join(modules)) == []
+
+    def test_cached_schemas_validate_without_jsonschema(self, tmp_path):
+        code = (
+            "from tests.schemas import poem_schema\n"
+            "from utilities.schema_registry import SchemaRegistry\n"
+            f"registry = SchemaRegistry(cache_dir={str(tmp_path)!r})\n"
+            "registry.register_module(poem_schema)\n"
+            "registry.validate([{'title': 'x', 'author': 'y', 'lines': [], 'linecount': '0'}],"
+            " poem_schema.POEMS_ARRAY_SCHEMA)\n"
+        )
+        assert loaded_after(code) == ["jsonschema"]
+        assert loaded_after(code) == []
+
+    @pytest.mark.parametrize("module, name", [
+        ("utilities.resilience", "CircuitOpenError"),
+        ("utilities.resilience", "ThrottledRetry"),
+        ("utilities.instrumentation", "TimedHTTPAdapter"),
+    ])
+    def test_lazy_classes_still_exported(self, module, name):
+        from utilities import http_types
+
+        assert getattr(__import__(module, fromlist=[name]), name) is getattr(http_types, name)
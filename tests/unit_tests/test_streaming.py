@@ -0,0 +1,173 @@
+import json
+
+import jsonschema
+import pytest
+from tests.schemas.poem_schema import POEMS_ARRAY_SCHEMA
+from utilities.api_client import PoetryDBClient
+from utilities.poetrydb_query import format_text
+from utilities.streaming import iter_json_array, iter_lines, iter_poems, iter_text_poems, parse_text_poems
+from utilities.validators import (
+    iter_validated,
+    validate_text_format,
+    validate_poem_linecount,
+    validate_response_count,
+    validate_response_schema,
+)
+
+
+POEMS = [
+    {
+        "title": f"Poëm {index}",
+        "author": "Émile Verhaeren",
+        "lines": [f"line {line} — «{index}»" for line in range(index)],
+        "linecount": str(index),
+    }
+    for index in range(1, 30)
+]
+
+
+def chunked(data, size):
+    return (data[start:start + size] for start in range(0, len(data), size))
+
+
+class TestIterJsonArray:
+    """Tests for the incremental JSON array parser."""
+
+    @pytest.mark.parametrize("size", [1, 3, 7, 64, 100000])
+    def test_any_chunking(self, size):
+        """Elements are decoded correctly however the bytes are split."""
+        data = json.dumps(POEMS, ensure_ascii=False, indent=1).encode("utf-8")
+
+        assert list(iter_json_array(chunked(data, size))) == POEMS
+
+    @pytest.mark.parametrize("size", [1, 2, 5])
+    def test_scalars_split_across_chunks(self, size):
+        """Numbers and literals at a chunk boundary are not cut short."""
+        data = b'[12345, -6.5e3, true, null, "x", [], {}]'
+
+        assert list(iter_json_array(chunked(data, size))) == [12345, -6500.0, True, None, "x", [], {}]
+
+    def test_yields_before_document_ends(self):
+        """The first poem is available before later chunks are read."""
+        data = json.dumps(POEMS).encode("utf-8")
+        read = []
+
+        def chunks():
+            for chunk in chunked(data, 256):
+                read.append(chunk)
+                yield chunk
+
+        first = next(iter_json_array(chunks()))
+
+        assert first == POEMS[0]
+        assert len(read) < len(data) // 256
+
+    @pytest.mark.parametrize("data", [b"", b'{"status":404,"reason":"Not found"}', b"[1, 2",
+                                      b"[1 2]", b"[1] 2", b'[{"a": }]'])
+    def test_malformed(self, data):
+        """Anything but a complete JSON array is rejected."""
+        with pytest.raises(ValueError):
+            list(iter_json_array(chunked(data, 2)))
+
+    def test_empty_array(self):
+        assert list(iter_json_array([b" [ ", b"] "])) == []
+
+
+class TestStreamedValidation:
+    """Tests for validating streamed poems."""
+
+    def test_stream_from_client(self, stub_server):
+        """A streamed response validates and counts in a single pass."""
+        stub_server.add("author/Émile Verhaeren", POEMS)
+
+        with PoetryDBClient(base_url=stub_server.base_url) as client:
+            response = client.get_by_author("Émile Verhaeren", stream=True)
+            poems = iter_validated(iter_poems(response, chunk_size=512),
+                                   POEMS_ARRAY_SCHEMA, check_linecount=True)
+
+            assert validate_response_count(poems, len(POEMS))
+
+    def test_schema_error_reports_item_index(self):
+        poems = iter(POEMS[:3] + [dict(POEMS[0], title=None)])
+
+        with pytest.raises(jsonschema.ValidationError) as excinfo:
+            validate_response_schema(poems, POEMS_ARRAY_SCHEMA)
+
+        assert excinfo.value.json_path == "$[3].title"
+
+    def test_linecount_mismatch(self):
+        poems = iter([dict(POEMS[2], linecount="7")])
+
+        with pytest.raises(ValueError):
+            list(iter_validated(poems, check_linecount=True))
+
+    def test_count_and_linecount_accept_iterators(self):
+        assert validate_response_count(iter(POEMS), len(POEMS))
+        assert not validate_response_count(iter(POEMS), 3)
+        assert validate_poem_linecount(dict(POEMS[4], lines=iter(POEMS[4]["lines"])))
+
+
+def as_json_output(poems, fields):
+    return [{field: poem[field] for field in fields} for poem in poems]
+
+
+class TestTextFormat:
+    """Tests for parsing the .text output format."""
+
+    @pytest.mark.parametrize("fields", [
+        ("title",),
+        ("title", "author"),
+        ("lines",),
+        ("author", "lines"),
+        ("title", "author", "lines", "linecount"),
+    ])
+    def test_round_trip(self, fields):
+        """Parsed text equals the JSON output, with or without the requested fields."""
+        lines = format_text(POEMS, fields).splitlines()
+
+        assert list(parse_text_poems(lines, ",".join(fields) + ".text")) == as_json_output(POEMS, fields)
+        assert list(parse_text_poems(lines)) == as_json_output(POEMS, fields)
+
+    @pytest.mark.parametrize("size", [1, 3, 64])
+    def test_lines_across_chunks(self, size):
+        """Multi-byte characters and line breaks split between chunks are reassembled."""
+        text = format_text(POEMS, ("title", "lines")).replace("\n", "\r\n")
+
+        assert list(iter_lines(chunked(text.encode("utf-8"), size))) == text.split("\r\n")[:-1]
+
+    def test_stream_from_client(self, stub_server):
+        """A streamed .text response yields the same records as the JSON output."""
+        fields = ("title", "author", "lines", "linecount")
+        stub_server.add("author/Émile Verhaeren/all.text", format_text(POEMS, fields))
+
+        with PoetryDBClient(base_url=stub_server.base_url) as client:
+            response = client.get_by_author("Émile Verhaeren", "all.text", stream=True)
+            poems = iter_validated(iter_text_poems(response, "all.text", chunk_size=7),
+                                   POEMS_ARRAY_SCHEMA, check_linecount=True)
+
+            assert list(poems) == POEMS
+            assert response.raw.closed
+
+    @pytest.mark.parametrize("text", [
+        "Winter\n",
+        "title\nWinter\nauthor\n",
+        "author\nAnon\ntitle\nWinter\n",
+        "title\nWinter\nauthor\nAnon\ntitle\nSpring\n",
+    ])
+    def test_malformed(self, text):
+        """Unknown headers, missing values, bad order and incomplete poems are rejected."""
+        with pytest.raises(ValueError):
+            list(parse_text_poems(text.splitlines()))
+
+    def test_unrequested_field(self):
+        with pytest.raises(ValueError):
+            list(parse_text_poems(["author", "Anon"], "title.text"))
+
+    def test_validate_text_format(self):
+        text = format_text(POEMS, ("title", "author"))
+
+        assert validate_text_format(text, "title")
+        assert validate_text_format(text, "author")
+        assert not validate_text_format(text, "lines")
+        assert not validate_text_format("title\n", "title")
+        assert not validate_text_format("", "title")
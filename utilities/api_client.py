@@ -1,87 +1,316 @@
-import requests
+import os
+import threading
+import time
 from urllib.parse import urljoin
 
+from utilities.decoding import default_decoder
+from utilities.instrumentation import endpoint_name, timed_get
+
+
+def _with_output(endpoint, output_format):
+    return f"{endpoint}/{output_format}" if output_format else endpoint
+
+
+# Endpoint path of each endpoint method, from its arguments
+_ENDPOINT_PATHS = {
+    "get_by_title": lambda title, output_format=None: _with_output(f"title/{title}", output_format),
+    "get_by_author": lambda author, output_format=None: _with_output(f"author/{author}", output_format),
+    "get_random": lambda count, fields: f"random/{count}/{fields}",
+    "combined_search": lambda input_fields, search_terms, output_format=None: _with_output(
+        f"{input_fields}/{search_terms}", output_format),
+    "list_authors": lambda: "author",
+}
+
+
 class PoetryDBClient:
-    """Client for interacting with the PoetryDB API."""
-    
+    """Client for interacting with the PoetryDB API.
+
+    Requests go through a pooled ``requests.Session`` so that TCP/TLS
+    connections are kept alive and reused between calls. The client can be
+    used as a context manager to release the pool when done. requests is
+    imported when the first session is built, not with this module.
+    """
+
     BASE_URL = "https://poetrydb.org/"
-    
-    def __init__(self, base_url=None):
+
+    DEFAULT_POOL_SIZE = 10
+    DEFAULT_CONNECT_TIMEOUT = 3.05
+    DEFAULT_READ_TIMEOUT = 30
+    DEFAULT_RETRIES = 3
+    DEFAULT_BACKOFF_FACTOR = 0.3
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url=None, pool_size=DEFAULT_POOL_SIZE,
+                 connect_timeout=DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout=DEFAULT_READ_TIMEOUT, retries=DEFAULT_RETRIES,
+                 backoff_factor=DEFAULT_BACKOFF_FACTOR, keep_alive=True, cache=None,
+                 single_flight=None, instrumentation=None, rate_limiter=None,
+                 circuit_breaker=None, decoder=None):
         """Initialize the API client.
         
         Args:
             base_url (str, optional): Base URL for the API. Defaults to BASE_URL.
+            pool_size (int, optional): Maximum number of pooled connections per host
+            connect_timeout (float, optional): Seconds to wait for a connection
+            read_timeout (float, optional): Seconds to wait between bytes of the response
+            retries (int, optional): Retries for connection errors and 429/5xx responses
+            backoff_factor (float, optional): Exponential backoff factor between retries
+            keep_alive (bool, optional): Reuse connections between requests
+            cache (ResponseCache, optional): Record/replay cache consulted before the network
+            single_flight (SingleFlight, optional): Merges concurrent identical requests
+            instrumentation (Instrumentation, optional): Receives per-request timing events
+            rate_limiter (AdaptiveRateLimiter, optional): Paces requests and adapts to 429s
+                and latency; may be shared between clients
+            circuit_breaker (CircuitBreaker, optional): Fails fast on endpoints that keep
+                failing; may be shared between clients
+            decoder (object, optional): JSON decoder used by ``json``, see
+                utilities.decoding; defaults to the fastest one installed
         """
         self.base_url = base_url or self.BASE_URL
+        self.pool_size = pool_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.keep_alive = keep_alive
+        self.cache = cache
+        self.single_flight = single_flight
+        self.instrumentation = instrumentation
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker
+        self.decoder = decoder if decoder is not None else default_decoder()
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying session and all pooled connections."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+            self._session = None
+            self._session_pid = None
+
+    @property
+    def session(self):
+        """requests.Session: Pooled session, created on first use.
+
+        The session is rebuilt when the client is used from a different
+        process than the one that created it, so forked workers never share
+        sockets with their parent.
+        """
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def _build_session(self):
+        """Create a session with a retrying, pooled HTTP adapter.
+
+        Returns:
+            requests.Session: Configured session
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        from utilities.http_types import ThrottledRetry, TimedHTTPAdapter
+
+        retry_class = Retry if self.rate_limiter is None else ThrottledRetry
+        retry = retry_class(
+            total=self.retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.RETRY_STATUSES,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        if self.rate_limiter is not None:
+            retry.rate_limiter = self.rate_limiter
+        adapter_class = HTTPAdapter if self.instrumentation is None else TimedHTTPAdapter
+        adapter = adapter_class(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    @staticmethod
+    def endpoint(method_name, *args):
+        """Build the endpoint path an endpoint method requests, without sending it.
+        
+        Args:
+            method_name (str): Endpoint method, e.g. 'get_by_title'
+            *args: The method's arguments, without ``stream``
+            
+        Returns:
+            str: Endpoint path relative to the base URL
+            
+        Raises:
+            KeyError: If the method is not an endpoint method
+        """
+        return _ENDPOINT_PATHS[method_name](*args)
     
-    def get_by_title(self, title, output_format=None):
+    def get_by_title(self, title, output_format=None, stream=False):
         """Get poem(s) by title.
         
         Args:
             title (str): Title to search for
             output_format (str, optional): Output format (e.g., 'lines', 'author')
+            stream (bool, optional): Defer reading the body, see utilities.streaming
             
         Returns:
             requests.Response: API response
         """
-        endpoint = f"title/{title}"
-        if output_format:
-            endpoint = f"{endpoint}/{output_format}"
-        return self._make_request(endpoint)
+        return self._make_request(self.endpoint("get_by_title", title, output_format), stream=stream)
     
-    def get_by_author(self, author, output_format=None):
+    def get_by_author(self, author, output_format=None, stream=False):
         """Get poem(s) by author.
         
         Args:
             author (str): Author to search for
             output_format (str, optional): Output format (e.g., 'lines', 'title')
+            stream (bool, optional): Defer reading the body, see utilities.streaming
             
         Returns:
             requests.Response: API response
         """
-        endpoint = f"author/{author}"
-        if output_format:
-            endpoint = f"{endpoint}/{output_format}"
-        return self._make_request(endpoint)
+        return self._make_request(self.endpoint("get_by_author", author, output_format), stream=stream)
     
-    def get_random(self, count, fields):
+    def get_random(self, count, fields, stream=False):
         """Get random poem(s).
         
         Args:
             count (int): Number of random poems to retrieve
             fields (str): Comma-separated list of fields to include
+            stream (bool, optional): Defer reading the body, see utilities.streaming
             
         Returns:
             requests.Response: API response
         """
-        endpoint = f"random/{count}/{fields}"
-        return self._make_request(endpoint)
+        return self._make_request(self.endpoint("get_random", count, fields), stream=stream)
     
-    def combined_search(self, input_fields, search_terms, output_format=None):
+    def combined_search(self, input_fields, search_terms, output_format=None, stream=False):
         """Perform a combined search with multiple criteria.
         
         Args:
             input_fields (str): Comma-separated list of input fields
             search_terms (str): Semicolon-separated list of search terms
             output_format (str, optional): Output format specification
+            stream (bool, optional): Defer reading the body, see utilities.streaming
             
         Returns:
             requests.Response: API response
         """
-        endpoint = f"{input_fields}/{search_terms}"
-        if output_format:
-            endpoint = f"{endpoint}/{output_format}"
-        return self._make_request(endpoint)
+        endpoint = self.endpoint("combined_search", input_fields, search_terms, output_format)
+        return self._make_request(endpoint, stream=stream)
+    
+    def list_authors(self):
+        """Get the names of every author in the database.
+        
+        Returns:
+            requests.Response: API response holding ``{"authors": [...]}``
+        """
+        return self._make_request(self.endpoint("list_authors"))
     
-    def _make_request(self, endpoint):
+    def json(self, response, decoder=None):
+        """Decode a JSON response body, reporting the parse time to instrumentation.
+        
+        Args:
+            response (requests.Response): Response from one of the endpoint methods
+            decoder (object, optional): Decoder to use instead of the client's
+            
+        Returns:
+            object: Decoded JSON, or Poem records with a TypedPoemDecoder
+        """
+        decoder = decoder or self.decoder
+        if self.instrumentation is None:
+            return decoder.decode(response.content)
+        return self.instrumentation.parse(response, decoder.decode)
+    
+    def _make_request(self, endpoint, stream=False):
         """Make an API request.
         
         Args:
             endpoint (str): API endpoint to call
+            stream (bool, optional): Return before the body is downloaded
             
         Returns:
             requests.Response: API response
         """
         url = urljoin(self.base_url, endpoint)
-        response = requests.get(url)
-        return response 
\ No newline at end of file
+        send = lambda: self._send(url, stream)
+        if self.rate_limiter is not None or self.circuit_breaker is not None:
+            unguarded = send
+            send = lambda: self._guarded(endpoint, unguarded)
+        # A streamed body can only be read once and must not be buffered whole,
+        # so it is neither cached nor shared
+        if self.cache is not None and not stream:
+            fetch = send
+            send = lambda: self.cache.fetch(url, endpoint, fetch)
+        if self.single_flight is not None and not stream and self.single_flight.coalescible(endpoint):
+            shared = send
+            send = lambda: self.single_flight.do(url, shared)
+        if self.instrumentation is not None:
+            return self.instrumentation.request(endpoint, url, send)
+        return send()
+    
+    def _guarded(self, endpoint, send):
+        """Send a request through the circuit breaker and rate limiter.
+        
+        Args:
+            endpoint (str): API endpoint being called
+            send (callable): Performs the request and returns a requests.Response
+            
+        Returns:
+            requests.Response: API response
+            
+        Raises:
+            CircuitOpenError: If the endpoint's circuit is open
+        """
+        name = endpoint_name(endpoint)
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before(name)
+        try:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            started = time.perf_counter()
+            response = send()
+        except BaseException:
+            # Any failure must release a half-open probe, or the circuit stays stuck
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record(name, False)
+            raise
+        if self.rate_limiter is not None:
+            self.rate_limiter.feedback(response.status_code, time.perf_counter() - started,
+                                       response.headers.get("Retry-After"))
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record(name, response.status_code < 500)
+        return response
+    
+    def _send(self, url, stream=False):
+        """Send a GET request over the pooled session.
+        
+        Args:
+            url (str): Full URL to request
+            stream (bool, optional): Return before the body is downloaded
+            
+        Returns:
+            requests.Response: API response
+        """
+        if self.instrumentation is not None:
+            return timed_get(self.session, url, timeout=self.timeout, stream=stream)
+        return self.session.get(url, timeout=self.timeout, stream=stream) 
\ No newline at end of file
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from utilities.api_client import PoetryDBClient
+
+
+class AsyncPoetryDBClient:
+    """Asyncio client for the PoetryDB API.
+
+    Mirrors the endpoint methods of PoetryDBClient as coroutines. Calls are
+    dispatched to a private thread pool that shares one pooled session, so
+    connections to the host are reused, and a semaphore caps the number of
+    requests in flight at ``concurrency``. With a SingleFlight, concurrent
+    identical calls are merged before they take a slot.
+    """
+
+    DEFAULT_CONCURRENCY = 10
+    ENDPOINTS = ("get_by_title", "get_by_author", "get_random", "combined_search", "list_authors")
+
+    def __init__(self, base_url=None, concurrency=DEFAULT_CONCURRENCY, single_flight=None,
+                 **client_options):
+        """Initialize the async API client.
+
+        Args:
+            base_url (str, optional): Base URL for the API. Defaults to PoetryDBClient.BASE_URL.
+            concurrency (int, optional): Maximum number of requests in flight
+            single_flight (SingleFlight, optional): Merges concurrent identical calls;
+                may be shared with sync clients
+            **client_options: Extra transport options passed to PoetryDBClient
+        """
+        self.concurrency = concurrency
+        self.single_flight = single_flight
+        client_options.setdefault("pool_size", concurrency)
+        self._client = PoetryDBClient(base_url, **client_options)
+        self._executor = None
+        self._semaphore = None
+
+    @property
+    def base_url(self):
+        """str: Base URL for the API."""
+        return self._client.base_url
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Shut down the worker threads and close pooled connections."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            # Waiting for in-flight calls must not block the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, functools.partial(executor.shutdown, wait=True))
+        self._client.close()
+
+    async def get_by_title(self, title, output_format=None):
+        """Get poem(s) by title.
+
+        Args:
+            title (str): Title to search for
+            output_format (str, optional): Output format (e.g., 'lines', 'author')
+
+        Returns:
+            requests.Response: API response
+        """
+        return await self._call("get_by_title", title, output_format)
+
+    async def get_by_author(self, author, output_format=None):
+        """Get poem(s) by author.
+
+        Args:
+            author (str): Author to search for
+            output_format (str, optional): Output format (e.g., 'lines', 'title')
+
+        Returns:
+            requests.Response: API response
+        """
+        return await self._call("get_by_author", author, output_format)
+
+    async def get_random(self, count, fields):
+        """Get random poem(s).
+
+        Args:
+            count (int): Number of random poems to retrieve
+            fields (str): Comma-separated list of fields to include
+
+        Returns:
+            requests.Response: API response
+        """
+        return await self._call("get_random", count, fields)
+
+    async def combined_search(self, input_fields, search_terms, output_format=None):
+        """Perform a combined search with multiple criteria.
+
+        Args:
+            input_fields (str): Comma-separated list of input fields
+            search_terms (str): Semicolon-separated list of search terms
+            output_format (str, optional): Output format specification
+
+        Returns:
+            requests.Response: API response
+        """
+        return await self._call("combined_search", input_fields, search_terms, output_format)
+
+    async def list_authors(self):
+        """Get the names of every author in the database.
+
+        Returns:
+            requests.Response: API response holding ``{"authors": [...]}``
+        """
+        return await self._call("list_authors")
+
+    async def gather_many(self, requests, return_exceptions=False):
+        """Run many endpoint calls concurrently, bounded by ``concurrency``.
+
+        Args:
+            requests (iterable): ``(method_name, *args)`` tuples naming one of
+                ENDPOINTS, e.g.
+                ``("get_by_title", "Ozymandias")`` or ``("get_random", 5, "title")``
+            return_exceptions (bool, optional): Return exceptions in place of
+                responses instead of raising the first one
+
+        Returns:
+            list: Responses in the same order as ``requests``
+
+        Raises:
+            ValueError: If a method name is not one of ENDPOINTS
+        """
+        calls = []
+        for method_name, *args in requests:
+            if method_name not in self.ENDPOINTS:
+                raise ValueError(f"Unknown endpoint method: {method_name}")
+            calls.append(getattr(self, method_name)(*args))
+        return await asyncio.gather(*calls, return_exceptions=return_exceptions)
+
+    async def _call(self, method_name, *args):
+        """Run a PoetryDBClient method on the worker pool.
+
+        Args:
+            method_name (str): Name of the PoetryDBClient method
+            *args: Arguments for the method
+
+        Returns:
+            requests.Response: API response
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency, thread_name_prefix="poetrydb"
+            )
+        method = functools.partial(getattr(self._client, method_name), *args)
+        if self.single_flight is not None:
+            # Keyed by URL like PoetryDBClient, so sync and async callers coalesce
+            endpoint = self._client.endpoint(method_name, *args)
+            if self.single_flight.coalescible(endpoint):
+                url = urljoin(self.base_url, endpoint)
+                return await self.single_flight.do_async(url, lambda: self._run(method))
+        return await self._run(method)
+
+    async def _run(self, method):
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, method)
@@ -0,0 +1,178 @@
+"""Batch lookups planned into as few PoetryDB requests as its semantics allow.
+
+PoetryDB combines several input fields with AND, so two lookups can never
+be OR-ed into one request. What the planner can do is:
+
+* merge duplicate (field, term) lookups into one request, asking for the
+  union of their output fields
+* let a substring lookup cover every other lookup on the same field whose
+  term contains it (``Winter`` covers ``winter wind`` and ``Winter:abs``),
+  then filter the covering response locally with the API's own matching
+  rules from utilities.poetrydb_query
+
+The planned requests run concurrently and their responses are
+demultiplexed back to each original lookup.
+"""
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utilities.poetrydb_query import POEM_FIELDS, matches, parse_output, parse_term, project
+
+SUBSUMABLE_FIELDS = ("title", "author", "lines")
+
+
+class Lookup(namedtuple("Lookup", ["field", "term", "output"])):
+    """One (field, term) lookup and the output fields wanted from it.
+
+    ``output`` is a comma-separated string or iterable of fields; None
+    means every field.
+    """
+
+    def __new__(cls, field, term, output=None):
+        if output is None:
+            fields = POEM_FIELDS
+        elif isinstance(output, str):
+            fields = parse_output(output)[0]
+        else:
+            fields = tuple(field_name for field_name in POEM_FIELDS if field_name in output)
+        return super().__new__(cls, field, term, fields)
+
+
+class PlannedRequest:
+    """An upstream request and the lookups it answers."""
+
+    def __init__(self, field, term):
+        self.field = field
+        self.term = term
+        self.lookups = []
+
+    @property
+    def output(self):
+        """tuple: Output fields to request: those wanted plus any needed to filter."""
+        fields = {self.field} if self.filters else set()
+        for lookup in self.lookups:
+            fields.update(lookup.output)
+        return tuple(field for field in POEM_FIELDS if field in fields)
+
+    @property
+    def filters(self):
+        """bool: True if some lookup must be filtered out of this response locally."""
+        return any(lookup.term != self.term for lookup in self.lookups)
+
+    def demultiplex(self, poems):
+        """Split the response of this request into per-lookup results.
+
+        Args:
+            poems (list): Poems returned for the request
+
+        Returns:
+            dict: Lookup mapped to its list of poems
+        """
+        results = {}
+        for lookup in self.lookups:
+            selected = poems
+            if lookup.term != self.term:
+                selected = [poem for poem in poems if matches(poem, self.field, lookup.term)]
+            results[lookup] = [project(poem, lookup.output) for poem in selected]
+        return results
+
+    def __repr__(self):
+        return f"PlannedRequest({self.field}/{self.term}/{','.join(self.output)}, lookups={len(self.lookups)})"
+
+
+def plan_batch(lookups, subsume=True, min_cover_length=3):
+    """Plan lookups into the fewest upstream requests.
+
+    Args:
+        lookups (iterable): Lookup objects or (field, term[, output]) tuples
+        subsume (bool, optional): Let substring lookups cover longer ones
+        min_cover_length (int, optional): Shortest term allowed to cover
+            others, so a term like 'a' does not pull in the whole corpus
+
+    Returns:
+        list: PlannedRequest objects
+    """
+    by_field = {}
+    for lookup in lookups:
+        lookup = lookup if isinstance(lookup, Lookup) else Lookup(*lookup)
+        by_field.setdefault(lookup.field, {}).setdefault(lookup.term, []).append(lookup)
+
+    plan = []
+    for field, by_term in by_field.items():
+        covers = []
+        # Shorter terms first, so each term is checked against the widest covers
+        for term in sorted(by_term, key=lambda term: (parse_term(term)[1], len(term))):
+            text, absolute = parse_term(term)
+            cover = None
+            if subsume and field in SUBSUMABLE_FIELDS:
+                cover = next(
+                    (request for request in covers if parse_term(request.term)[0].lower() in text.lower()),
+                    None,
+                )
+            if cover is None:
+                cover = PlannedRequest(field, term)
+                plan.append(cover)
+                if not absolute and field in SUBSUMABLE_FIELDS and len(text) >= min_cover_length:
+                    covers.append(cover)
+            cover.lookups.extend(lookup for lookup in by_term[term] if lookup not in cover.lookups)
+    return plan
+
+
+def _poems(response):
+    response.raise_for_status()
+    data = response.json()
+    # PoetryDB reports a miss as a status object in a 200 response
+    return data if isinstance(data, list) else []
+
+
+def _demultiplex(plan, responses):
+    results = {}
+    for request, response in zip(plan, responses):
+        results.update(request.demultiplex(_poems(response)))
+    return results
+
+
+def run_batch(client, lookups, max_workers=8, **plan_options):
+    """Run lookups through a PoetryDBClient with as few requests as possible.
+
+    Args:
+        client (PoetryDBClient): Client to use
+        lookups (iterable): Lookup objects or (field, term[, output]) tuples
+        max_workers (int, optional): Requests sent concurrently
+        **plan_options: Options for plan_batch
+
+    Returns:
+        dict: Each Lookup mapped to its list of poems
+
+    Raises:
+        requests.HTTPError: If an upstream request fails
+    """
+    plan = plan_batch(lookups, **plan_options)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        responses = list(pool.map(
+            lambda request: client.combined_search(request.field, request.term, ",".join(request.output)),
+            plan,
+        ))
+    return _demultiplex(plan, responses)
+
+
+async def run_batch_async(client, lookups, **plan_options):
+    """Run lookups through an AsyncPoetryDBClient with as few requests as possible.
+
+    Args:
+        client (AsyncPoetryDBClient): Client to use; its concurrency limit applies
+        lookups (iterable): Lookup objects or (field, term[, output]) tuples
+        **plan_options: Options for plan_batch
+
+    Returns:
+        dict: Each Lookup mapped to its list of poems
+
+    Raises:
+        requests.HTTPError: If an upstream request fails
+    """
+    plan = plan_batch(lookups, **plan_options)
+    responses = await client.gather_many(
+        ("combined_search", request.field, request.term, ",".join(request.output))
+        for request in plan
+    )
+    return _demultiplex(plan, responses)
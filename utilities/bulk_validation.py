@@ -0,0 +1,280 @@
+"""Corpus-wide integrity checks over columnar poem data.
+
+A dump of poems is decomposed in one pass into columns (reported and
+actual linecounts, hashed duplicate keys, interned field sets) and each
+check then runs over whole columns at once: with NumPy when it is
+installed, otherwise over ``array`` columns in plain Python. Hash matches
+only nominate duplicate candidates; their keys are compared exactly before
+a row is reported.
+
+    python -m utilities.bulk_validation dump.json --key title --key author
+"""
+import argparse
+import json
+import sys
+from array import array
+from collections import Counter, namedtuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from utilities.poetrydb_query import POEM_FIELDS
+from utilities.streaming import iter_json_array
+
+MISSING = -1
+INVALID = -2
+
+LINECOUNT_MISMATCH = "linecount_mismatch"
+DUPLICATE = "duplicate"
+UNEXPECTED_FIELDS = "unexpected_fields"
+MISSING_FIELDS = "missing_fields"
+
+Violation = namedtuple("Violation", ["row", "kind", "detail"])
+
+
+class PoemColumns:
+    """Poems decomposed into the columns the bulk checks run over."""
+
+    def __init__(self, key_fields=("title",)):
+        """Initialize empty columns.
+
+        Args:
+            key_fields (tuple, optional): Fields whose combined value must be unique
+        """
+        self.key_fields = tuple(key_fields)
+        self.reported = array("q")
+        self.actual = array("q")
+        self.key_hashes = array("q")
+        self.keys = []
+        self.field_set_codes = array("q")
+        self.field_sets = {}
+
+    @classmethod
+    def from_poems(cls, poems, key_fields=("title",)):
+        """Build columns from an iterable of poems in a single pass.
+
+        Args:
+            poems (iterable): Poem dicts, e.g. streamed from a dump
+            key_fields (tuple, optional): Fields whose combined value must be unique
+
+        Returns:
+            PoemColumns: Filled columns
+        """
+        columns = cls(key_fields)
+        for poem in poems:
+            columns.append(poem)
+        return columns
+
+    def __len__(self):
+        return len(self.reported)
+
+    def append(self, poem):
+        """Add one poem as a row.
+
+        Args:
+            poem (dict): Poem data; anything else counts as a row with no fields
+        """
+        if not isinstance(poem, dict):
+            poem = {}
+        fields = frozenset(poem)
+        self.field_set_codes.append(self.field_sets.setdefault(fields, len(self.field_sets)))
+
+        lines = poem.get("lines")
+        self.actual.append(len(lines) if isinstance(lines, list) else MISSING)
+        self.reported.append(_linecount(poem.get("linecount")))
+
+        key = tuple(_hashable(poem.get(field)) for field in self.key_fields)
+        self.keys.append(key)
+        # Rows missing a key field are left to the field-set check; Python
+        # never returns -1 from hash(), so MISSING cannot collide
+        self.key_hashes.append(hash(key) if None not in key else MISSING)
+
+
+def _hashable(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def _linecount(value):
+    if value is None:
+        return MISSING
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return INVALID
+
+
+def _mismatched_rows(reported, actual):
+    if numpy is not None and len(reported):
+        reported = numpy.frombuffer(reported, dtype=numpy.int64)
+        actual = numpy.frombuffer(actual, dtype=numpy.int64)
+        mask = (reported != actual) & (reported != MISSING) & (actual != MISSING)
+        return numpy.flatnonzero(mask).tolist()
+    return [
+        row for row, (reported_count, actual_count) in enumerate(zip(reported, actual))
+        if reported_count != actual_count and MISSING not in (reported_count, actual_count)
+    ]
+
+
+def _duplicate_candidates(key_hashes):
+    if numpy is not None and len(key_hashes):
+        hashes = numpy.frombuffer(key_hashes, dtype=numpy.int64)
+        _, inverse, counts = numpy.unique(hashes, return_inverse=True, return_counts=True)
+        mask = (counts[inverse] > 1) & (hashes != MISSING)
+        return numpy.flatnonzero(mask).tolist()
+    counts = Counter(key_hashes)
+    return [
+        row for row, key_hash in enumerate(key_hashes)
+        if counts[key_hash] > 1 and key_hash != MISSING
+    ]
+
+
+def _rows_with_codes(codes, wanted):
+    if numpy is not None and len(codes):
+        codes = numpy.frombuffer(codes, dtype=numpy.int64)
+        return numpy.flatnonzero(numpy.isin(codes, list(wanted))).tolist()
+    return [row for row, code in enumerate(codes) if code in wanted]
+
+
+def check_columns(columns, expected_fields=POEM_FIELDS):
+    """Run every bulk check over prepared columns.
+
+    Args:
+        columns (PoemColumns): Columns to check
+        expected_fields (iterable, optional): Exact field set every poem should have
+
+    Returns:
+        BulkReport: Every violating row
+    """
+    violations = []
+
+    for row in _mismatched_rows(columns.reported, columns.actual):
+        reported = columns.reported[row]
+        violations.append(Violation(row, LINECOUNT_MISMATCH, {
+            "reported": None if reported == INVALID else reported,
+            "actual": columns.actual[row],
+        }))
+
+    first_rows = {}
+    for row in _duplicate_candidates(columns.key_hashes):
+        first_row = first_rows.setdefault(columns.keys[row], row)
+        if first_row != row:
+            violations.append(Violation(row, DUPLICATE, {
+                "key": dict(zip(columns.key_fields, columns.keys[row])),
+                "first_row": first_row,
+            }))
+
+    expected = frozenset(expected_fields)
+    bad_sets = {code: fields for fields, code in columns.field_sets.items() if fields != expected}
+    for row in _rows_with_codes(columns.field_set_codes, bad_sets):
+        fields = bad_sets[columns.field_set_codes[row]]
+        if fields - expected:
+            violations.append(Violation(row, UNEXPECTED_FIELDS, sorted(fields - expected)))
+        if expected - fields:
+            violations.append(Violation(row, MISSING_FIELDS, sorted(expected - fields)))
+
+    violations.sort(key=lambda violation: violation.row)
+    return BulkReport(len(columns), violations)
+
+
+def check_poems(poems, key_fields=("title",), expected_fields=POEM_FIELDS):
+    """Check a whole dump of poems for linecount, duplicate and field-set violations.
+
+    Args:
+        poems (iterable): Poem dicts; an iterator is consumed once
+        key_fields (tuple, optional): Fields whose combined value must be unique,
+            e.g. ('title', 'author') to allow the same title by different poets
+        expected_fields (iterable, optional): Exact field set every poem should have
+
+    Returns:
+        BulkReport: Every violating row
+    """
+    return check_columns(PoemColumns.from_poems(poems, key_fields), expected_fields)
+
+
+class BulkReport:
+    """Violations found by a bulk check, ordered by row."""
+
+    def __init__(self, rows, violations):
+        self.rows = rows
+        self.violations = violations
+
+    @property
+    def ok(self):
+        """bool: True if no row violated any check."""
+        return not self.violations
+
+    def counts(self):
+        """Return the number of violations of each kind.
+
+        Returns:
+            dict: Violation kind mapped to its count
+        """
+        return dict(Counter(violation.kind for violation in self.violations))
+
+    def rows_with(self, kind):
+        """Return the rows that violated one check.
+
+        Args:
+            kind (str): Violation kind, e.g. LINECOUNT_MISMATCH
+
+        Returns:
+            list: Row indexes in order
+        """
+        return [violation.row for violation in self.violations if violation.kind == kind]
+
+    def to_dict(self):
+        """Return the report as JSON-serializable data.
+
+        Returns:
+            dict: Rows checked, counts per kind and the violations
+        """
+        return {
+            "rows": self.rows,
+            "counts": self.counts(),
+            "violations": [violation._asdict() for violation in self.violations],
+        }
+
+    def format(self, limit=50):
+        """Render a compact, one line per violation summary.
+
+        Args:
+            limit (int, optional): Violations listed before the rest are elided
+
+        Returns:
+            str: Report text
+        """
+        lines = [f"{self.rows} poems checked, {len(self.violations)} violations"]
+        for kind, count in sorted(self.counts().items()):
+            lines.append(f"  {kind}: {count}")
+        for violation in self.violations[:limit]:
+            lines.append(f"  row {violation.row}: {violation.kind} {json.dumps(violation.detail)}")
+        if len(self.violations) > limit:
+            lines.append(f"  ... {len(self.violations) - limit} more")
+        return "\n".join(lines)
+
+
+def _read_chunks(path, chunk_size=1 << 16):
+    with open(path, "rb") as dump_file:
+        yield from iter(lambda: dump_file.read(chunk_size), b"")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check a poem dump for integrity violations.")
+    parser.add_argument("dump", help="JSON file holding an array of poems")
+    parser.add_argument("--key", action="append", dest="keys",
+                        help="Field that must be unique, repeat for a combined key (default: title)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--limit", type=int, default=50, help="Violations listed in the text report")
+    args = parser.parse_args(argv)
+
+    report = check_poems(iter_json_array(_read_chunks(args.dump)), tuple(args.keys or ("title",)))
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format(args.limit))
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""Pluggable JSON decoding for PoetryDB responses.
+
+Decoders are objects with a ``name`` and a ``decode(data)`` method taking
+the raw response bytes:
+
+* StdlibDecoder - the standard library ``json`` module
+* OrjsonDecoder - ``orjson``, used by default when it is installed
+* TypedPoemDecoder - decodes poem arrays straight into slot-based Poem
+  records, checking each object against an item schema (e.g. POEM_SCHEMA)
+  as it is built, so a separate validation pass over the result is not
+  needed
+
+    client = PoetryDBClient(decoder=TypedPoemDecoder(POEM_SCHEMA))
+    poems = client.json(client.get_by_author("Emily Dickinson"))
+    poems[0].title
+
+Objects holding none of the poem fields, such as PoetryDB's
+``{"status": 404, ...}`` miss reports, are returned as plain dicts.
+"""
+import json
+
+from utilities.poetrydb_query import POEM_FIELDS
+from utilities.schema_codegen import UnsupportedSchema, build_fast_check
+from utilities.schema_registry import default_registry
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class StdlibDecoder:
+    """Decodes with the standard library json module."""
+
+    name = "json"
+
+    def decode(self, data):
+        return json.loads(data)
+
+
+class OrjsonDecoder:
+    """Decodes with orjson."""
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+
+    def decode(self, data):
+        return orjson.loads(data)
+
+
+def available_decoders():
+    """Return the decoder classes usable in this environment, fastest first.
+
+    Returns:
+        dict: Decoder name mapped to its class
+    """
+    decoders = {}
+    if orjson is not None:
+        decoders[OrjsonDecoder.name] = OrjsonDecoder
+    decoders[StdlibDecoder.name] = StdlibDecoder
+    return decoders
+
+
+def default_decoder():
+    """Return an instance of the fastest available decoder.
+
+    Returns:
+        object: OrjsonDecoder if orjson is installed, else StdlibDecoder
+    """
+    return next(iter(available_decoders().values()))()
+
+
+class Poem:
+    """Poem record with one slot per PoetryDB field.
+
+    Fields that were not requested are None. Supports ``poem["title"]``,
+    ``get`` and ``in`` like the dicts of the untyped path, and compares
+    equal to the dict holding the same fields.
+    """
+
+    __slots__ = POEM_FIELDS
+
+    def __init__(self, title=None, author=None, lines=None, linecount=None):
+        self.title = title
+        self.author = author
+        self.lines = lines
+        self.linecount = linecount
+
+    def __getitem__(self, field):
+        value = getattr(self, field, None) if field in POEM_FIELDS else None
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None) if field in POEM_FIELDS else None
+        return default if value is None else value
+
+    def __contains__(self, field):
+        return field in POEM_FIELDS and getattr(self, field) is not None
+
+    def to_dict(self):
+        """Return the present fields as a dict, in API order."""
+        return {field: getattr(self, field) for field in POEM_FIELDS if getattr(self, field) is not None}
+
+    def __eq__(self, other):
+        if isinstance(other, Poem):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Poem({self.to_dict()!r})"
+
+
+class TypedPoemDecoder:
+    """Decodes poem arrays into Poem records with fused schema checks.
+
+    The item schema is compiled to a generated fast-path predicate (see
+    utilities.schema_codegen) that runs on each object as the parser
+    completes it, right before the record is built. When it fails, the
+    object is handed to the full validator, which either accepts it or
+    raises a precise ValidationError whose path includes the array index.
+    """
+
+    def __init__(self, item_schema, backend=None):
+        """Initialize the decoder.
+
+        Args:
+            item_schema (dict): Object schema every poem must satisfy, e.g. POEM_SCHEMA
+            backend (str, optional): 'json' to build records inside the stdlib
+                parser through ``object_hook``, or 'orjson' to convert
+                orjson's dicts afterwards; defaults to the fastest installed
+
+        Raises:
+            UnsupportedSchema: If the schema is not a closed object schema over poem fields
+            ValueError: If the backend is not available
+        """
+        if item_schema.get("type") != "object" or "properties" not in item_schema:
+            raise UnsupportedSchema("item schema must be an object schema with properties")
+        unknown = set(item_schema["properties"]) - set(POEM_FIELDS)
+        if unknown:
+            raise UnsupportedSchema(f"not poem fields: {sorted(unknown)}")
+        if item_schema.get("additionalProperties", True) is not False:
+            raise UnsupportedSchema("item schema must set additionalProperties to false")
+        self.item_schema = item_schema
+        self.fast_check = build_fast_check(item_schema)
+        self.backend = backend or next(iter(available_decoders()))
+        if self.backend not in available_decoders():
+            raise ValueError(f"Unknown or unavailable backend: {self.backend}")
+        self.name = f"typed-{self.backend}"
+
+    def decode(self, data):
+        """Decode a response body.
+
+        Args:
+            data (bytes or str): JSON text
+
+        Returns:
+            object: List of Poem records for a poem array, else the decoded JSON
+
+        Raises:
+            ValueError: If the text is not valid JSON
+            jsonschema.exceptions.ValidationError: If a poem violates the item schema
+        """
+        fast_check = self.fast_check
+        if self.backend == OrjsonDecoder.name:
+            decoded = orjson.loads(data)
+            if isinstance(decoded, list):
+                decoded = [
+                    Poem(**item) if type(item) is dict and fast_check(item) else item
+                    for item in decoded
+                ]
+        else:
+            def hook(item):
+                if fast_check(item):
+                    return Poem(**item)
+                return item
+
+            decoded = json.loads(data, object_hook=hook)
+        if isinstance(decoded, list):
+            for index, item in enumerate(decoded):
+                if type(item) is not Poem:
+                    decoded[index] = self._recheck(item, index)
+        return decoded
+
+    def _recheck(self, instance, index):
+        """Validate an item the fast check rejected with the full validator.
+
+        The fast check is conservative, so an item it rejects may still be
+        valid (e.g. a linecount of ``14.0``); such items become records too.
+
+        Returns:
+            Poem: Record for a valid item
+
+        Raises:
+            jsonschema.exceptions.ValidationError: The full validator's error,
+                located at ``index``
+        """
+        error = default_registry.compile(self.item_schema).first_error(instance)
+        if error is not None:
+            error.path.appendleft(index)
+            raise error
+        return Poem(**instance)
@@ -0,0 +1,515 @@
+"""Fault-injecting HTTP proxy for testing the client against bad networks.
+
+FaultInjectingProxy forwards GET requests to an upstream base URL (the
+public API or a LocalPoetryDBServer) and degrades the responses according
+to a FaultProfile:
+
+* ``latency``: seconds added before each response, a number or a
+  distribution (constant, uniform, normal, lognormal, exponential, pareto)
+* ``bandwidth``: bytes per second each response body is paced to
+* ``drip``: body sent ``chunk`` bytes at a time, ``interval`` seconds apart
+* ``reset``: connections reset (TCP RST) at a ``rate``, ``before`` the
+  response or halfway through its ``body``
+* ``throttle``: bursts of ``burst`` 429 responses every ``period`` requests,
+  with a ``Retry-After`` header
+* ``truncate``: bodies cut to a ``fraction`` at a ``rate``, either as a
+  well-formed response holding invalid JSON or, with ``short_read``, as a
+  connection closed before the announced Content-Length
+* ``budget``: latency and throughput the client must still achieve, see
+  check_budget
+
+Profiles are dicts, so they can be scripted in JSON or YAML files keyed by
+profile name:
+
+    slow-3g:
+      latency: {distribution: lognormal, median: 0.3, sigma: 0.4}
+      bandwidth: 50000
+      budget: {p99_ms: 3000}
+
+    with FaultInjectingProxy("https://poetrydb.org/", "throttled") as proxy:
+        client = PoetryDBClient(proxy.base_url)
+
+    python -m utilities.fault_proxy --local-corpus tests/data/poems.json --profile flaky
+    python -m utilities.fault_proxy --upstream https://poetrydb.org/ --profiles faults.yaml \\
+        --profile slow-3g --port 8001
+"""
+import argparse
+import http.client
+import json
+import math
+import random
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import Counter, namedtuple
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+Faults = namedtuple("Faults", ["delay", "throttle", "reset", "truncate"])
+
+RESET_WHEN = ("before", "body")
+
+# Headers describing the proxy's own connection or encoding, never forwarded
+_HOP_BY_HOP = frozenset({
+    "connection", "keep-alive", "proxy-connection", "transfer-encoding", "te", "trailer",
+    "upgrade", "content-length", "content-encoding",
+})
+
+
+def latency_sampler(spec):
+    """Build a sampler for a latency distribution.
+
+    Args:
+        spec (float or dict): Seconds, or a dict with a 'distribution' of
+            'constant' (value), 'uniform' (low, high), 'normal' (mean, stddev),
+            'lognormal' (median, sigma), 'exponential' (mean) or
+            'pareto' (scale, alpha), and an optional 'max' in seconds
+
+    Returns:
+        callable: Takes a random.Random and returns seconds (never negative)
+
+    Raises:
+        ValueError: If the distribution is unknown or a parameter is missing
+    """
+    if spec is None:
+        return lambda rng: 0.0
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    params = dict(spec)
+    kind = params.pop("distribution", "constant")
+    cap = params.pop("max", math.inf)
+    try:
+        draw = {
+            "constant": lambda rng, value: value,
+            "uniform": lambda rng, low, high: rng.uniform(low, high),
+            "normal": lambda rng, mean, stddev: rng.gauss(mean, stddev),
+            "lognormal": lambda rng, median, sigma: median * math.exp(rng.gauss(0, sigma)),
+            "exponential": lambda rng, mean: rng.expovariate(1 / mean),
+            "pareto": lambda rng, scale, alpha: scale * rng.paretovariate(alpha),
+        }[kind]
+    except KeyError:
+        raise ValueError(f"Unknown latency distribution: {kind}") from None
+    try:
+        draw(random.Random(0), **params)
+    except TypeError as exc:
+        raise ValueError(f"Bad parameters for {kind} latency: {exc}") from None
+    return lambda rng: min(cap, max(0.0, draw(rng, **params)))
+
+
+class FaultProfile:
+    """Named set of faults a FaultInjectingProxy applies to every response."""
+
+    FIELDS = ("latency", "bandwidth", "drip", "reset", "throttle", "truncate", "budget")
+
+    def __init__(self, name="clean", latency=None, bandwidth=None, drip=None, reset=None,
+                 throttle=None, truncate=None, budget=None):
+        """Initialize the profile; every fault is off by default.
+
+        Args:
+            name (str, optional): Profile name, used in reports and test ids
+            latency (float or dict, optional): Added latency, see latency_sampler
+            bandwidth (float, optional): Body bytes per second
+            drip (dict, optional): 'chunk' bytes every 'interval' seconds
+            reset (dict, optional): 'rate' of connection resets and 'when'
+                ('before' the response, the default, or mid-'body')
+            throttle (dict, optional): 'burst' 429 responses at the start of every
+                'period' requests, with 'retry_after' seconds (default 0)
+            truncate (dict, optional): 'rate' of truncated bodies, the 'fraction'
+                kept (default 0.5) and 'short_read' to close the connection before
+                the announced length instead
+            budget (dict, optional): Limits for check_budget
+
+        Raises:
+            ValueError: If a setting is invalid
+        """
+        self.name = name
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.drip = dict(drip) if drip else None
+        self.reset = dict(reset) if reset else None
+        self.throttle = dict(throttle) if throttle else None
+        self.truncate = dict(truncate) if truncate else None
+        self.budget = dict(budget) if budget else None
+        self._latency = latency_sampler(latency)
+        if self.reset and self.reset.setdefault("when", "before") not in RESET_WHEN:
+            raise ValueError(f"reset 'when' must be one of {RESET_WHEN}")
+        if self.throttle and not 0 < self.throttle["burst"] <= self.throttle["period"]:
+            raise ValueError("throttle needs 0 < burst <= period")
+        if self.truncate and not 0 <= self.truncate.setdefault("fraction", 0.5) < 1:
+            raise ValueError("truncate fraction must be in [0, 1)")
+
+    @classmethod
+    def from_dict(cls, name, settings):
+        """Build a profile from its scripted settings.
+
+        Args:
+            name (str): Profile name
+            settings (dict): Settings keyed by the FIELDS names
+
+        Returns:
+            FaultProfile: Profile
+
+        Raises:
+            ValueError: If a setting is unknown or invalid
+        """
+        unknown = set(settings or ()) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fault settings in profile {name!r}: {sorted(unknown)}")
+        return cls(name, **(settings or {}))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+
+    def plan(self, number, rng):
+        """Decide the faults of one response.
+
+        Args:
+            number (int): 1-based number of the request since the profile was set
+            rng (random.Random): Random source
+
+        Returns:
+            Faults: Delay in seconds, whether to answer 429, when to reset
+                (None, 'before' or 'body') and the body fraction to keep (or None)
+        """
+        throttle = self.throttle is not None and (number - 1) % self.throttle["period"] < self.throttle["burst"]
+        reset = None
+        if self.reset and rng.random() < self.reset["rate"]:
+            reset = self.reset["when"]
+        truncate = None
+        if self.truncate and rng.random() < self.truncate["rate"]:
+            truncate = self.truncate["fraction"]
+        return Faults(self._latency(rng), throttle, reset, truncate)
+
+    def __repr__(self):
+        return f"FaultProfile({self.name!r}, {self.to_dict()})"
+
+
+PROFILES = {
+    profile.name: profile for profile in (
+        FaultProfile("clean", budget={"max_error_rate": 0}),
+        FaultProfile("slow", latency={"distribution": "lognormal", "median": 0.05, "sigma": 0.5},
+                     budget={"p50_ms": 250, "p99_ms": 1000, "max_error_rate": 0}),
+        FaultProfile("heavy-tail", latency={"distribution": "pareto", "scale": 0.005, "alpha": 1.5, "max": 2},
+                     budget={"p50_ms": 100, "max_ms": 3000, "max_error_rate": 0}),
+        FaultProfile("narrowband", latency=0.02, bandwidth=64 * 1024,
+                     budget={"p50_ms": 500, "max_error_rate": 0}),
+        FaultProfile("drip", drip={"chunk": 512, "interval": 0.002},
+                     budget={"max_error_rate": 0}),
+        FaultProfile("flaky", reset={"rate": 0.05}, budget={"max_error_rate": 0.01}),
+        # Bursts shorter than the client's retries, which it should ride out
+        FaultProfile("throttled", throttle={"burst": 2, "period": 25, "retry_after": 0},
+                     budget={"max_error_rate": 0}),
+        FaultProfile("truncated", truncate={"rate": 0.05}),
+        FaultProfile("cut-off", truncate={"rate": 0.05, "short_read": True}),
+    )
+}
+
+
+def load_profiles(path):
+    """Load fault profiles from a JSON or YAML file mapping names to settings.
+
+    Args:
+        path (str): Path to the profile file
+
+    Returns:
+        dict: Profile name mapped to FaultProfile
+    """
+    with open(path, encoding="utf-8") as profile_file:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            data = yaml.safe_load(profile_file)
+        else:
+            data = json.load(profile_file)
+    return {name: FaultProfile.from_dict(name, settings) for name, settings in data.items()}
+
+
+def check_budget(result, budget):
+    """Check a load run against a profile's budget.
+
+    Args:
+        result (utilities.loadgen.RunResult): Run through the proxy
+        budget (dict): Upper limits 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms' and
+            'max_error_rate' (errors per request), lower limit 'min_rps'
+
+    Returns:
+        list: Human-readable violations, empty when the budget holds
+    """
+    row = result.summary()["all"]
+    violations = []
+    for key in ("p50_ms", "p95_ms", "p99_ms", "max_ms"):
+        if key in budget and row[key] > budget[key]:
+            violations.append(f"{key} {row[key]:.1f} > {budget[key]}")
+    if "min_rps" in budget and row["rps"] < budget["min_rps"]:
+        violations.append(f"rps {row['rps']:.1f} < {budget['min_rps']}")
+    if "max_error_rate" in budget:
+        rate = row["errors"] / row["count"] if row["count"] else 0.0
+        if rate > budget["max_error_rate"]:
+            violations.append(f"error rate {rate:.3f} > {budget['max_error_rate']}")
+    return violations
+
+
+def _reset_connection(handler):
+    """Abort the client connection with a TCP RST instead of a FIN."""
+    handler.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    handler.connection.close()
+    handler.close_connection = True
+
+
+class FaultInjectingProxy:
+    """Threaded HTTP proxy that degrades upstream responses by a FaultProfile.
+
+    Usable as a context manager like LocalPoetryDBServer; ``port=0`` picks a
+    free port. The profile can be swapped between requests with set_profile,
+    which restarts the request numbering, the random source and ``stats``.
+    """
+
+    def __init__(self, upstream, profile=None, host="127.0.0.1", port=0, seed=None,
+                 profiles=None, upstream_timeout=30):
+        """Initialize the proxy.
+
+        Args:
+            upstream (str): Base URL requests are forwarded to
+            profile (FaultProfile or str, optional): Profile, or a name in ``profiles``;
+                defaults to 'clean'
+            host (str, optional): Interface to bind
+            port (int, optional): Port to bind, 0 for any free port
+            seed (int, optional): Seed for the fault decisions and latencies
+            profiles (dict, optional): Named profiles; defaults to PROFILES
+            upstream_timeout (float, optional): Seconds to wait on the upstream
+        """
+        parts = urlsplit(upstream)
+        self.upstream = upstream
+        self._upstream_scheme = parts.scheme
+        self._upstream_netloc = parts.netloc
+        self._upstream_prefix = parts.path.rstrip("/")
+        self.upstream_timeout = upstream_timeout
+        self.seed = seed
+        self.profiles = PROFILES if profiles is None else profiles
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.set_profile(profile or "clean")
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """str: Base URL to hand to PoetryDBClient."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def set_profile(self, profile):
+        """Apply a profile to subsequent requests.
+
+        Args:
+            profile (FaultProfile or str): Profile, or a name in ``profiles``
+
+        Returns:
+            FaultProfile: The applied profile
+        """
+        if not isinstance(profile, FaultProfile):
+            profile = self.profiles[profile]
+        with self._lock:
+            self.profile = profile
+            self.stats = Counter()
+            self._random = random.Random(self.seed)
+        return profile
+
+    def start(self):
+        """Serve requests on a background thread.
+
+        Returns:
+            FaultInjectingProxy: This proxy
+        """
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def _connect(self):
+        connection_class = (
+            http.client.HTTPSConnection if self._upstream_scheme == "https" else http.client.HTTPConnection
+        )
+        return connection_class(self._upstream_netloc, timeout=self.upstream_timeout)
+
+    def _fetch(self, path):
+        """Forward a GET on the calling thread's keep-alive upstream connection.
+
+        Returns:
+            tuple: (status, list of (header, value), body bytes)
+        """
+        for attempt in range(2):
+            connection = getattr(self._local, "connection", None)
+            if connection is None:
+                connection = self._local.connection = self._connect()
+            try:
+                connection.request("GET", self._upstream_prefix + path, headers={"Accept-Encoding": "identity"})
+                response = connection.getresponse()
+                return response.status, response.getheaders(), response.read()
+            except (http.client.HTTPException, OSError):
+                # A pooled upstream connection may have been closed while idle
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+
+    def _handle(self, handler):
+        with self._lock:
+            profile = self.profile
+            self.stats["requests"] += 1
+            faults = profile.plan(self.stats["requests"], self._random)
+        time.sleep(faults.delay)
+        if faults.reset == "before":
+            self._count("reset")
+            _reset_connection(handler)
+            return
+        if faults.throttle:
+            self._count("throttled")
+            body = json.dumps({"status": 429, "reason": "Too Many Requests"}).encode("utf-8")
+            headers = [("Content-Type", "application/json"),
+                       ("Retry-After", str(profile.throttle.get("retry_after", 0)))]
+            self._send(handler, profile, HTTPStatus.TOO_MANY_REQUESTS, headers, body, None, None)
+            return
+        try:
+            status, headers, body = self._fetch(handler.path)
+        except (http.client.HTTPException, OSError) as exc:
+            self._count("upstream_errors")
+            body = json.dumps({"status": 502, "reason": f"Upstream error: {exc}"}).encode("utf-8")
+            self._send(handler, profile, HTTPStatus.BAD_GATEWAY, [("Content-Type", "application/json")],
+                       body, None, None)
+            return
+        headers = [(name, value) for name, value in headers if name.lower() not in _HOP_BY_HOP]
+        if faults.truncate is not None:
+            self._count("truncated")
+        self._send(handler, profile, status, headers, body, faults.truncate, faults.reset)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _send(self, handler, profile, status, headers, body, truncate, reset):
+        """Write the response, paced and cut short as the faults demand."""
+        length = len(body)
+        if truncate is not None:
+            body = body[:int(length * truncate)]
+            if not profile.truncate.get("short_read"):
+                length = len(body)
+        handler.send_response(status)
+        for name, value in headers:
+            handler.send_header(name, value)
+        handler.send_header("Content-Length", str(length))
+        handler.end_headers()
+        if reset == "body":
+            self._count("reset")
+            self._write(handler.wfile, body[:len(body) // 2], profile)
+            _reset_connection(handler)
+            return
+        self._write(handler.wfile, body, profile)
+        if len(body) < length:
+            handler.close_connection = True
+
+    def _write(self, wfile, body, profile):
+        """Write a body in chunks, sleeping to honour the drip and bandwidth settings."""
+        interval = 0.0
+        if profile.drip:
+            chunk = profile.drip["chunk"]
+            interval = profile.drip["interval"]
+        elif profile.bandwidth:
+            # Slices of about 10 ms keep the pacing smooth
+            chunk = max(1, int(profile.bandwidth / 100))
+        else:
+            chunk = len(body) or 1
+        started = time.perf_counter()
+        for offset in range(0, len(body), chunk):
+            if offset and interval:
+                time.sleep(interval)
+            wfile.write(body[offset:offset + chunk])
+            if profile.bandwidth:
+                ahead = started + (offset + chunk) / profile.bandwidth - time.perf_counter()
+                if ahead > 0:
+                    time.sleep(ahead)
+
+    def _make_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY
+            # the body waits on the client's delayed ACK (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                try:
+                    proxy._handle(self)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up, e.g. on its read timeout
+                    self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Proxy PoetryDB with injected network faults.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--upstream", help="Base URL to forward to")
+    target.add_argument("--local-corpus", help="Start a local stand-in serving this corpus file")
+    parser.add_argument("--profiles", help="JSON or YAML file of extra named profiles")
+    parser.add_argument("--profile", default="clean", help="Profile to apply (default: clean)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    profiles = dict(PROFILES)
+    if args.profiles:
+        profiles.update(load_profiles(args.profiles))
+    if args.profile not in profiles:
+        parser.error(f"unknown profile {args.profile!r}; choose from {', '.join(profiles)}")
+
+    server = None
+    upstream = args.upstream
+    if args.local_corpus:
+        from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+        server = LocalPoetryDBServer(PoemCorpus.from_file(args.local_corpus), seed=args.seed).start()
+        upstream = server.base_url
+    proxy = FaultInjectingProxy(upstream, args.profile, args.host, args.port, args.seed, profiles)
+    print(f"Proxying {upstream} on {proxy.base_url} with profile {proxy.profile.name}")
+    try:
+        proxy.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+        if server is not None:
+            server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
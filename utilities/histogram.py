@@ -0,0 +1,121 @@
+"""Log-linear latency histogram shared by the load generator and metrics."""
+import math
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram.
+
+    Values are recorded in microseconds. Below ``2 ** SUB_BUCKET_BITS`` they
+    are kept exactly; above, each power-of-two range is split into
+    ``2 ** (SUB_BUCKET_BITS - 1)`` buckets, bounding the relative error of
+    any reported value to under 1%.
+    """
+
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = {}
+        self.total_count = 0
+        self.total_micros = 0
+        self.min_micros = None
+        self.max_micros = 0
+
+    def record(self, seconds):
+        """Record one latency.
+
+        Args:
+            seconds (float): Latency in seconds
+        """
+        micros = max(0, int(seconds * 1e6))
+        index = self._index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total_count += 1
+        self.total_micros += micros
+        self.max_micros = max(self.max_micros, micros)
+        self.min_micros = micros if self.min_micros is None else min(self.min_micros, micros)
+
+    def merge(self, other):
+        """Add the counts of another histogram to this one.
+
+        Args:
+            other (LatencyHistogram): Histogram to merge in
+        """
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total_count += other.total_count
+        self.total_micros += other.total_micros
+        self.max_micros = max(self.max_micros, other.max_micros)
+        if other.min_micros is not None:
+            self.min_micros = other.min_micros if self.min_micros is None else min(self.min_micros, other.min_micros)
+
+    def percentile(self, percent):
+        """Return the latency at a percentile.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in seconds (0.0 for an empty histogram)
+        """
+        if not self.total_count:
+            return 0.0
+        rank = max(1, math.ceil(percent / 100.0 * self.total_count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._value(index), self.max_micros) / 1e6
+        return self.max_micros / 1e6
+
+    @property
+    def mean(self):
+        """float: Mean latency in seconds."""
+        return self.total_micros / self.total_count / 1e6 if self.total_count else 0.0
+
+    def to_dict(self):
+        """Serialize the histogram.
+
+        Returns:
+            dict: JSON-compatible representation
+        """
+        return {
+            "counts": {str(index): count for index, count in sorted(self.counts.items())},
+            "total_count": self.total_count,
+            "total_micros": self.total_micros,
+            "min_micros": self.min_micros,
+            "max_micros": self.max_micros,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a histogram serialized by to_dict.
+
+        Args:
+            data (dict): Serialized histogram
+
+        Returns:
+            LatencyHistogram: Histogram
+        """
+        histogram = cls()
+        histogram.counts = {int(index): count for index, count in data["counts"].items()}
+        histogram.total_count = data["total_count"]
+        histogram.total_micros = data["total_micros"]
+        histogram.min_micros = data["min_micros"]
+        histogram.max_micros = data["max_micros"]
+        return histogram
+
+    def _index(self, micros):
+        bits = self.SUB_BUCKET_BITS
+        if micros < (1 << bits):
+            return micros
+        shift = micros.bit_length() - bits
+        return shift * (1 << (bits - 1)) + (micros >> shift)
+
+    def _value(self, index):
+        """Midpoint of the values that map to a bucket."""
+        half = 1 << (self.SUB_BUCKET_BITS - 1)
+        if index < 2 * half:
+            return index
+        shift = index // half - 1
+        mantissa = index - shift * half
+        return (mantissa << shift) + (1 << shift) // 2
@@ -0,0 +1,91 @@
+"""Subclasses of requests and urllib3 types used by PoetryDBClient.
+
+They are kept apart from utilities.instrumentation and
+utilities.resilience so that importing those modules (and the test
+harness) does not import requests. Both modules still export their classes
+by name, loading this module on first access.
+"""
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from utilities.instrumentation import _active
+
+
+class _TimedConnectionMixin:
+    """Records connection setup on the RequestEvent active on this thread."""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            return super()._new_conn()
+        finally:
+            self._tcp_seconds = time.perf_counter() - started
+            event = getattr(_active, "event", None)
+            if event is not None:
+                event.add_phase("connect", self._tcp_seconds)
+
+    def connect(self):
+        self._tcp_seconds = 0.0
+        started = time.perf_counter()
+        super().connect()
+        event = getattr(_active, "event", None)
+        if event is not None and isinstance(self, HTTPSConnection):
+            event.add_phase("tls", max(0.0, time.perf_counter() - started - self._tcp_seconds))
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report connect and TLS time."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of sending a request to an endpoint whose circuit is open."""
+
+
+class ThrottledRetry(Retry):
+    """urllib3 Retry that reports each retried response to a rate limiter
+    and waits for a token before the next attempt."""
+
+    rate_limiter = None
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if self.rate_limiter is not None and response is not None:
+            self.rate_limiter.feedback(response.status, retry_after=response.headers.get("Retry-After"))
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+    def sleep(self, response=None):
+        super().sleep(response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
@@ -0,0 +1,249 @@
+"""Per-request instrumentation for PoetryDBClient and utilities.validators.
+
+Hooks are plain objects implementing any of:
+
+* ``on_request_start(event)`` / ``on_request_end(event)`` - a RequestEvent
+  whose ``phases`` hold the seconds spent in ``connect`` (DNS lookup and
+  TCP connect), ``tls``, ``ttfb`` (request sent until response headers,
+  excluding connection setup) and ``download`` (reading the body)
+* ``on_parse(event)`` - a ParseEvent for each ``PoetryDBClient.json`` call
+* ``on_validate(event)`` - a ValidateEvent for each schema validation
+
+Register hooks on an Instrumentation and pass it to the client; schema
+validations are reported to ``default_instrumentation``. A ready-made hook
+aggregating everything into histograms is utilities.metrics.MetricsCollector:
+
+    collector = MetricsCollector()
+    default_instrumentation.add(collector)
+    client = PoetryDBClient(instrumentation=default_instrumentation)
+
+Connection phases are measured by connection classes installed through
+TimedHTTPAdapter, so they are only recorded for requests that open a new
+connection. The adapter classes subclass requests and urllib3 types and
+live in utilities.http_types; they are importable from here too, and
+loading them imports those libraries.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+_active = threading.local()
+
+
+def endpoint_name(endpoint):
+    """Reduce an endpoint path to the endpoint it calls, for grouping metrics.
+
+    Args:
+        endpoint (str): Path relative to the base URL, e.g. 'title/Winter/author'
+
+    Returns:
+        str: First path segment, e.g. 'title', 'random' or 'title,author'
+    """
+    return endpoint.lstrip("/").split("/", 1)[0]
+
+
+class RequestEvent:
+    """Timing and outcome of one client request."""
+
+    __slots__ = ("endpoint", "name", "url", "started", "phases", "seconds",
+                 "status", "bytes", "from_cache", "error")
+
+    def __init__(self, endpoint, url):
+        self.endpoint = endpoint
+        self.name = endpoint_name(endpoint)
+        self.url = url
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.seconds = None
+        self.status = None
+        self.bytes = None
+        self.from_cache = False
+        self.error = None
+
+    def add_phase(self, phase, seconds):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class ParseEvent:
+    """Time spent decoding one JSON response body."""
+
+    __slots__ = ("name", "seconds", "bytes", "error")
+
+    def __init__(self, name, seconds, size, error=None):
+        self.name = name
+        self.seconds = seconds
+        self.bytes = size
+        self.error = error
+
+
+class ValidateEvent:
+    """Time spent validating data against one schema."""
+
+    __slots__ = ("schema", "seconds", "ok")
+
+    def __init__(self, schema, seconds, ok):
+        self.schema = schema
+        self.seconds = seconds
+        self.ok = ok
+
+
+class Instrumentation:
+    """Dispatches instrumentation events to registered hooks."""
+
+    def __init__(self, hooks=()):
+        """Initialize the dispatcher.
+
+        Args:
+            hooks (iterable, optional): Hook objects to register
+        """
+        self.hooks = list(hooks)
+
+    def add(self, hook):
+        """Register a hook.
+
+        Args:
+            hook (object): Object implementing any of the ``on_*`` methods
+        """
+        self.hooks.append(hook)
+
+    def remove(self, hook):
+        """Unregister a hook.
+
+        Args:
+            hook (object): Previously added hook
+        """
+        self.hooks.remove(hook)
+
+    def emit(self, name, event):
+        """Call ``name(event)`` on every hook implementing it.
+
+        Args:
+            name (str): Hook method, e.g. 'on_request_end'
+            event (object): Event passed to the hooks
+        """
+        for hook in list(self.hooks):
+            method = getattr(hook, name, None)
+            if method is not None:
+                method(event)
+
+    def request(self, endpoint, url, send):
+        """Run a request, timing it and reporting it to the hooks.
+
+        Args:
+            endpoint (str): Endpoint path relative to the base URL
+            url (str): Full request URL
+            send (callable): Performs the request and returns a requests.Response
+
+        Returns:
+            requests.Response: The response, with the RequestEvent as ``request_event``
+        """
+        event = RequestEvent(endpoint, url)
+        self.emit("on_request_start", event)
+        outer = getattr(_active, "event", None)
+        _active.event = event
+        try:
+            response = send()
+            event.status = response.status_code
+            event.from_cache = getattr(response, "from_cache", False)
+            if response._content_consumed:
+                event.bytes = len(response.content)
+            elif response.headers.get("Content-Length", "").isdigit():
+                event.bytes = int(response.headers["Content-Length"])
+            response.request_event = event
+            return response
+        except BaseException as exc:
+            event.error = exc
+            raise
+        finally:
+            _active.event = outer
+            event.seconds = time.perf_counter() - event.started
+            self.emit("on_request_end", event)
+
+    def parse(self, response, decode=None):
+        """Decode a JSON response body, reporting the time to the hooks.
+
+        Args:
+            response (requests.Response): Response to decode
+            decode (callable, optional): Decodes the body bytes; defaults to ``response.json()``
+
+        Returns:
+            object: Decoded JSON
+        """
+        event = getattr(response, "request_event", None)
+        name = event.name if event is not None else endpoint_name(response.url or "")
+        started = time.perf_counter()
+        try:
+            data = response.json() if decode is None else decode(response.content)
+        except ValueError as exc:
+            self.emit("on_parse", ParseEvent(name, time.perf_counter() - started, len(response.content), exc))
+            raise
+        self.emit("on_parse", ParseEvent(name, time.perf_counter() - started, len(response.content)))
+        return data
+
+    @contextmanager
+    def validating(self, schema_name):
+        """Time the validation run inside the block and report it to the hooks.
+
+        The event counts as passed unless the block raises or sets its
+        ``ok`` to False.
+
+        Args:
+            schema_name (str): Name of the schema being checked
+
+        Yields:
+            ValidateEvent: The event to be reported
+        """
+        event = ValidateEvent(schema_name, 0.0, None)
+        started = time.perf_counter()
+        try:
+            yield event
+        except BaseException:
+            event.ok = False
+            raise
+        finally:
+            event.seconds = time.perf_counter() - started
+            if event.ok is None:
+                event.ok = True
+            self.emit("on_validate", event)
+
+
+default_instrumentation = Instrumentation()
+
+
+def timed_get(session, url, stream=False, **kwargs):
+    """GET a URL, recording ttfb and download phases on the active RequestEvent.
+
+    Args:
+        session (requests.Session): Session to send with
+        url (str): Full URL
+        stream (bool, optional): Leave the body unread, so no download phase is recorded
+        **kwargs: Passed to ``session.get``
+
+    Returns:
+        requests.Response: API response
+    """
+    event = getattr(_active, "event", None)
+    started = time.perf_counter()
+    response = session.get(url, stream=True, **kwargs)
+    headers_at = time.perf_counter()
+    if event is not None:
+        setup = event.phases.get("connect", 0.0) + event.phases.get("tls", 0.0)
+        event.add_phase("ttfb", max(0.0, headers_at - started - setup))
+    if not stream:
+        response.content
+        if event is not None:
+            event.add_phase("download", time.perf_counter() - headers_at)
+    return response
+
+
+_ADAPTER_CLASSES = frozenset({
+    "TimedHTTPConnection", "TimedHTTPSConnection", "TimedHTTPConnectionPool",
+    "TimedHTTPSConnectionPool", "TimedHTTPAdapter",
+})
+
+
+def __getattr__(name):
+    if name in _ADAPTER_CLASSES:
+        from utilities import http_types
+        return getattr(http_types, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,513 @@
+"""Load generation and latency benchmarking for the PoetryDB client.
+
+Drives a weighted mix of client calls (``get_by_title``, ``get_by_author``,
+``get_random``, ``combined_search``) either closed-loop at a fixed
+concurrency or open-loop at a target rate, using threads, asyncio or
+worker processes. Latencies go into HDR-style log-linear histograms per
+endpoint; results export as JSON or CSV and two runs can be compared for
+regressions. In open-loop mode latency is measured from each request's
+scheduled start, so a stalled server is not hidden by the generator
+slowing down (coordinated omission).
+
+    python -m utilities.loadgen run --local-corpus tests/data/poems.json \\
+        --concurrency 8 --duration 10 --json run.json
+    python -m utilities.loadgen compare baseline.json run.json
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+from utilities.api_client import PoetryDBClient
+from utilities.histogram import LatencyHistogram
+
+MODES = ("threads", "asyncio", "processes")
+
+
+class RequestMix:
+    """Weighted mix of client calls to issue during a run."""
+
+    DEFAULT = [
+        {"name": "title", "endpoint": "get_by_title", "args": ["Ozymandias"], "weight": 4},
+        {"name": "author", "endpoint": "get_by_author", "args": ["Emily Dickinson"], "weight": 2},
+        {"name": "random", "endpoint": "get_random", "args": [3, "author,title,linecount"], "weight": 2},
+        {"name": "combined", "endpoint": "combined_search", "args": ["title,author", "Winter;Shakespeare"], "weight": 1},
+    ]
+
+    ENDPOINTS = ("get_by_title", "get_by_author", "get_random", "combined_search")
+
+    def __init__(self, entries=None):
+        """Initialize the mix.
+
+        Args:
+            entries (list, optional): Dicts with 'endpoint', 'args', optional
+                'name' (reporting label, defaults to the endpoint) and
+                'weight' (defaults to 1). Defaults to DEFAULT.
+        """
+        self.entries = []
+        for entry in entries or self.DEFAULT:
+            if entry["endpoint"] not in self.ENDPOINTS:
+                raise ValueError(f"Unknown endpoint: {entry['endpoint']}")
+            self.entries.append({
+                "name": entry.get("name", entry["endpoint"]),
+                "endpoint": entry["endpoint"],
+                "args": list(entry.get("args", [])),
+                "weight": entry.get("weight", 1),
+            })
+        self._weights = [entry["weight"] for entry in self.entries]
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a mix from a JSON or YAML file holding a list of entries.
+
+        Args:
+            path (str): Path to the mix file
+
+        Returns:
+            RequestMix: Request mix
+        """
+        with open(path, encoding="utf-8") as mix_file:
+            if path.endswith((".yaml", ".yml")):
+                import yaml
+                return cls(yaml.safe_load(mix_file))
+            return cls(json.load(mix_file))
+
+    def pick(self, rng):
+        """Choose the next call.
+
+        Args:
+            rng (random.Random): Random source
+
+        Returns:
+            dict: Mix entry
+        """
+        return rng.choices(self.entries, weights=self._weights)[0]
+
+
+class EndpointStats:
+    """Latency histogram and error count of one endpoint."""
+
+    def __init__(self):
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+
+    def merge(self, other):
+        self.histogram.merge(other.histogram)
+        self.errors += other.errors
+
+
+class RunResult:
+    """Outcome of a load run: per-endpoint statistics and wall time."""
+
+    PERCENTILES = (50, 95, 99)
+
+    def __init__(self, endpoints=None, wall_seconds=0.0, config=None):
+        self.endpoints = endpoints or {}
+        self.wall_seconds = wall_seconds
+        self.config = config or {}
+
+    def record(self, name, seconds, error):
+        stats = self.endpoints.setdefault(name, EndpointStats())
+        stats.histogram.record(seconds)
+        if error:
+            stats.errors += 1
+
+    def merge(self, other):
+        for name, stats in other.endpoints.items():
+            self.endpoints.setdefault(name, EndpointStats()).merge(stats)
+
+    def summary(self):
+        """Summarize every endpoint, plus an 'all' aggregate.
+
+        Returns:
+            dict: Endpoint name mapped to count, errors, rps, mean and percentiles (ms)
+        """
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        rows = {}
+        for name, stats in sorted(self.endpoints.items()) + [("all", total)]:
+            histogram = stats.histogram
+            row = {
+                "count": histogram.total_count,
+                "errors": stats.errors,
+                "rps": histogram.total_count / self.wall_seconds if self.wall_seconds else 0.0,
+                "mean_ms": histogram.mean * 1e3,
+                "max_ms": histogram.max_micros / 1e3,
+            }
+            for percent in self.PERCENTILES:
+                row[f"p{percent}_ms"] = histogram.percentile(percent) * 1e3
+            rows[name] = row
+        return rows
+
+    def to_dict(self):
+        return {
+            "config": self.config,
+            "wall_seconds": self.wall_seconds,
+            "summary": self.summary(),
+            "histograms": {
+                name: dict(stats.histogram.to_dict(), errors=stats.errors)
+                for name, stats in self.endpoints.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        endpoints = {}
+        for name, histogram in data["histograms"].items():
+            stats = EndpointStats()
+            stats.histogram = LatencyHistogram.from_dict(histogram)
+            stats.errors = histogram["errors"]
+            endpoints[name] = stats
+        return cls(endpoints, data["wall_seconds"], data.get("config"))
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_csv(self):
+        """Render the summary as CSV, one row per endpoint.
+
+        Returns:
+            str: CSV text with a header row
+        """
+        summary = self.summary()
+        columns = ["endpoint", "count", "errors", "rps", "mean_ms"] + [
+            f"p{percent}_ms" for percent in self.PERCENTILES
+        ] + ["max_ms"]
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        for name, row in summary.items():
+            writer.writerow([name] + [
+                round(row[column], 3) if isinstance(row[column], float) else row[column]
+                for column in columns[1:]
+            ])
+        return out.getvalue()
+
+    def format_table(self):
+        lines = [f"{'endpoint':<16} {'count':>8} {'errors':>7} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for name, row in self.summary().items():
+            lines.append(
+                f"{name:<16} {row['count']:>8} {row['errors']:>7} {row['rps']:>9.1f} "
+                f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}"
+            )
+        return "\n".join(lines)
+
+
+class _Schedule:
+    """Hands out request start times and stops the run when done.
+
+    With a rate, starts are spaced ``1 / rate`` apart (open loop); without
+    one, each request may start immediately (closed loop).
+    """
+
+    def __init__(self, rate, duration, max_requests):
+        self.rate = rate
+        self.max_requests = max_requests
+        self.start = time.perf_counter()
+        self.deadline = self.start + duration if duration else None
+        self.issued = 0
+        self._lock = threading.Lock()
+
+    def next(self):
+        """Return the scheduled start of the next request, or None when done."""
+        with self._lock:
+            if self.max_requests is not None and self.issued >= self.max_requests:
+                return None
+            now = time.perf_counter()
+            scheduled = self.start + self.issued / self.rate if self.rate else now
+            if self.deadline is not None and max(now, scheduled) >= self.deadline:
+                return None
+            self.issued += 1
+            return scheduled
+
+
+def _is_error(response):
+    """HTTP errors, and misses PoetryDB reports as 200 with a ``{"status": 404}`` body."""
+    if response.status_code >= 400:
+        return True
+    body = response.content.lstrip()
+    # Only object bodies can carry a status; poem arrays are not decoded
+    if not body.startswith(b"{"):
+        return False
+    try:
+        status = json.loads(body).get("status")
+    except ValueError:
+        return True
+    return isinstance(status, int) and status >= 400
+
+
+class LoadRunner:
+    """Issues a request mix against a base URL and measures it."""
+
+    def __init__(self, base_url, mix=None, mode="threads", concurrency=4, rate=None,
+                 duration=None, requests=None, processes=None, seed=None, retries=0):
+        """Initialize the runner.
+
+        Args:
+            base_url (str): Base URL of the server under test
+            mix (RequestMix, optional): Calls to issue. Defaults to RequestMix.DEFAULT.
+            mode (str, optional): 'threads', 'asyncio' or 'processes'
+            concurrency (int, optional): Maximum requests in flight (in total)
+            rate (float, optional): Target requests per second (open loop); None for closed loop
+            duration (float, optional): Seconds to run
+            requests (int, optional): Total number of requests to issue
+            processes (int, optional): Worker processes in 'processes' mode. Defaults to CPU count.
+            seed (int, optional): Seed for the request mix
+            retries (int, optional): Client retries per request. Defaults to 0
+                so every failed attempt shows up in the results.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if duration is None and requests is None:
+            raise ValueError("Give a duration, a request count or both")
+        self.base_url = base_url
+        self.mix = mix or RequestMix()
+        self.mode = mode
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.requests = requests
+        self.processes = processes or os.cpu_count() or 1
+        self.seed = seed
+        self.retries = retries
+
+    def config(self):
+        return {
+            "base_url": self.base_url,
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "rate": self.rate,
+            "duration": self.duration,
+            "requests": self.requests,
+            "retries": self.retries,
+            "mix": self.mix.entries,
+        }
+
+    def run(self):
+        """Run the load and return its results.
+
+        Returns:
+            RunResult: Per-endpoint statistics
+        """
+        start = time.perf_counter()
+        if self.mode == "threads":
+            result = self._run_threads(self.concurrency, self.rate, self.requests, self.seed)
+        elif self.mode == "asyncio":
+            import asyncio
+
+            result = asyncio.run(self._run_asyncio())
+        else:
+            result = self._run_processes()
+        result.wall_seconds = time.perf_counter() - start
+        result.config = self.config()
+        return result
+
+    def _run_threads(self, concurrency, rate, requests, seed):
+        result = RunResult()
+        lock = threading.Lock()
+        schedule = _Schedule(rate, self.duration, requests)
+        rng = random.Random(seed)
+
+        with PoetryDBClient(self.base_url, pool_size=concurrency, retries=self.retries) as client:
+            def worker():
+                while True:
+                    scheduled = schedule.next()
+                    if scheduled is None:
+                        return
+                    with lock:
+                        entry = self.mix.pick(rng)
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    try:
+                        error = _is_error(getattr(client, entry["endpoint"])(*entry["args"]))
+                    except Exception:
+                        error = True
+                    elapsed = time.perf_counter() - scheduled
+                    with lock:
+                        result.record(entry["name"], elapsed, error)
+
+            threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        return result
+
+    async def _run_asyncio(self):
+        import asyncio
+
+        from utilities.async_api_client import AsyncPoetryDBClient
+
+        result = RunResult()
+        schedule = _Schedule(self.rate, self.duration, self.requests)
+        rng = random.Random(self.seed)
+
+        async with AsyncPoetryDBClient(self.base_url, concurrency=self.concurrency,
+                                       retries=self.retries) as client:
+            async def worker():
+                while True:
+                    scheduled = schedule.next()
+                    if scheduled is None:
+                        return
+                    entry = self.mix.pick(rng)
+                    delay = scheduled - time.perf_counter()
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                    try:
+                        error = _is_error(await getattr(client, entry["endpoint"])(*entry["args"]))
+                    except Exception:
+                        error = True
+                    result.record(entry["name"], time.perf_counter() - scheduled, error)
+
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return result
+
+    def _run_processes(self):
+        import multiprocessing
+
+        processes = max(1, min(self.processes, self.concurrency))
+        jobs = [
+            {
+                "base_url": self.base_url,
+                "mix": self.mix.entries,
+                "concurrency": _share(self.concurrency, processes, index),
+                "rate": self.rate / processes if self.rate else None,
+                "duration": self.duration,
+                "requests": _share(self.requests, processes, index),
+                "seed": None if self.seed is None else self.seed + index,
+                "retries": self.retries,
+            }
+            for index in range(processes)
+        ]
+        # Never fork: client threads (and maybe a local server) are running
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        with context.Pool(processes) as pool:
+            parts = pool.map(_process_worker, jobs)
+        result = RunResult()
+        for part in parts:
+            result.merge(RunResult.from_dict(part))
+        return result
+
+
+def _share(total, parts, index):
+    """Split ``total`` into ``parts`` near-equal shares and return share ``index``."""
+    if total is None:
+        return None
+    return total // parts + (index < total % parts)
+
+
+def _process_worker(job):
+    runner = LoadRunner(job["base_url"], RequestMix(job["mix"]),
+                        duration=job["duration"], requests=job["requests"], retries=job["retries"])
+    result = runner._run_threads(job["concurrency"], job["rate"], job["requests"], job["seed"])
+    return result.to_dict()
+
+
+def compare(baseline, candidate, tolerance=0.10, min_delta_ms=1.0):
+    """Flag regressions of a candidate run against a baseline.
+
+    A latency percentile regresses when it grows by more than ``tolerance``
+    (relative) and ``min_delta_ms`` (absolute); throughput regresses when
+    RPS drops by more than ``tolerance``; any rise in error rate regresses.
+
+    Args:
+        baseline (RunResult): Reference run
+        candidate (RunResult): Run to check
+        tolerance (float, optional): Allowed relative change
+        min_delta_ms (float, optional): Latency changes below this are noise
+
+    Returns:
+        list: Human-readable regression descriptions, empty if none
+    """
+    regressions = []
+    before, after = baseline.summary(), candidate.summary()
+    for name in sorted(set(before) & set(after)):
+        old, new = before[name], after[name]
+        for percent in RunResult.PERCENTILES:
+            key = f"p{percent}_ms"
+            if new[key] > old[key] * (1 + tolerance) and new[key] - old[key] > min_delta_ms:
+                regressions.append(f"{name}: {key} {old[key]:.2f} -> {new[key]:.2f}")
+        if new["rps"] < old["rps"] * (1 - tolerance):
+            regressions.append(f"{name}: rps {old['rps']:.1f} -> {new['rps']:.1f}")
+        old_rate = old["errors"] / old["count"] if old["count"] else 0.0
+        new_rate = new["errors"] / new["count"] if new["count"] else 0.0
+        if new_rate > old_rate:
+            regressions.append(f"{name}: error rate {old_rate:.2%} -> {new_rate:.2%}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the PoetryDB client endpoints.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run a load test")
+    target = run.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="Server under test")
+    target.add_argument("--local-corpus", help="Start a local stand-in serving this corpus file")
+    run.add_argument("--mix", help="JSON or YAML request mix file")
+    run.add_argument("--mode", choices=MODES, default="threads")
+    run.add_argument("--concurrency", type=int, default=4)
+    run.add_argument("--rate", type=float, help="Target requests per second (open loop)")
+    run.add_argument("--duration", type=float, help="Seconds to run")
+    run.add_argument("--requests", type=int, help="Total requests to issue")
+    run.add_argument("--processes", type=int, help="Worker processes for --mode processes")
+    run.add_argument("--seed", type=int)
+    run.add_argument("--retries", type=int, default=0, help="Client retries per request")
+    run.add_argument("--json", help="Write results as JSON to this file")
+    run.add_argument("--csv", help="Write the summary as CSV to this file")
+
+    diff = commands.add_parser("compare", help="Compare two JSON results")
+    diff.add_argument("baseline")
+    diff.add_argument("candidate")
+    diff.add_argument("--tolerance", type=float, default=0.10)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = RunResult.from_dict(json.load(baseline_file))
+        with open(args.candidate, encoding="utf-8") as candidate_file:
+            candidate = RunResult.from_dict(json.load(candidate_file))
+        regressions = compare(baseline, candidate, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        print(f"{len(regressions)} regression(s)")
+        return 1 if regressions else 0
+
+    if args.duration is None and args.requests is None:
+        args.duration = 10.0
+    mix = RequestMix.from_file(args.mix) if args.mix else RequestMix()
+
+    server = None
+    base_url = args.base_url
+    if args.local_corpus:
+        from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+        server = LocalPoetryDBServer(PoemCorpus.from_file(args.local_corpus), seed=args.seed).start()
+        base_url = server.base_url
+    try:
+        result = LoadRunner(base_url, mix, args.mode, args.concurrency, args.rate, args.duration,
+                            args.requests, args.processes, args.seed, args.retries).run()
+    finally:
+        if server is not None:
+            server.stop()
+
+    print(result.format_table())
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json_file.write(result.to_json())
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8", newline="") as csv_file:
+            csv_file.write(result.to_csv())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
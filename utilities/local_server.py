@@ -0,0 +1,303 @@
+"""Local PoetryDB stand-in server backed by an indexed in-memory corpus.
+
+Serves the endpoints PoetryDBClient uses (``/title``, ``/author``,
+``/random/{count}/{fields}``, combined ``input,fields/term;term`` searches,
+``:abs`` matches and ``.text`` output) from a corpus file, so tests and
+load runs have a deterministic, fast target that works offline:
+
+    python -m utilities.local_server tests/data/poems.json --port 8000
+
+then point a client at it with ``PoetryDBClient("http://127.0.0.1:8000/")``.
+"""
+import argparse
+import json
+import random
+import threading
+from collections import defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from utilities.poetrydb_query import (
+    NOT_FOUND,
+    QueryError,
+    format_text,
+    matches,
+    parse_output,
+    parse_search,
+    parse_term,
+    project,
+)
+
+
+def _trigrams(text):
+    return {text[index:index + 3] for index in range(len(text) - 2)}
+
+
+class PoemCorpus:
+    """In-memory poem corpus with precomputed search indexes.
+
+    Keeps, per text field, an exact-value index (for ``:abs`` and the
+    author -> poems mapping) and a trigram index over lower-cased values
+    for case-insensitive substring search. Results are returned in corpus
+    order, like the upstream API.
+    """
+
+    TEXT_FIELDS = ("title", "author", "lines")
+
+    def __init__(self, poems):
+        """Build the corpus and its indexes.
+
+        Args:
+            poems (iterable): Poems with title, author and lines
+        """
+        self.poems = []
+        self.exact = {field: defaultdict(list) for field in self.TEXT_FIELDS}
+        self.trigrams = {field: defaultdict(set) for field in self.TEXT_FIELDS}
+        self.lowered = {field: [] for field in self.TEXT_FIELDS}
+        self.by_linecount = defaultdict(list)
+
+        for poem_id, poem in enumerate(poems):
+            poem = {
+                "title": poem["title"],
+                "author": poem["author"],
+                "lines": list(poem["lines"]),
+                "linecount": str(len(poem["lines"])),
+            }
+            self.poems.append(poem)
+            self.by_linecount[len(poem["lines"])].append(poem_id)
+            for field in self.TEXT_FIELDS:
+                values = poem["lines"] if field == "lines" else [poem[field]]
+                lowered = []
+                for value in dict.fromkeys(values):
+                    self.exact[field][value].append(poem_id)
+                    lowered.append(value.lower())
+                    for trigram in _trigrams(value.lower()):
+                        self.trigrams[field][trigram].add(poem_id)
+                self.lowered[field].append(lowered)
+
+        self.authors = sorted(self.exact["author"])
+        self.titles = sorted(self.exact["title"])
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a corpus from a JSON file holding an array of poems.
+
+        Args:
+            path (str): Path to the corpus file
+
+        Returns:
+            PoemCorpus: Indexed corpus
+        """
+        with open(path, encoding="utf-8") as corpus_file:
+            return cls(json.load(corpus_file))
+
+    def __len__(self):
+        return len(self.poems)
+
+    def poems_by_author(self, author):
+        """Return the poems of an author, matched exactly.
+
+        Args:
+            author (str): Author name
+
+        Returns:
+            list: Poems by that author
+        """
+        return [self.poems[poem_id] for poem_id in self.exact["author"].get(author, ())]
+
+    def candidates(self, field, term):
+        """Return the ids of the poems matching one search criterion.
+
+        Args:
+            field (str): Input field
+            term (str): Search term, optionally ending in ':abs'
+
+        Returns:
+            set: Matching poem ids
+        """
+        text, absolute = parse_term(term)
+        if field == "linecount":
+            try:
+                return set(self.by_linecount.get(int(text), ()))
+            except ValueError:
+                return set()
+        if absolute:
+            return set(self.exact[field].get(text, ()))
+        needle = text.lower()
+        if len(needle) < 3:
+            return {
+                poem_id for poem_id, values in enumerate(self.lowered[field])
+                if any(needle in value for value in values)
+            }
+        index = self.trigrams[field]
+        postings = sorted((index.get(trigram, set()) for trigram in _trigrams(needle)), key=len)
+        ids = set.intersection(*postings) if postings else set()
+        # Trigram hits only say the pieces occur somewhere; confirm the substring
+        return {poem_id for poem_id in ids if matches(self.poems[poem_id], field, term)}
+
+    def search(self, criteria):
+        """Return the poems matching all (field, term) criteria.
+
+        Args:
+            criteria (list): (field, term) tuples combined with AND
+
+        Returns:
+            list: Matching poems in corpus order
+        """
+        ids = None
+        for field, term in sorted(criteria, key=lambda criterion: criterion[0] == "lines"):
+            found = self.candidates(field, term)
+            ids = found if ids is None else ids & found
+            if not ids:
+                return []
+        return [self.poems[poem_id] for poem_id in sorted(ids)]
+
+
+class LocalPoetryDBServer:
+    """Threaded HTTP server answering PoetryDB requests from a PoemCorpus.
+
+    Usable as a context manager; ``port=0`` picks a free port and
+    ``base_url`` reports where the server listens.
+    """
+
+    def __init__(self, corpus, host="127.0.0.1", port=0, seed=None):
+        """Initialize the server.
+
+        Args:
+            corpus (PoemCorpus): Corpus to serve
+            host (str, optional): Interface to bind
+            port (int, optional): Port to bind, 0 for any free port
+            seed (int, optional): Seed for the /random endpoint
+        """
+        self.corpus = corpus
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """str: Base URL to hand to PoetryDBClient."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Serve requests on a background thread.
+
+        Returns:
+            LocalPoetryDBServer: This server
+        """
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests on the calling thread until interrupted."""
+        self._httpd.serve_forever()
+
+    def stop(self):
+        """Stop serving and release the socket."""
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def handle(self, path):
+        """Answer a request path.
+
+        Args:
+            path (str): Request path, e.g. '/title,author/Winter;Shakespeare/title'
+
+        Returns:
+            tuple: (HTTP status, body str)
+        """
+        parts = [unquote(part) for part in urlsplit(path).path.strip("/").split("/")]
+        parts = [part for part in parts if part]
+        try:
+            if not parts:
+                return HTTPStatus.NOT_FOUND, json.dumps(NOT_FOUND)
+            if parts[0] == "random":
+                return self._random(parts[1:])
+            if len(parts) == 1 and parts[0] in ("author", "title"):
+                key = f"{parts[0]}s"
+                values = self.corpus.authors if parts[0] == "author" else self.corpus.titles
+                return HTTPStatus.OK, json.dumps({key: values})
+            if len(parts) not in (2, 3):
+                raise QueryError("Malformed path")
+            criteria = parse_search(parts[0], parts[1])
+            fields, output_format = parse_output(parts[2] if len(parts) == 3 else None)
+            return self._render(self.corpus.search(criteria), fields, output_format)
+        except QueryError as exc:
+            return HTTPStatus.OK, json.dumps({"status": 405, "reason": str(exc)})
+
+    def _random(self, parts):
+        count = int(parts[0]) if parts and parts[0].isdigit() else 1
+        fields, output_format = parse_output(parts[1] if len(parts) > 1 else None)
+        with self._random_lock:
+            poems = self.random.sample(self.corpus.poems, min(count, len(self.corpus)))
+        return self._render(poems, fields, output_format)
+
+    def _render(self, poems, fields, output_format):
+        if not poems:
+            # PoetryDB reports misses in the body of a 200 response
+            return HTTPStatus.OK, json.dumps(NOT_FOUND)
+        if output_format == "text":
+            return HTTPStatus.OK, format_text(poems, fields)
+        return HTTPStatus.OK, json.dumps([project(poem, fields) for poem in poems], ensure_ascii=False)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY
+            # the body waits on the client's delayed ACK (~40 ms per request)
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                status, body = server.handle(self.path)
+                payload = body.encode("utf-8")
+                self.send_response(status)
+                # Upstream labels .text output as JSON too
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a PoetryDB stand-in from a corpus file.")
+    parser.add_argument("corpus", help="JSON file holding an array of poems")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--seed", type=int, default=None, help="Seed for /random")
+    args = parser.parse_args(argv)
+
+    server = LocalPoetryDBServer(PoemCorpus.from_file(args.corpus), args.host, args.port, args.seed)
+    print(f"Serving {len(server.corpus)} poems on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""In-memory metrics collector for instrumentation events.
+
+Keeps, per endpoint, a LatencyHistogram for the total request time and for
+each phase (connect, tls, ttfb, download, parse), request/error/cache-hit
+counters and payload bytes, plus a histogram per validated schema.
+Collectors serialize to JSON and merge, so per-process collectors (e.g.
+pytest-xdist workers) can be combined into one report.
+"""
+import json
+import threading
+
+from utilities.histogram import LatencyHistogram
+
+PHASES = ("total", "connect", "tls", "ttfb", "download", "parse")
+
+
+class EndpointMetrics:
+    """Counters and phase histograms for one endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.bytes = 0
+        self.phases = {}
+
+    def record(self, phase, seconds):
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.cache_hits += other.cache_hits
+        self.bytes += other.bytes
+        for phase, histogram in other.phases.items():
+            self.phases.setdefault(phase, LatencyHistogram()).merge(histogram)
+
+    def to_dict(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "bytes": self.bytes,
+            "phases": {
+                phase: dict(_summary(histogram), histogram=histogram.to_dict())
+                for phase, histogram in self.phases.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        metrics = cls()
+        metrics.requests = data["requests"]
+        metrics.errors = data["errors"]
+        metrics.cache_hits = data["cache_hits"]
+        metrics.bytes = data["bytes"]
+        metrics.phases = {
+            phase: LatencyHistogram.from_dict(entry["histogram"])
+            for phase, entry in data["phases"].items()
+        }
+        return metrics
+
+
+def _summary(histogram):
+    return {
+        "count": histogram.total_count,
+        "mean_ms": histogram.mean * 1e3,
+        "p50_ms": histogram.percentile(50) * 1e3,
+        "p90_ms": histogram.percentile(90) * 1e3,
+        "p99_ms": histogram.percentile(99) * 1e3,
+        "max_ms": histogram.max_micros / 1e3,
+    }
+
+
+class MetricsCollector:
+    """Instrumentation hook aggregating events into per-endpoint histograms."""
+
+    def __init__(self):
+        self.endpoints = {}
+        self.schemas = {}
+        self.schema_failures = {}
+        self._lock = threading.Lock()
+
+    def attach(self, instrumentation):
+        """Register this collector on an Instrumentation.
+
+        Args:
+            instrumentation (Instrumentation): Dispatcher to listen to
+
+        Returns:
+            MetricsCollector: This collector
+        """
+        instrumentation.add(self)
+        return self
+
+    def _endpoint(self, name):
+        metrics = self.endpoints.get(name)
+        if metrics is None:
+            metrics = self.endpoints[name] = EndpointMetrics()
+        return metrics
+
+    def on_request_end(self, event):
+        with self._lock:
+            metrics = self._endpoint(event.name)
+            metrics.requests += 1
+            if event.error is not None or (event.status or 0) >= 400:
+                metrics.errors += 1
+            if event.from_cache:
+                metrics.cache_hits += 1
+            metrics.bytes += event.bytes or 0
+            metrics.record("total", event.seconds)
+            for phase, seconds in event.phases.items():
+                metrics.record(phase, seconds)
+
+    def on_parse(self, event):
+        with self._lock:
+            self._endpoint(event.name).record("parse", event.seconds)
+
+    def on_validate(self, event):
+        with self._lock:
+            histogram = self.schemas.get(event.schema)
+            if histogram is None:
+                histogram = self.schemas[event.schema] = LatencyHistogram()
+            histogram.record(event.seconds)
+            if not event.ok:
+                self.schema_failures[event.schema] = self.schema_failures.get(event.schema, 0) + 1
+
+    def merge(self, other):
+        """Add another collector's metrics to this one.
+
+        Args:
+            other (MetricsCollector): Collector to merge in
+        """
+        with self._lock:
+            for name, metrics in other.endpoints.items():
+                self._endpoint(name).merge(metrics)
+            for name, histogram in other.schemas.items():
+                self.schemas.setdefault(name, LatencyHistogram()).merge(histogram)
+            for name, failures in other.schema_failures.items():
+                self.schema_failures[name] = self.schema_failures.get(name, 0) + failures
+
+    def to_dict(self):
+        """Serialize the metrics, with summaries and mergeable histograms.
+
+        Returns:
+            dict: JSON-compatible report
+        """
+        with self._lock:
+            return {
+                "endpoints": {name: metrics.to_dict() for name, metrics in sorted(self.endpoints.items())},
+                "validation": {
+                    name: dict(
+                        _summary(histogram),
+                        failures=self.schema_failures.get(name, 0),
+                        histogram=histogram.to_dict(),
+                    )
+                    for name, histogram in sorted(self.schemas.items())
+                },
+            }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a collector serialized by to_dict.
+
+        Args:
+            data (dict): Serialized metrics
+
+        Returns:
+            MetricsCollector: Collector
+        """
+        collector = cls()
+        collector.endpoints = {
+            name: EndpointMetrics.from_dict(entry) for name, entry in data["endpoints"].items()
+        }
+        for name, entry in data["validation"].items():
+            collector.schemas[name] = LatencyHistogram.from_dict(entry["histogram"])
+            if entry["failures"]:
+                collector.schema_failures[name] = entry["failures"]
+        return collector
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), indent=2)
+
+    def format_table(self):
+        """Render the metrics as a fixed-width text table.
+
+        Returns:
+            str: One row per endpoint phase and per schema
+        """
+        data = self.to_dict()
+        rows = [f"{'endpoint':<16} {'phase':<9} {'count':>6} {'mean ms':>9} {'p50 ms':>9} "
+                f"{'p99 ms':>9} {'max ms':>9}"]
+        for name, metrics in data["endpoints"].items():
+            for phase in PHASES:
+                summary = metrics["phases"].get(phase)
+                if summary is not None:
+                    rows.append(
+                        f"{name:<16} {phase:<9} {summary['count']:>6} {summary['mean_ms']:>9.2f} "
+                        f"{summary['p50_ms']:>9.2f} {summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}"
+                    )
+            rows.append(f"{name:<16} {metrics['requests']} requests, {metrics['errors']} errors, "
+                        f"{metrics['cache_hits']} cache hits, {metrics['bytes']} bytes")
+        if data["validation"]:
+            rows.append(f"{'schema':<36} {'count':>6} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for name, summary in data["validation"].items():
+            rows.append(
+                f"{name:<36} {summary['count']:>6} {summary['mean_ms']:>9.2f} {summary['p50_ms']:>9.2f} "
+                f"{summary['p99_ms']:>9.2f} {summary['max_ms']:>9.2f}  ({summary['failures']} failed)"
+            )
+        return "\n".join(rows)
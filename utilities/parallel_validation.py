@@ -0,0 +1,281 @@
+"""Pipelined, multi-process validation of large poem array responses.
+
+Schema validation is CPU-bound and holds the GIL, so one process validates
+a full-corpus payload on one core. ValidationPipeline spreads the work:
+
+* I/O threads fetch and decode responses, then shard each poem array into
+  chunks, re-encoded as compact JSON bytes (orjson when installed), which
+  are cheaper to send to another process than pickled dicts
+* a process pool validates the chunks; each worker compiles the schema
+  once, in its initializer, from the schema pickled once per worker
+* errors come back as plain ValidationIssue tuples and are merged in
+  response order, then poem order, into one ValidationReport
+
+    with ValidationPipeline(POEMS_ARRAY_SCHEMA, check_linecount=True) as pipeline:
+        report = pipeline.run({author: partial(client.get_by_author, author)
+                               for author in authors})
+    print(report.format())
+
+Throughput grows with the number of worker processes as long as validating
+a chunk costs more than shipping it. That holds for the full jsonschema
+validator. It does not hold for schemas that the generated fast path
+(utilities.schema_codegen) already checks in a few microseconds per poem;
+there ``processes=0`` validates inline.
+"""
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+from utilities.decoding import available_decoders, default_decoder
+from utilities.schema_registry import SchemaRegistry
+from utilities.validators import validate_poem_linecount
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+SCHEMA = "schema"
+LINECOUNT = "linecount"
+RESPONSE = "response"
+
+ValidationIssue = namedtuple("ValidationIssue", ["source", "index", "path", "kind", "message"])
+
+# Per-process _ChunkValidator, set up by _init_worker
+_worker = [None]
+
+
+def _encode(poems):
+    if orjson is not None:
+        return orjson.dumps(poems)
+    return json.dumps(poems, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _done(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+class _ChunkValidator:
+    """Validates chunks of poems against one compiled array schema."""
+
+    def __init__(self, schema, check_linecount, fast_path, decoder_name):
+        if schema.get("type") != "array":
+            schema = {"type": "array", "items": schema}
+        self.compiled = SchemaRegistry(fast_path=fast_path).compile(schema)
+        self.check_linecount = check_linecount
+        self.decode = available_decoders()[decoder_name]().decode
+
+    def __call__(self, source, start, payload):
+        """Validate one chunk of poems.
+
+        Args:
+            source (str): Label of the response the chunk came from
+            start (int): Index of the chunk's first poem in the response
+            payload (bytes or list): Encoded poems, or the poems themselves when inline
+
+        Returns:
+            list: ValidationIssue tuples in poem order
+        """
+        poems = self.decode(payload) if isinstance(payload, bytes) else payload
+        issues = []
+        for error in self.compiled.collect_errors(poems):
+            index = start + error.absolute_path[0]
+            path = f"$[{index}]{error.json_path[error.json_path.index(']') + 1:]}"
+            issues.append(ValidationIssue(source, index, path, SCHEMA, error.message))
+        if self.check_linecount:
+            for offset, poem in enumerate(poems):
+                index = start + offset
+                if isinstance(poem, dict):
+                    try:
+                        matched = validate_poem_linecount(poem)
+                    except (TypeError, ValueError):
+                        matched = False
+                    if not matched:
+                        issues.append(ValidationIssue(
+                            source, index, f"$[{index}].linecount", LINECOUNT,
+                            f"linecount {poem.get('linecount')!r} does not match "
+                            f"{len(poem.get('lines') or ())} lines",
+                        ))
+        issues.sort(key=lambda issue: (issue.index, issue.path))
+        return issues
+
+
+def _safe_context():
+    """Multiprocessing context that never forks the (multithreaded) caller."""
+    import multiprocessing
+
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _init_worker(*args):
+    """Compile the schema once per worker process."""
+    _worker[0] = _ChunkValidator(*args)
+
+
+def _validate_in_worker(source, start, payload):
+    return _worker[0](source, start, payload)
+
+
+class ValidationReport:
+    """Ordered validation issues across every validated response."""
+
+    def __init__(self, sources=(), issues=(), poems=0):
+        self.sources = list(sources)
+        self.issues = list(issues)
+        self.poems = poems
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def by_source(self):
+        """Group the issues per response.
+
+        Returns:
+            dict: Source label mapped to its list of ValidationIssue
+        """
+        grouped = {source: [] for source in self.sources}
+        for issue in self.issues:
+            grouped.setdefault(issue.source, []).append(issue)
+        return grouped
+
+    def to_dict(self):
+        return {
+            "sources": len(self.sources),
+            "poems": self.poems,
+            "issues": [issue._asdict() for issue in self.issues],
+        }
+
+    def format(self, limit=50):
+        """Render a summary and the first issues.
+
+        Args:
+            limit (int, optional): Issues to list
+
+        Returns:
+            str: Report text
+        """
+        lines = [f"{self.poems} poems in {len(self.sources)} responses, {len(self.issues)} issues"]
+        lines += [f"{issue.source} {issue.path} ({issue.kind}): {issue.message}" for issue in self.issues[:limit]]
+        if len(self.issues) > limit:
+            lines.append(f"... {len(self.issues) - limit} more")
+        return "\n".join(lines)
+
+
+class ValidationPipeline:
+    """Fetches on threads, validates poem chunks in worker processes."""
+
+    def __init__(self, schema, processes=None, io_threads=4, chunk_size=250,
+                 check_linecount=False, fast_path=True, decoder=None, mp_context=None):
+        """Initialize the pipeline; worker processes start on first use.
+
+        Args:
+            schema (dict): Array schema (its ``items`` are used) or item schema
+            processes (int, optional): Worker processes; defaults to the CPU count,
+                0 validates inline on the calling thread
+            io_threads (int, optional): Threads fetching and decoding responses
+            chunk_size (int, optional): Poems per chunk sent to a worker
+            check_linecount (bool, optional): Also check each poem with validate_poem_linecount
+            fast_path (bool, optional): Let workers use generated fast-path checks
+            decoder (object, optional): Decoder for response bodies, see utilities.decoding
+            mp_context (multiprocessing.context.BaseContext, optional): Start method for
+                workers. Defaults to forkserver (spawn where unavailable): the pool starts
+                while I/O threads run, and forking a multithreaded process can deadlock.
+        """
+        self.schema = schema
+        self.processes = (os.cpu_count() or 1) if processes is None else processes
+        self.chunk_size = chunk_size
+        self.decoder = decoder if decoder is not None else default_decoder()
+        initargs = (schema, check_linecount, fast_path, default_decoder().name)
+        self._io = ThreadPoolExecutor(io_threads, thread_name_prefix="validate-io")
+        self._pool = None
+        self._inline = None
+        self.mp_context = None
+        if self.processes:
+            self.mp_context = mp_context or _safe_context()
+            self._pool = ProcessPoolExecutor(self.processes, mp_context=self.mp_context,
+                                             initializer=_init_worker, initargs=initargs)
+        else:
+            self._inline = _ChunkValidator(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Shut down the I/O threads and worker processes."""
+        self._io.shutdown()
+        if self._pool is not None:
+            self._pool.shutdown()
+
+    def _submit(self, source, poems):
+        """Shard poems into chunks and start validating them.
+
+        Returns:
+            list: Futures of the chunks' issue lists, in order
+        """
+        chunks = []
+        for start in range(0, len(poems), self.chunk_size):
+            chunk = poems[start:start + self.chunk_size]
+            if self._pool is None:
+                chunks.append(_done(self._inline(source, start, chunk)))
+            else:
+                chunks.append(self._pool.submit(_validate_in_worker, source, start, _encode(chunk)))
+        return chunks
+
+    def _fetch_and_submit(self, source, fetch):
+        response = fetch()
+        try:
+            response.raise_for_status()
+            poems = self.decoder.decode(response.content)
+        except ValueError as exc:
+            return 0, [_done([ValidationIssue(source, None, "$", RESPONSE, f"undecodable body: {exc}")])]
+        if not isinstance(poems, list):
+            issue = ValidationIssue(source, None, "$", RESPONSE, f"expected a poem array, got {poems!r:.80}")
+            return 0, [_done([issue])]
+        return len(poems), self._submit(source, poems)
+
+    def _merge(self, pending):
+        report = ValidationReport()
+        for source, work in pending:
+            count, chunks = work.result()
+            report.sources.append(source)
+            report.poems += count
+            for chunk in chunks:
+                report.issues.extend(chunk.result())
+        return report
+
+    def validate(self, poems, source="response"):
+        """Validate an already decoded poem array.
+
+        Args:
+            poems (list): Poems
+            source (str, optional): Label used in the report
+
+        Returns:
+            ValidationReport: Issues ordered by poem index
+        """
+        return self._merge([(source, _done((len(poems), self._submit(source, poems))))])
+
+    def run(self, fetches):
+        """Fetch responses concurrently and validate every poem in them.
+
+        Args:
+            fetches (dict or iterable): Source label mapped to a callable returning
+                a requests.Response, or (label, callable) pairs
+
+        Returns:
+            ValidationReport: Issues ordered by source, then poem index
+
+        Raises:
+            requests.RequestException: If a fetch fails
+        """
+        items = fetches.items() if isinstance(fetches, dict) else fetches
+        pending = [(source, self._io.submit(self._fetch_and_submit, source, fetch)) for source, fetch in items]
+        return self._merge(pending)
@@ -0,0 +1,400 @@
+"""Compact on-disk poem store with memory-mapped, zero-copy line access.
+
+A corpus held as lists of dicts of lists of ``str`` costs a Python object
+per line. A store keeps every line of every poem concatenated in one UTF-8
+buffer and describes poems with flat integer arrays, so opening it is an
+``mmap`` plus a small JSON footer, and a poem's lines are sliced out of the
+mapping only when read.
+
+File layout (integers in the byte order recorded in the footer)::
+
+    0   magic         b"PDBSTORE"
+    8   version       uint32
+    12  (reserved)    uint32
+    16  footer offset uint64
+    24  footer size   uint64
+    32  lines         UTF-8 bytes of every line, back to back
+        sections      8-byte aligned arrays, see SECTIONS
+        footer        JSON: counts, byte order, interned authors, titles and
+                      the (offset, count) of each section
+
+Build one from any iterable of poems, e.g. a streamed response:
+
+    response = client.get_by_author("Emily Dickinson", stream=True)
+    build_store_from_response("dickinson.store", response)
+    with PoemStore.open("dickinson.store") as store:
+        poem = store[0]
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+
+from utilities.streaming import iter_poems
+
+MAGIC = b"PDBSTORE"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+FIELDS = ("title", "author", "lines", "linecount")
+
+# name -> array typecode: line_offsets has one entry per line plus an end
+# offset, first_lines one per poem plus an end, the rest one per poem
+SECTIONS = {
+    "line_offsets": "Q",
+    "first_lines": "Q",
+    "author_ids": "I",
+    "linecounts": "q",
+}
+
+
+class PoemStoreWriter:
+    """Writes a store incrementally, holding only the index arrays in memory.
+
+    Lines are written to disk as poems arrive; the file is moved into place
+    atomically when the writer is closed.
+    """
+
+    def __init__(self, path):
+        """Start a new store.
+
+        Args:
+            path (str): Destination file, replaced on close
+        """
+        self.path = path
+        self.authors = []
+        self.titles = []
+        self._author_ids = {}
+        self._sections = {name: array(typecode) for name, typecode in SECTIONS.items()}
+        self._sections["line_offsets"].append(0)
+        self._sections["first_lines"].append(0)
+        self._size = 0
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, self._temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        self._file = os.fdopen(descriptor, "wb")
+        self._file.write(b"\0" * HEADER.size)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def add(self, poem):
+        """Append a poem.
+
+        Args:
+            poem (dict): Poem with title, author, lines and linecount
+        """
+        sections = self._sections
+        author_id = self._author_ids.get(poem["author"])
+        if author_id is None:
+            author_id = self._author_ids[poem["author"]] = len(self.authors)
+            self.authors.append(poem["author"])
+        offsets = sections["line_offsets"]
+        for line in poem["lines"]:
+            encoded = line.encode("utf-8")
+            self._file.write(encoded)
+            self._size += len(encoded)
+            offsets.append(self._size)
+        sections["first_lines"].append(len(offsets) - 1)
+        sections["author_ids"].append(author_id)
+        sections["linecounts"].append(int(poem["linecount"]))
+        self.titles.append(poem["title"])
+
+    def close(self):
+        """Write the index sections and footer and move the file into place."""
+        if self._file is None:
+            return
+        layout = {}
+        position = HEADER.size + self._size
+        for name, values in self._sections.items():
+            padding = -position % 8
+            self._file.write(b"\0" * padding)
+            position += padding
+            layout[name] = [position, len(values)]
+            values.tofile(self._file)
+            position += len(values) * values.itemsize
+        footer = json.dumps({
+            "poems": len(self.titles),
+            "lines": len(self._sections["line_offsets"]) - 1,
+            "byteorder": sys.byteorder,
+            "authors": self.authors,
+            "titles": self.titles,
+            "sections": layout,
+        }, ensure_ascii=False).encode("utf-8")
+        self._file.write(footer)
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, 0, position, len(footer)))
+        self._file.close()
+        self._file = None
+        os.replace(self._temp_path, self.path)
+
+    def abort(self):
+        """Discard the partially written store."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self._temp_path)
+
+
+def build_store(path, poems):
+    """Write poems to a store file.
+
+    Args:
+        path (str): Destination file
+        poems (iterable): Poems, consumed one at a time
+
+    Returns:
+        int: Number of poems written
+    """
+    with PoemStoreWriter(path) as writer:
+        for poem in poems:
+            writer.add(poem)
+    return len(writer)
+
+
+def build_store_from_response(path, response):
+    """Write the poems of a streamed PoetryDB response to a store file.
+
+    Args:
+        path (str): Destination file
+        response (requests.Response): Response requested with ``stream=True``
+
+    Returns:
+        int: Number of poems written
+    """
+    return build_store(path, iter_poems(response))
+
+
+class PoemLines(Sequence):
+    """The lines of one poem, decoded from the mapping only when indexed."""
+
+    __slots__ = ("_store", "_first", "_count")
+
+    def __init__(self, store, first, count):
+        self._store = store
+        self._first = first
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("line index out of range")
+        return str(self.raw(index), "utf-8")
+
+    def raw(self, index):
+        """Return one line's UTF-8 bytes as a zero-copy view into the mapping.
+
+        Args:
+            index (int): Line index within the poem
+
+        Returns:
+            memoryview: Line bytes; release it before closing the store
+        """
+        offsets = self._store._sections["line_offsets"]
+        line = self._first + index
+        return self._store._lines[offsets[line]:offsets[line + 1]]
+
+    def __eq__(self, other):
+        if isinstance(other, (PoemLines, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PoemLines({list(self)!r})"
+
+
+class PoemRecord:
+    """A lightweight view of one poem in a PoemStore."""
+
+    __slots__ = ("_store", "index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self.index = index
+
+    @property
+    def title(self):
+        """str: Poem title."""
+        return self._store.titles[self.index]
+
+    @property
+    def author(self):
+        """str: Poem author, shared by every poem of that author."""
+        return self._store.authors[self._store._sections["author_ids"][self.index]]
+
+    @property
+    def linecount(self):
+        """str: Line count as reported by the API."""
+        return str(self._store._sections["linecounts"][self.index])
+
+    @property
+    def lines(self):
+        """PoemLines: The poem's lines, decoded lazily."""
+        first_lines = self._store._sections["first_lines"]
+        first = first_lines[self.index]
+        return PoemLines(self._store, first, first_lines[self.index + 1] - first)
+
+    def get(self, field, default=None):
+        """Look up a field by name, like dict.get on a poem.
+
+        Args:
+            field (str): 'title', 'author', 'lines' or 'linecount'
+            default (object, optional): Returned for other names
+
+        Returns:
+            object: Field value
+        """
+        if field in FIELDS:
+            return getattr(self, field)
+        return default
+
+    def __getitem__(self, field):
+        if field not in self:
+            raise KeyError(field)
+        return getattr(self, field)
+
+    def __contains__(self, field):
+        return field in FIELDS
+
+    def to_dict(self):
+        """Return the poem as the API's JSON shape.
+
+        Returns:
+            dict: title, author, lines (list of str) and linecount
+        """
+        return {
+            "title": self.title,
+            "author": self.author,
+            "lines": list(self.lines),
+            "linecount": self.linecount,
+        }
+
+    def __repr__(self):
+        return f"PoemRecord({self.index}, {self.title!r}, {self.author!r})"
+
+
+class PoemStore(Sequence):
+    """Read-only, memory-mapped poem store.
+
+    Indexing yields PoemRecord views; nothing is decoded until a field is
+    read. Usable as a context manager.
+    """
+
+    def __init__(self, path):
+        """Map a store file.
+
+        Args:
+            path (str): Store file written by PoemStoreWriter
+
+        Raises:
+            ValueError: If the file is not a store or was written on a
+                machine with a different byte order
+        """
+        self.path = path
+        with open(path, "rb") as store_file:
+            self._mmap = mmap.mmap(store_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, footer_offset, footer_size = HEADER.unpack_from(self._mmap)
+        except struct.error:
+            magic = None
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} poem store")
+        footer = json.loads(self._mmap[footer_offset:footer_offset + footer_size])
+        if footer["byteorder"] != sys.byteorder:
+            self._mmap.close()
+            raise ValueError(f"{path} was written with {footer['byteorder']}-endian integers")
+
+        self.authors = [sys.intern(author) for author in footer["authors"]]
+        self.titles = footer["titles"]
+        self.line_count = footer["lines"]
+        self._view = memoryview(self._mmap)
+        first_section = min((offset for offset, _ in footer["sections"].values()), default=footer_offset)
+        self._lines = self._view[HEADER.size:first_section]
+        self._sections = {}
+        for name, typecode in SECTIONS.items():
+            offset, count = footer["sections"][name]
+            size = count * array(typecode).itemsize
+            self._sections[name] = self._view[offset:offset + size].cast(typecode)
+
+    @classmethod
+    def open(cls, path):
+        """Map a store file.
+
+        Args:
+            path (str): Store file
+
+        Returns:
+            PoemStore: Opened store
+        """
+        return cls(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Unmap the file. Zero-copy line views must have been released first."""
+        if self._mmap.closed:
+            return
+        for view in self._sections.values():
+            view.release()
+        self._lines.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("poem index out of range")
+        return PoemRecord(self, index)
+
+    def by_author(self, author):
+        """Return the poems of an author, matched exactly.
+
+        Args:
+            author (str): Author name
+
+        Returns:
+            list: PoemRecord objects in store order
+        """
+        try:
+            author_id = self.authors.index(author)
+        except ValueError:
+            return []
+        author_ids = self._sections["author_ids"]
+        return [PoemRecord(self, index) for index in range(len(self)) if author_ids[index] == author_id]
+
+    def iter_dicts(self):
+        """Yield every poem in the API's JSON shape, one at a time.
+
+        Yields:
+            dict: Poem data, e.g. for schema validation
+        """
+        for record in self:
+            yield record.to_dict()
@@ -0,0 +1,161 @@
+"""PoetryDB query semantics shared by the offline tools.
+
+Mirrors how the API interprets ``/<input fields>/<search terms>/<output
+fields>`` paths so local components (the stand-in server, batch planner,
+search index) answer queries the same way the real service does:
+
+* ``title``, ``author`` and ``lines`` match a case-insensitive substring,
+  or the exact value when the term ends in ``:abs``
+* ``linecount`` matches the number of lines exactly
+* several input fields are combined with AND, one ``;``-separated term each
+* output fields are a comma-separated subset of POEM_FIELDS (or ``all``),
+  optionally suffixed with ``.json`` or ``.text``
+"""
+
+POEM_FIELDS = ("title", "author", "lines", "linecount")
+SEARCH_FIELDS = ("title", "author", "lines", "linecount")
+
+ABSOLUTE_SUFFIX = ":abs"
+
+NOT_FOUND = {"status": 404, "reason": "Not found"}
+
+
+class QueryError(ValueError):
+    """Raised for paths the PoetryDB API would reject."""
+
+
+def parse_term(term):
+    """Split a search term into its text and absolute-match flag.
+
+    Args:
+        term (str): Search term, e.g. 'Winter' or 'Winter:abs'
+
+    Returns:
+        tuple: (text str, absolute bool)
+    """
+    if term.endswith(ABSOLUTE_SUFFIX):
+        return term[:-len(ABSOLUTE_SUFFIX)], True
+    return term, False
+
+
+def parse_output(output):
+    """Parse an output specification into fields and format.
+
+    Args:
+        output (str or None): e.g. 'title,author', 'lines.text' or 'all.json'
+
+    Returns:
+        tuple: (tuple of field names in POEM_FIELDS order, format 'json' or 'text')
+
+    Raises:
+        QueryError: If an unknown field is requested
+    """
+    output_format = "json"
+    if output and output.endswith((".json", ".text")):
+        output, output_format = output.rsplit(".", 1)
+    if not output or output == "all":
+        return POEM_FIELDS, output_format
+    requested = output.split(",")
+    unknown = set(requested) - set(POEM_FIELDS)
+    if unknown:
+        raise QueryError(f"Unknown output field(s): {', '.join(sorted(unknown))}")
+    return tuple(field for field in POEM_FIELDS if field in requested), output_format
+
+
+def parse_search(input_fields, search_terms):
+    """Pair comma-separated input fields with their ';'-separated terms.
+
+    Args:
+        input_fields (str): e.g. 'title,author'
+        search_terms (str): e.g. 'Winter;Shakespeare'
+
+    Returns:
+        list: (field, term) tuples, terms still carrying any ':abs' suffix
+
+    Raises:
+        QueryError: If a field is not searchable or the counts differ
+    """
+    fields = input_fields.split(",")
+    terms = search_terms.split(";")
+    if len(fields) != len(terms):
+        raise QueryError("Each input field needs exactly one search term")
+    for field in fields:
+        if field not in SEARCH_FIELDS:
+            raise QueryError(f"Unknown input field: {field}")
+    return list(zip(fields, terms))
+
+
+def matches(poem, field, term):
+    """Check whether a poem satisfies one search criterion.
+
+    Args:
+        poem (dict): Poem with all POEM_FIELDS
+        field (str): Input field
+        term (str): Search term, optionally ending in ':abs'
+
+    Returns:
+        bool: True if the poem matches
+    """
+    text, absolute = parse_term(term)
+    if field == "linecount":
+        try:
+            return len(poem["lines"]) == int(text)
+        except ValueError:
+            return False
+    values = poem["lines"] if field == "lines" else (poem[field],)
+    if absolute:
+        return text in values
+    needle = text.lower()
+    return any(needle in value.lower() for value in values)
+
+
+def matches_all(poem, criteria):
+    """Check a poem against (field, term) criteria combined with AND.
+
+    Args:
+        poem (dict): Poem with all POEM_FIELDS
+        criteria (iterable): (field, term) tuples
+
+    Returns:
+        bool: True if every criterion matches
+    """
+    return all(matches(poem, field, term) for field, term in criteria)
+
+
+def project(poem, fields):
+    """Keep only the requested output fields of a poem, in API order.
+
+    Args:
+        poem (dict): Poem data
+        fields (iterable): Output fields
+
+    Returns:
+        dict: Poem restricted to ``fields``
+    """
+    return {field: poem[field] for field in POEM_FIELDS if field in fields}
+
+
+def format_text(poems, fields):
+    """Render poems in PoetryDB's ``.text`` output format.
+
+    Every field is written as its name on one line followed by its value;
+    ``lines`` spans one line per poem line.
+
+    Args:
+        poems (iterable): Poems to render
+        fields (iterable): Output fields
+
+    Returns:
+        str: Plain-text rendering
+    """
+    out = []
+    for poem in poems:
+        for field in POEM_FIELDS:
+            if field not in fields:
+                continue
+            out.append(field)
+            if field == "lines":
+                out.extend(poem["lines"])
+            else:
+                out.append(str(poem[field]))
+    return "\n".join(out) + "\n" if out else ""
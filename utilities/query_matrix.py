@@ -0,0 +1,482 @@
+"""Generated query matrix for broad PoetryDB coverage.
+
+Derives search queries from a seed corpus: every searchable field, searched
+by exact value (``:abs``) and by substring, alone and in pairs, plus terms
+that match nothing, crossed with every subset of output fields in JSON and
+``.text``. Each query carries the response it should get, worked out from
+the seed corpus, and the item schema for its output fields, projected from
+an item schema such as ``POEM_SCHEMA``.
+
+run_matrix sends the queries concurrently through a PoetryDBClient and
+checks every response against the poems an index of the seed corpus (a
+utilities.search_index.PoemIndex) expects. Queries are deduplicated by
+path and shuffled, so a run cut short by its time budget still covers every
+query shape; with a checkpoint file each result is appended as one JSON
+line and a later run skips the queries already there.
+
+    python -m utilities.query_matrix --local-corpus tests/data/poems.json
+    python -m utilities.query_matrix --base-url https://poetrydb.org/ --lenient \\
+        --checkpoint matrix.jsonl --budget 300
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utilities.api_client import PoetryDBClient
+from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+from utilities.poetrydb_query import ABSOLUTE_SUFFIX, NOT_FOUND, POEM_FIELDS, SEARCH_FIELDS, project
+from utilities.schema_registry import default_registry
+from utilities.search_index import PoemIndex
+from utilities.streaming import parse_text_poems
+from utilities.validators import collect_schema_errors
+
+OUTPUT_FORMATS = ("json", "text")
+
+# Characters that would change the meaning of a path segment
+_UNSAFE = frozenset("/;?#%\\")
+
+# Fields identifying a poem when the seed text may differ from the server's
+IDENTITY_FIELDS = ("title", "author")
+
+# Projected schemas by (item schema JSON, fields), compiled once per process
+_projections = {}
+
+# Substring terms that no seed poem contains
+_MISSING_TERMS = {"title": "qzxv", "author": "qzxv", "lines": "qzxv", "linecount": "99999"}
+
+
+class Query(namedtuple("Query", ["criteria", "fields", "output_format"])):
+    """One generated request: (field, term) criteria, output fields and format."""
+
+    __slots__ = ()
+
+    @property
+    def input_fields(self):
+        """str: Comma-separated input fields."""
+        return ",".join(field for field, _ in self.criteria)
+
+    @property
+    def search_terms(self):
+        """str: Semicolon-separated search terms."""
+        return ";".join(term for _, term in self.criteria)
+
+    @property
+    def output(self):
+        """str: Output specification, e.g. 'title,lines.text'."""
+        suffix = ".text" if self.output_format == "text" else ""
+        return ",".join(self.fields) + suffix
+
+    @property
+    def path(self):
+        """str: Request path, also the deduplication and checkpoint key."""
+        return f"{self.input_fields}/{self.search_terms}/{self.output}"
+
+    @property
+    def shape(self):
+        """str: The query with its terms abstracted, e.g. 'title:abs,author/lines.text'."""
+        inputs = ",".join(
+            field + (ABSOLUTE_SUFFIX if term.endswith(ABSOLUTE_SUFFIX) else "")
+            for field, term in self.criteria
+        )
+        return f"{inputs}/{self.output}"
+
+
+def projected_schema(item_schema, fields):
+    """Restrict an object schema to some of its properties, all required.
+
+    Args:
+        item_schema (dict): Object schema, e.g. POEM_SCHEMA
+        fields (iterable): Properties to keep
+
+    Returns:
+        dict: Array schema whose items hold exactly ``fields``
+    """
+    fields = list(fields)
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "required": fields,
+            "properties": {field: item_schema["properties"][field] for field in fields},
+            "additionalProperties": False,
+        },
+    }
+
+
+def registered_projection(item_schema, fields):
+    """Return the projected schema for some fields, shared by every run.
+
+    Each projection is built and compiled into the default registry once,
+    named after its fields (e.g. ``poem[title,lines]``), so repeated runs
+    reuse it instead of registering new anonymous schemas.
+
+    Args:
+        item_schema (dict): Object schema, e.g. POEM_SCHEMA
+        fields (tuple): Properties to keep
+
+    Returns:
+        dict: Array schema, see projected_schema
+    """
+    key = (json.dumps(item_schema, sort_keys=True), tuple(fields))
+    schema = _projections.get(key)
+    if schema is None:
+        # setdefault keeps one schema object when threads race to build it
+        schema = _projections.setdefault(key, projected_schema(item_schema, fields))
+        default_registry.compile(schema, f"poem[{','.join(fields)}]")
+    return schema
+
+
+def _usable(term):
+    return bool(term.strip()) and not _UNSAFE.intersection(term) and term == term.strip()
+
+
+def seed_terms(poems, rng, per_poem=2, text_terms=True):
+    """Collect search terms per field from seed poems.
+
+    Args:
+        poems (iterable): Seed poems
+        rng (random.Random): Source of the sampled words and lines
+        per_poem (int, optional): Lines sampled per poem for the lines field
+        text_terms (bool, optional): Derive lines and linecount terms from the
+            poem text; turn off when the seed text may differ from the server's
+
+    Returns:
+        dict: Field mapped to a list of terms, exact ones ending in ':abs'
+    """
+    terms = {field: {} for field in SEARCH_FIELDS}
+    for poem in poems:
+        for field in ("title", "author"):
+            value = poem[field]
+            words = [word for word in value.split() if len(word) > 3]
+            candidates = [value + ABSOLUTE_SUFFIX, value.lower()]
+            if words:
+                candidates.append(rng.choice(words))
+            for term in candidates:
+                if _usable(term):
+                    terms[field][term] = None
+        if not text_terms:
+            continue
+        lines = [line for line in poem["lines"] if _usable(line)]
+        for line in rng.sample(lines, min(per_poem, len(lines))):
+            terms["lines"][line + ABSOLUTE_SUFFIX] = None
+            words = [word.strip(".,;:!?'\"") for word in line.split()]
+            words = [word for word in words if len(word) > 3 and _usable(word)]
+            if words:
+                terms["lines"][rng.choice(words)] = None
+        terms["linecount"][str(len(poem["lines"]))] = None
+    for field, term in _MISSING_TERMS.items():
+        terms[field][term] = None
+    return {field: list(field_terms) for field, field_terms in terms.items()}
+
+
+def output_fields():
+    """Return every non-empty subset of POEM_FIELDS, in API order.
+
+    Returns:
+        list: Tuples of field names
+    """
+    return [
+        fields for size in range(1, len(POEM_FIELDS) + 1)
+        for fields in itertools.combinations(POEM_FIELDS, size)
+    ]
+
+
+def generate_queries(poems, seed=0, limit=None, pairs_per_field=8, text_terms=True):
+    """Generate a deduplicated, shuffled query matrix from seed poems.
+
+    Args:
+        poems (iterable): Seed poems
+        seed (int, optional): Seed for term sampling and order
+        limit (int, optional): Keep only this many queries
+        pairs_per_field (int, optional): Terms per field combined into
+            two-field searches, keeping the pair count bounded
+        text_terms (bool, optional): See seed_terms
+
+    Returns:
+        list: Query objects, each path once
+    """
+    rng = random.Random(seed)
+    terms = seed_terms(poems, rng, text_terms=text_terms)
+    searches = [((field, term),) for field in SEARCH_FIELDS for term in terms[field]]
+    for first, second in itertools.combinations(SEARCH_FIELDS, 2):
+        first_terms = rng.sample(terms[first], min(pairs_per_field, len(terms[first])))
+        second_terms = rng.sample(terms[second], min(pairs_per_field, len(terms[second])))
+        searches.extend(((first, a), (second, b)) for a in first_terms for b in second_terms)
+    outputs = output_fields()
+    queries = {}
+    for criteria in searches:
+        for fields in outputs:
+            for output_format in OUTPUT_FORMATS:
+                query = Query(criteria, fields, output_format)
+                queries.setdefault(query.path, query)
+    queries = list(queries.values())
+    rng.shuffle(queries)
+    return queries[:limit] if limit is not None else queries
+
+
+def check_response(query, response, expected, schema, strict=True):
+    """Check one response against the seed corpus and the projected schema.
+
+    Args:
+        query (Query): Query that was sent
+        response (requests.Response): Response to it
+        expected (list): Seed poems the query matches
+        schema (dict): Array schema for the query's output fields
+        strict (bool, optional): Require exactly the expected poems, in order;
+            otherwise the server may return more poems than the seed corpus, and
+            expected poems are only identified by their IDENTITY_FIELDS
+
+    Returns:
+        str or None: Description of the problem, None if the response is correct
+    """
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
+    if query.output_format == "text" and not response.text.startswith("{"):
+        try:
+            records = list(parse_text_poems(response.text.splitlines(), query.fields))
+        except ValueError as exc:
+            return f"unparseable text: {exc}"
+    else:
+        try:
+            records = response.json()
+        except ValueError:
+            return "invalid JSON"
+    if isinstance(records, dict):
+        if records == NOT_FOUND:
+            return f"not found, expected {len(expected)} poems" if expected else None
+        return f"unexpected status object: {records}"
+    if not expected and strict:
+        return f"expected not found, got {len(records)} poems"
+    errors = collect_schema_errors(records, schema)
+    if errors:
+        return f"schema: {errors[0].message} at {errors[0].json_path}"
+    if strict:
+        wanted = [project(poem, query.fields) for poem in expected]
+        return None if records == wanted else f"got {len(records)} poems, expected {len(wanted)}"
+    # The seed text may differ from the server's, so compare identities only
+    fields = [field for field in IDENTITY_FIELDS if field in query.fields]
+    if not fields:
+        if len(records) < len(expected):
+            return f"got {len(records)} poems, expected at least {len(expected)}"
+        return None
+    missing = Counter(_identity(poem, fields) for poem in expected)
+    missing -= Counter(_identity(record, fields) for record in records)
+    return f"{sum(missing.values())} expected poems missing" if missing else None
+
+
+def _identity(record, fields):
+    return tuple(record[field] for field in fields)
+
+
+def load_checkpoint(path):
+    """Read the results of an earlier run.
+
+    A line cut off by an interrupted write is dropped and truncated away,
+    so appending resumes on a clean line.
+
+    Args:
+        path (str): Checkpoint file, may not exist yet
+
+    Returns:
+        dict: Query path mapped to its result record
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "rb+") as checkpoint_file:
+        data = checkpoint_file.read()
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            checkpoint_file.truncate(complete)
+    results = {}
+    for line in data[:complete].splitlines():
+        if line.strip():
+            record = json.loads(line)
+            results[record["path"]] = record
+    return results
+
+
+class MatrixReport:
+    """Outcome of a query matrix run, including results resumed from a checkpoint."""
+
+    def __init__(self, planned, shapes):
+        self.planned = planned
+        self.shapes_total = len(shapes)
+        self.shapes_covered = set()
+        self.resumed = 0
+        self.run = 0
+        self.passed = 0
+        self.failures = []
+        self.seconds = 0.0
+
+    @property
+    def not_run(self):
+        """int: Queries left over when the time budget ran out."""
+        return self.planned - self.resumed - self.run
+
+    @property
+    def ok(self):
+        return not self.failures
+
+    def add(self, record, shape):
+        self.shapes_covered.add(shape)
+        if record["problem"] is None:
+            self.passed += 1
+        else:
+            self.failures.append((record["path"], record["problem"]))
+
+    def to_dict(self):
+        return {
+            "planned": self.planned,
+            "resumed": self.resumed,
+            "run": self.run,
+            "not_run": self.not_run,
+            "passed": self.passed,
+            "failed": len(self.failures),
+            "shapes_covered": len(self.shapes_covered),
+            "shapes_total": self.shapes_total,
+            "seconds": self.seconds,
+            "failures": [{"path": path, "problem": problem} for path, problem in self.failures],
+        }
+
+    def format(self, limit=20):
+        """Render a summary followed by the first failures.
+
+        Args:
+            limit (int, optional): Failures to list
+
+        Returns:
+            str: Report text
+        """
+        lines = [
+            f"{self.run} run, {self.resumed} resumed, {self.not_run} not run of {self.planned}; "
+            f"{self.passed} passed, {len(self.failures)} failed; "
+            f"{len(self.shapes_covered)}/{self.shapes_total} shapes in {self.seconds:.1f}s"
+        ]
+        lines += [f"FAIL {path}: {problem}" for path, problem in self.failures[:limit]]
+        if len(self.failures) > limit:
+            lines.append(f"... {len(self.failures) - limit} more")
+        return "\n".join(lines)
+
+
+def run_matrix(client, queries, corpus, item_schema, checkpoint=None, budget=None,
+               max_workers=8, strict=True, clock=time.monotonic):
+    """Send queries concurrently and check every response.
+
+    Args:
+        client (PoetryDBClient): Client to send through
+        queries (iterable): Query objects; repeated paths are sent once
+        corpus (PoemIndex or PoemCorpus): Seed poems the expected results come from,
+            through their ``search(criteria)``
+        item_schema (dict): Object schema projected onto each query's fields
+        checkpoint (str, optional): JSONL file of results to resume from and append to
+        budget (float, optional): Seconds after which no new query is started
+        max_workers (int, optional): Concurrent requests
+        strict (bool, optional): See check_response
+        clock (callable, optional): Monotonic time source
+
+    Returns:
+        MatrixReport: Counts, failures and shape coverage
+    """
+    import requests
+
+    queries = list({query.path: query for query in queries}.values())
+    shapes = {query.path: query.shape for query in queries}
+    report = MatrixReport(len(queries), set(shapes.values()))
+    done = load_checkpoint(checkpoint) if checkpoint else {}
+    for path, record in done.items():
+        if path in shapes:
+            report.resumed += 1
+            report.add(record, shapes[path])
+    todo = iter([query for query in queries if query.path not in done])
+    schemas = {fields: registered_projection(item_schema, fields)
+               for fields in {query.fields for query in queries}}
+
+    def run_one(query):
+        schema = schemas[query.fields]
+        started = clock()
+        try:
+            response = client.combined_search(query.input_fields, query.search_terms, query.output)
+            problem = check_response(query, response, corpus.search(query.criteria), schema, strict)
+        except requests.RequestException as exc:
+            problem = f"{type(exc).__name__}: {exc}"
+        return {"path": query.path, "problem": problem, "seconds": round(clock() - started, 6)}
+
+    started = clock()
+    deadline = None if budget is None else started + budget
+    checkpoint_file = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            pending = {}
+            while True:
+                # Keep a bounded window in flight so the budget stops the run promptly
+                while len(pending) < 2 * max_workers and (deadline is None or clock() < deadline):
+                    query = next(todo, None)
+                    if query is None:
+                        break
+                    pending[pool.submit(run_one, query)] = query
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    query = pending.pop(future)
+                    record = future.result()
+                    report.run += 1
+                    report.add(record, query.shape)
+                    if checkpoint_file is not None:
+                        checkpoint_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        checkpoint_file.flush()
+    finally:
+        if checkpoint_file is not None:
+            checkpoint_file.close()
+    report.seconds = clock() - started
+    return report
+
+
+def main(argv=None):
+    from tests.schemas.poem_schema import POEM_SCHEMA
+
+    parser = argparse.ArgumentParser(description="Run a generated PoetryDB query matrix.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="Server under test")
+    target.add_argument("--local-corpus", help="Start a local stand-in serving this corpus file")
+    parser.add_argument("--seed-corpus", help="Poems to derive queries from (default: --local-corpus)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--limit", type=int, help="Run at most this many queries")
+    parser.add_argument("--budget", type=float, help="Seconds after which no new query starts")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--checkpoint", help="JSONL file to resume from and append results to")
+    parser.add_argument("--lenient", action="store_true",
+                        help="Allow more matches than the seed corpus has and skip queries on its "
+                             "text (for the public API)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    seed_path = args.seed_corpus or args.local_corpus
+    if seed_path is None:
+        parser.error("--seed-corpus is required with --base-url")
+    corpus = PoemIndex.from_file(seed_path)
+    queries = generate_queries(corpus.poems, args.seed, args.limit, text_terms=not args.lenient)
+
+    server = None
+    if args.local_corpus:
+        server = LocalPoetryDBServer(PoemCorpus.from_file(args.local_corpus)).start()
+    try:
+        with PoetryDBClient(server.base_url if server else args.base_url,
+                            pool_size=args.workers) as client:
+            report = run_matrix(client, queries, corpus, POEM_SCHEMA, args.checkpoint,
+                                args.budget, args.workers, not args.lenient)
+    finally:
+        if server is not None:
+            server.stop()
+    print(json.dumps(report.to_dict(), indent=2) if args.json else report.format())
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,448 @@
+"""Statistical uniformity analysis of the /random endpoint.
+
+sample_random keeps a bounded window of ``get_random`` calls in flight and
+feeds every returned poem to a RandomnessAnalyzer, which holds one count
+per distinct poem in a compact open-addressing table (64-bit key hashes
+and 32-bit counts in two arrays) and updates its statistics in O(1) per
+sample:
+
+* chi-square goodness of fit against a uniform draw from ``population``
+  poems, from the running sum of squared counts, with a Wilson-Hilferty
+  p-value
+* coverage (distinct / population) and the Good-Turing estimate of the
+  probability mass already seen
+* pairwise collisions, the birthday-problem population estimate they
+  imply, and the Chao1 richness estimate
+* duplicates within a single response, which a sampler without
+  replacement never returns
+
+Sampling stops early with a ``skewed`` verdict as soon as the test rejects
+uniformity, or with ``uniform`` once enough samples were collected for the
+test to detect a sampler whose distribution is at least ``effect`` away
+from uniform in total variation distance with probability ``power``.
+Interim looks happen each time the sample size doubles and split ``alpha``
+between them, so repeated testing does not inflate the false alarm rate.
+
+    python -m utilities.randomness --local-corpus tests/data/poems.json
+    python -m utilities.randomness --base-url https://poetrydb.org/ --population 3010
+"""
+import argparse
+import hashlib
+import json
+import math
+import sys
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from statistics import NormalDist
+
+from utilities.api_client import PoetryDBClient
+from utilities.local_server import LocalPoetryDBServer, PoemCorpus
+
+UNIFORM = "uniform"
+SKEWED = "skewed"
+CONTINUE = "continue"
+INCONCLUSIVE = "inconclusive"
+
+_STANDARD_NORMAL = NormalDist()
+
+
+def sample_key(poem, fields=("title", "author")):
+    """Hash the identifying fields of a sampled poem to a non-zero 64-bit key.
+
+    Args:
+        poem (dict): Poem from a /random response
+        fields (tuple, optional): Fields identifying a poem
+
+    Returns:
+        int: Key
+    """
+    text = "\0".join(str(poem.get(field, "")) for field in fields)
+    key = int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+    return key or 1
+
+
+def chi_square_sf(statistic, df):
+    """Approximate the chi-square survival function (Wilson-Hilferty).
+
+    Args:
+        statistic (float): Chi-square statistic
+        df (int): Degrees of freedom
+
+    Returns:
+        float: P(X >= statistic)
+    """
+    if statistic <= 0:
+        return 1.0
+    scale = 2.0 / (9.0 * df)
+    z = ((statistic / df) ** (1.0 / 3.0) - (1.0 - scale)) / math.sqrt(scale)
+    return 1.0 - _STANDARD_NORMAL.cdf(z)
+
+
+def required_samples(population, effect, alpha, power):
+    """Samples after which the chi-square test detects a given skew.
+
+    A distribution at total variation distance ``effect`` from uniform over
+    ``population`` items gives a noncentrality of at least
+    ``4 * n * effect ** 2``; the returned ``n`` makes the test reject it at
+    level ``alpha`` with probability ``power`` (normal approximation), and
+    is never below five expected hits per item.
+
+    Args:
+        population (int): Number of distinct poems
+        effect (float): Total variation distance to detect
+        alpha (float): Significance level of the look
+        power (float): Detection probability
+
+    Returns:
+        int: Sample size
+    """
+    df = population - 1
+    z_alpha = _STANDARD_NORMAL.inv_cdf(1 - alpha)
+    z_beta = _STANDARD_NORMAL.inv_cdf(power)
+    noncentrality = z_alpha * math.sqrt(2 * df)
+    for _ in range(100):
+        updated = z_alpha * math.sqrt(2 * df) + z_beta * math.sqrt(2 * (df + 2 * noncentrality))
+        if abs(updated - noncentrality) < 1e-6:
+            break
+        noncentrality = updated
+    return max(5 * population, math.ceil(noncentrality / (4 * effect ** 2)))
+
+
+class CountTable:
+    """Open-addressing hash table of 64-bit keys to 32-bit counts."""
+
+    def __init__(self, capacity=1024):
+        size = 1
+        while size < capacity * 2:
+            size <<= 1
+        self._keys = array("Q", bytes(8 * size))
+        self._counts = array("I", bytes(4 * size))
+        self._mask = size - 1
+        self.distinct = 0
+
+    def increment(self, key):
+        """Add one to a key's count.
+
+        Args:
+            key (int): Non-zero 64-bit key
+
+        Returns:
+            int: The count before the increment
+        """
+        keys = self._keys
+        slot = key & self._mask
+        while keys[slot] != key:
+            if keys[slot] == 0:
+                keys[slot] = key
+                self.distinct += 1
+                if self.distinct * 2 > len(keys):
+                    self._grow()
+                    return self.increment(key) - 1
+                break
+            slot = (slot + 1) & self._mask
+        previous = self._counts[slot]
+        self._counts[slot] = previous + 1
+        return previous
+
+    def get(self, key):
+        slot = key & self._mask
+        while self._keys[slot] != 0:
+            if self._keys[slot] == key:
+                return self._counts[slot]
+            slot = (slot + 1) & self._mask
+        return 0
+
+    def counts(self):
+        """Yield the non-zero counts."""
+        return (count for count in self._counts if count)
+
+    def _grow(self):
+        entries = [(key, count) for key, count in zip(self._keys, self._counts) if key]
+        size = len(self._keys) * 2
+        self._keys = array("Q", bytes(8 * size))
+        self._counts = array("I", bytes(4 * size))
+        self._mask = size - 1
+        for key, count in entries:
+            slot = key & self._mask
+            while self._keys[slot]:
+                slot = (slot + 1) & self._mask
+            self._keys[slot] = key
+            self._counts[slot] = count
+
+
+class RandomnessAnalyzer:
+    """Online uniformity statistics over sampled poems."""
+
+    def __init__(self, population=None, alpha=0.01, effect=0.1, power=0.9,
+                 min_samples=None, key_fields=("title", "author")):
+        """Initialize the analyzer.
+
+        Args:
+            population (int, optional): Number of poems the endpoint samples from;
+                without it only the estimates are computed and the verdict is
+                'inconclusive'
+            alpha (float, optional): Overall false alarm rate
+            effect (float, optional): Total variation distance from uniform to detect
+            power (float, optional): Probability of detecting such a skew
+            min_samples (int, optional): Samples before the first look; defaults to
+                five expected hits per poem
+            key_fields (tuple, optional): Fields identifying a poem
+
+        Raises:
+            ValueError: If population is less than 2
+        """
+        if population is not None and population < 2:
+            raise ValueError("population must be at least 2 for a goodness-of-fit test")
+        self.population = population
+        self.alpha = alpha
+        self.effect = effect
+        self.power = power
+        self.key_fields = key_fields
+        self.table = CountTable(population or 1024)
+        self.samples = 0
+        self.responses = 0
+        self.sum_squares = 0
+        self.singletons = 0
+        self.doubletons = 0
+        self.within_response_duplicates = 0
+        self.min_samples = min_samples or 5 * (population or 1)
+        if population:
+            self.looks = max(1, math.ceil(math.log2(max(1, required_samples(
+                population, effect, alpha, power) / self.min_samples))) + 1)
+            self.required = required_samples(population, effect, alpha / self.looks, power)
+        else:
+            self.looks = 1
+            self.required = None
+        self._next_look = self.min_samples
+        self._decision = CONTINUE if population else INCONCLUSIVE
+        self._p_value = None
+
+    def add_response(self, poems):
+        """Count the poems of one /random response.
+
+        Args:
+            poems (list): Poems of the response
+        """
+        self.responses += 1
+        seen = set()
+        for poem in poems:
+            key = sample_key(poem, self.key_fields)
+            if key in seen:
+                self.within_response_duplicates += 1
+            seen.add(key)
+            self.add(key)
+
+    def add(self, key):
+        """Count one sample.
+
+        Args:
+            key (int): Sample key from sample_key
+        """
+        previous = self.table.increment(key)
+        self.samples += 1
+        self.sum_squares += 2 * previous + 1
+        if previous == 0:
+            self.singletons += 1
+        elif previous == 1:
+            self.singletons -= 1
+            self.doubletons += 1
+        elif previous == 2:
+            self.doubletons -= 1
+
+    @property
+    def collisions(self):
+        """int: Pairs of samples that drew the same poem."""
+        return (self.sum_squares - self.samples) // 2
+
+    @property
+    def chi_square(self):
+        """float: Statistic against a uniform draw from the population."""
+        if not self.population or not self.samples:
+            return None
+        return self.population * self.sum_squares / self.samples - self.samples
+
+    @property
+    def p_value(self):
+        """float: P-value of the chi-square statistic, None before any sample."""
+        statistic = self.chi_square
+        return None if statistic is None else chi_square_sf(statistic, self.population - 1)
+
+    def estimated_population(self):
+        """Population size implied by the collision rate (birthday estimate).
+
+        Returns:
+            float or None: Estimate, None before the first collision
+        """
+        if not self.collisions:
+            return None
+        return self.samples * (self.samples - 1) / (2 * self.collisions)
+
+    def chao1(self):
+        """Chao1 lower-bound estimate of the number of distinct poems.
+
+        Returns:
+            float: Estimate
+        """
+        if self.doubletons:
+            return self.table.distinct + self.singletons ** 2 / (2 * self.doubletons)
+        return self.table.distinct + self.singletons * (self.singletons - 1) / 2
+
+    def decision(self):
+        """Decide whether sampling can stop.
+
+        Looks at the test whenever the sample size reaches the next doubling
+        point, at level ``alpha / looks``.
+
+        Returns:
+            str: 'skewed', 'uniform', 'continue' or 'inconclusive'
+        """
+        if self._decision != CONTINUE or self.samples < self._next_look:
+            return self._decision
+        while self._next_look <= self.samples:
+            self._next_look *= 2
+        if self.within_response_duplicates:
+            self._decision = SKEWED
+        elif self.p_value < self.alpha / self.looks:
+            self._decision = SKEWED
+        elif self.samples >= self.required:
+            self._decision = UNIFORM
+        return self._decision
+
+    def finish(self):
+        """Mark sampling as stopped; a test still waiting for samples is 'inconclusive'.
+
+        Returns:
+            str: Final decision
+        """
+        if self.decision() == CONTINUE:
+            self._decision = INCONCLUSIVE
+        return self._decision
+
+    def to_dict(self):
+        distinct = self.table.distinct
+        return {
+            "decision": self.decision(),
+            "samples": self.samples,
+            "responses": self.responses,
+            "distinct": distinct,
+            "population": self.population,
+            "coverage": distinct / self.population if self.population else None,
+            "good_turing_coverage": 1 - self.singletons / self.samples if self.samples else None,
+            "collisions": self.collisions,
+            "estimated_population": self.estimated_population(),
+            "chao1": self.chao1(),
+            "chi_square": self.chi_square,
+            "df": self.population - 1 if self.population else None,
+            "p_value": self.p_value,
+            "required_samples": self.required,
+            "within_response_duplicates": self.within_response_duplicates,
+        }
+
+    def format(self):
+        """Render the statistics as a short report.
+
+        Returns:
+            str: Report text
+        """
+        data = self.to_dict()
+        lines = [
+            f"{data['decision']}: {data['samples']} samples in {data['responses']} responses, "
+            f"{data['distinct']} distinct",
+            f"collisions {data['collisions']}, estimated population "
+            f"{_number(data['estimated_population'])}, chao1 {_number(data['chao1'])}, "
+            f"good-turing coverage {_number(data['good_turing_coverage'], '.3f')}",
+        ]
+        if self.population:
+            lines.append(
+                f"chi-square {data['chi_square']:.1f} on {data['df']} df, p={data['p_value']:.4g} "
+                f"(alpha {self.alpha / self.looks:.4g} per look), coverage {data['coverage']:.3f}, "
+                f"{data['required_samples']} samples for power {self.power} at effect {self.effect}"
+            )
+        if self.within_response_duplicates:
+            lines.append(f"{self.within_response_duplicates} duplicates within single responses")
+        return "\n".join(lines)
+
+
+def _number(value, spec=".0f"):
+    return "-" if value is None else format(value, spec)
+
+
+def sample_random(client, analyzer, per_request=20, max_samples=50000, max_workers=8):
+    """Sample /random concurrently until the analyzer reaches a decision.
+
+    If ``max_samples`` runs out first, the decision is 'inconclusive'.
+
+    Args:
+        client (PoetryDBClient): Client to sample through
+        analyzer (RandomnessAnalyzer): Receives every response
+        per_request (int, optional): Poems asked for per call
+        max_samples (int, optional): Stop after this many samples regardless
+        max_workers (int, optional): Calls in flight at once
+
+    Returns:
+        RandomnessAnalyzer: The analyzer, for chaining
+
+    Raises:
+        requests.RequestException: If a call fails
+    """
+    fields = ",".join(analyzer.key_fields)
+
+    def fetch():
+        response = client.get_random(per_request, fields)
+        response.raise_for_status()
+        return client.json(response)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = set()
+        while True:
+            # Requests already in flight will be counted too, so stop issuing
+            # as soon as they cover the sample cap
+            in_flight = len(pending) * per_request
+            while (len(pending) < max_workers and analyzer.decision() in (CONTINUE, INCONCLUSIVE)
+                   and analyzer.samples + in_flight < max_samples):
+                pending.add(pool.submit(fetch))
+                in_flight += per_request
+            if not pending:
+                analyzer.finish()
+                return analyzer
+            finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                poems = future.result()
+                if isinstance(poems, list):
+                    analyzer.add_response(poems)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Test the uniformity of /random.")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--base-url", help="Server under test")
+    target.add_argument("--local-corpus", help="Start a local stand-in serving this corpus file")
+    parser.add_argument("--population", type=int,
+                        help="Number of poems sampled from (default: size of --local-corpus)")
+    parser.add_argument("--per-request", type=int, default=20)
+    parser.add_argument("--max-samples", type=int, default=50000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--alpha", type=float, default=0.01)
+    parser.add_argument("--effect", type=float, default=0.1)
+    parser.add_argument("--power", type=float, default=0.9)
+    parser.add_argument("--json", action="store_true", help="Print the statistics as JSON")
+    args = parser.parse_args(argv)
+
+    server = None
+    population = args.population
+    if args.local_corpus:
+        server = LocalPoetryDBServer(PoemCorpus.from_file(args.local_corpus)).start()
+        population = population or len(server.corpus)
+    analyzer = RandomnessAnalyzer(population, args.alpha, args.effect, args.power)
+    try:
+        with PoetryDBClient(server.base_url if server else args.base_url, pool_size=args.workers) as client:
+            sample_random(client, analyzer, args.per_request, args.max_samples, args.workers)
+    finally:
+        if server is not None:
+            server.stop()
+    print(json.dumps(analyzer.to_dict(), indent=2) if args.json else analyzer.format())
+    return 1 if analyzer.decision() == SKEWED else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Client-side throttling and failure isolation for PoetryDB clients.
+
+* AdaptiveRateLimiter - a token bucket whose rate adapts AIMD-style:
+  additive increase while responses are fast and successful, multiplicative
+  decrease on 429/503 or responses slower than a latency target, and a
+  global pause honouring ``Retry-After``
+* CircuitBreaker - per-endpoint breaker that opens after consecutive
+  failures (connection errors, timeouts, 5xx), fails fast while open and
+  lets a limited number of half-open probes through after a cool-down
+
+Both are thread-safe. Pass the same instances to several PoetryDBClient or
+AsyncPoetryDBClient objects (which run requests on threads) to share one
+budget and one view of upstream health between them.
+
+CircuitOpenError and ThrottledRetry subclass requests and urllib3 types and
+live in utilities.http_types; they are importable from here too.
+"""
+import email.utils
+import threading
+import time
+
+THROTTLE_STATUSES = (429, 503)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def parse_retry_after(value, now=None):
+    """Convert a Retry-After header to seconds.
+
+    Args:
+        value (str or None): Delay in seconds or an HTTP date
+        now (float, optional): Current Unix time, for dates
+
+    Returns:
+        float or None: Seconds to wait, None if absent or malformed
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment is None:
+        return None
+    return max(0.0, moment.timestamp() - (time.time() if now is None else now))
+
+
+class AdaptiveRateLimiter:
+    """Token bucket with AIMD rate adaptation."""
+
+    def __init__(self, rate=10.0, burst=None, min_rate=0.5, max_rate=100.0, increase=1.0,
+                 decrease=0.5, latency_target=None, adjust_interval=1.0, max_pause=60.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        """Initialize the limiter.
+
+        Args:
+            rate (float, optional): Initial requests per second
+            burst (float, optional): Bucket size; defaults to one second's worth at ``rate``
+            min_rate (float, optional): Floor for multiplicative decrease
+            max_rate (float, optional): Ceiling for additive increase
+            increase (float, optional): Requests per second added per adjustment
+            decrease (float, optional): Factor applied to the rate on throttling
+            latency_target (float, optional): Seconds above which a response counts as slow
+            adjust_interval (float, optional): Minimum seconds between rate changes, so a
+                burst of responses to the same conditions moves the rate only once
+            max_pause (float, optional): Cap on a Retry-After pause
+            clock (callable, optional): Monotonic time source
+            sleep (callable, optional): Sleep function
+        """
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else max(1.0, self.rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.adjust_interval = adjust_interval
+        self.max_pause = max_pause
+        self.clock = clock
+        self.sleep = sleep
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "throttled": 0, "slow": 0,
+                      "increases": 0, "decreases": 0}
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._last_adjust = None
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    self.stats["acquired"] += 1
+                    self.stats["waited_seconds"] += waited
+                    return waited
+                else:
+                    wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+            waited += wait
+
+    def feedback(self, status, latency=None, retry_after=None):
+        """Adapt the rate to the outcome of one response.
+
+        Args:
+            status (int): HTTP status code
+            latency (float, optional): Seconds the request took
+            retry_after (str, optional): Retry-After header value
+        """
+        with self._lock:
+            now = self.clock()
+            if status in THROTTLE_STATUSES:
+                self.stats["throttled"] += 1
+                pause = parse_retry_after(retry_after)
+                if pause:
+                    self._paused_until = max(self._paused_until, now + min(pause, self.max_pause))
+                # Drop saved-up tokens so the bucket does not burst into a throttled server
+                self._refill(now)
+                self._tokens = min(self._tokens, 0.0)
+                self._adjust(now, self.decrease, 0.0)
+            elif self.latency_target is not None and latency is not None and latency > self.latency_target:
+                self.stats["slow"] += 1
+                self._adjust(now, self.decrease, 0.0)
+            elif status < 400:
+                self._adjust(now, 1.0, self.increase)
+
+    def _adjust(self, now, factor, addend):
+        if self._last_adjust is not None and now - self._last_adjust < self.adjust_interval:
+            return
+        self._refill(now)
+        rate = min(self.max_rate, max(self.min_rate, self.rate * factor + addend))
+        if rate != self.rate:
+            self.stats["increases" if rate > self.rate else "decreases"] += 1
+            self.rate = rate
+        self._last_adjust = now
+
+
+def _circuit_open(message):
+    from utilities.http_types import CircuitOpenError
+    return CircuitOpenError(message)
+
+
+class _Circuit:
+    __slots__ = ("state", "failures", "opened_at", "probes")
+
+    def __init__(self):
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probes = 0
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker with half-open probes."""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, half_open_probes=1,
+                 clock=time.monotonic):
+        """Initialize the breaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures that open a circuit
+            reset_timeout (float, optional): Seconds a circuit stays open before probing
+            half_open_probes (int, optional): Requests let through at once while half-open
+            clock (callable, optional): Monotonic time source
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.clock = clock
+        self._circuits = {}
+        self._lock = threading.Lock()
+
+    def before(self, key):
+        """Admit a request, or fail fast.
+
+        Args:
+            key (str): Endpoint name
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with every
+                probe slot taken
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if circuit.state == OPEN:
+                remaining = circuit.opened_at + self.reset_timeout - self.clock()
+                if remaining > 0:
+                    raise _circuit_open(f"Circuit for {key!r} is open; retry in {remaining:.1f}s")
+                circuit.state = HALF_OPEN
+                circuit.probes = 0
+            if circuit.state == HALF_OPEN:
+                if circuit.probes >= self.half_open_probes:
+                    raise _circuit_open(f"Circuit for {key!r} is half-open; probe in flight")
+                circuit.probes += 1
+
+    def record(self, key, success):
+        """Record the outcome of an admitted request.
+
+        Args:
+            key (str): Endpoint name
+            success (bool): False for connection errors, timeouts and 5xx responses
+        """
+        with self._lock:
+            circuit = self._circuits.setdefault(key, _Circuit())
+            if circuit.state == HALF_OPEN:
+                circuit.probes = max(0, circuit.probes - 1)
+            if success:
+                circuit.state = CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == HALF_OPEN or circuit.failures >= self.failure_threshold:
+                circuit.state = OPEN
+                circuit.opened_at = self.clock()
+
+    def state(self, key):
+        """Return the state of an endpoint's circuit.
+
+        Args:
+            key (str): Endpoint name
+
+        Returns:
+            str: 'closed', 'open' or 'half_open'
+        """
+        with self._lock:
+            circuit = self._circuits.get(key)
+            return circuit.state if circuit is not None else CLOSED
+
+    def states(self):
+        """Return the state of every circuit seen so far.
+
+        Returns:
+            dict: Endpoint name mapped to state
+        """
+        with self._lock:
+            return {key: circuit.state for key, circuit in self._circuits.items()}
+
+
+def __getattr__(name):
+    if name in ("CircuitOpenError", "ThrottledRetry"):
+        from utilities import http_types
+        return getattr(http_types, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,337 @@
+"""Record/replay response cache ("cassettes") for PoetryDBClient.
+
+Responses are keyed by normalized URL and kept in two tiers: a small
+in-process LRU in front of an on-disk store shared between runs and
+between pytest-xdist workers. Modes:
+
+* ``record`` - serve hits from the cache, fetch and store misses
+* ``replay`` - serve hits from the cache, raise CacheMiss on a miss
+* ``passthrough`` - bypass the cache entirely
+
+Endpoints whose answer is meant to differ per call (``/random``) are
+never cached unless ``cache_random`` is set.
+"""
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+
+RECORD = "record"
+REPLAY = "replay"
+PASSTHROUGH = "passthrough"
+MODES = (RECORD, REPLAY, PASSTHROUGH)
+
+UNCACHEABLE_ENDPOINTS = ("random",)
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_PATH_SAFE = "/:,;@!$&'()*+="
+_FRAMING_HEADERS = ("content-encoding", "transfer-encoding", "content-length")
+
+
+class CacheMiss(LookupError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def normalize_url(url):
+    """Normalize a URL into a cache key.
+
+    Lower-cases the scheme and host, drops default ports and fragments,
+    re-quotes the path consistently and sorts query parameters, so
+    equivalent spellings of a request share one entry.
+
+    Args:
+        url (str): Request URL
+
+    Returns:
+        str: Normalized URL
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = quote(unquote(parts.path), safe=_PATH_SAFE) or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+class MemoryTier:
+    """Thread-safe in-process LRU of cache entries."""
+
+    def __init__(self, max_entries=256, ttl=None):
+        """Initialize the tier.
+
+        Args:
+            max_entries (int, optional): Entries kept before the least recently used is evicted
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if _expired(entry, self.ttl):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskStore:
+    """Directory of JSON cache entries, one file per key, with TTL and LRU eviction.
+
+    Files are written atomically, so several processes can share a store.
+    A file's modification time records its last use and drives eviction,
+    which runs in batches: once the store is over ``max_entries`` it drops
+    the least recently used entries down to ``low_water``, so the directory
+    is listed once per batch rather than on every insert.
+    """
+
+    def __init__(self, directory, max_entries=10000, ttl=None, low_water=None):
+        """Initialize the store.
+
+        Args:
+            directory (str): Directory holding the entries, created if missing
+            max_entries (int, optional): Entries kept before the least recently used are evicted
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+            low_water (int, optional): Entries left after an eviction; defaults
+                to 90% of ``max_entries``
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.low_water = max_entries - max_entries // 10 if low_water is None else low_water
+        os.makedirs(directory, exist_ok=True)
+        self._count = len(self._files())
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._files())
+
+    def path(self, key):
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, encoding="utf-8") as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("key") != key:
+            return None
+        if _expired(entry, self.ttl):
+            self._remove(path)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        path = self.path(key)
+        existed = os.path.exists(path)
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as temp_file:
+            json.dump(dict(entry, key=key), temp_file)
+        os.replace(temp_path, path)
+        with self._lock:
+            if not existed:
+                self._count += 1
+            if self._count > self.max_entries:
+                self._evict()
+
+    def clear(self):
+        for path in self._files():
+            self._remove(path)
+        with self._lock:
+            self._count = 0
+
+    def _files(self):
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    def _evict(self):
+        files = []
+        for path in self._files():
+            try:
+                files.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        files.sort()
+        excess = len(files) - self.low_water if len(files) > self.max_entries else 0
+        for _, path in files[:excess]:
+            self._remove(path)
+        self._count = len(files) - excess
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _expired(entry, ttl):
+    return ttl is not None and time.time() - entry["stored_at"] > ttl
+
+
+class ResponseCache:
+    """Two-tier response cache consulted by PoetryDBClient._make_request."""
+
+    def __init__(self, directory=None, mode=RECORD, ttl=None, max_entries=10000,
+                 memory_entries=256, cache_random=False):
+        """Initialize the cache.
+
+        Args:
+            directory (str, optional): On-disk store; None keeps entries in memory only
+            mode (str, optional): 'record', 'replay' or 'passthrough'
+            ttl (float, optional): Seconds an entry stays valid, None for no expiry
+            max_entries (int, optional): Entries kept on disk
+            memory_entries (int, optional): Entries kept in the in-process tier
+            cache_random (bool, optional): Also cache endpoints in UNCACHEABLE_ENDPOINTS
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        self.mode = mode
+        self.cache_random = cache_random
+        self.memory = MemoryTier(memory_entries, ttl)
+        self.disk = DiskStore(directory, max_entries, ttl) if directory else None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+        self._stats_lock = threading.Lock()
+
+    def cacheable(self, endpoint):
+        """Check whether responses for an endpoint may be cached.
+
+        Args:
+            endpoint (str): Endpoint path relative to the base URL
+
+        Returns:
+            bool: True if the endpoint is cacheable in the current mode
+        """
+        if self.mode == PASSTHROUGH:
+            return False
+        first_segment = endpoint.lstrip("/").split("/", 1)[0]
+        return self.cache_random or first_segment not in UNCACHEABLE_ENDPOINTS
+
+    def fetch(self, url, endpoint, send):
+        """Return a cached response for a URL, or send the request.
+
+        Args:
+            url (str): Full request URL
+            endpoint (str): Endpoint path relative to the base URL
+            send (callable): Performs the request and returns a requests.Response
+
+        Returns:
+            requests.Response: Cached or fresh response
+
+        Raises:
+            CacheMiss: In replay mode, when no response was recorded
+        """
+        if not self.cacheable(endpoint):
+            self._count("bypassed")
+            return send()
+        key = normalize_url(url)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._count("memory_hits")
+            return _to_response(entry)
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self._count("disk_hits")
+                self.memory.put(key, entry)
+                return _to_response(entry)
+        self._count("misses")
+        if self.mode == REPLAY:
+            raise CacheMiss(f"No recorded response for {key}")
+        response = send()
+        if response.status_code < 500 and response.status_code != 429:
+            self.store(key, response)
+        return response
+
+    def store(self, key, response):
+        """Store a response under a normalized URL key.
+
+        Args:
+            key (str): Normalized URL
+            response (requests.Response): Response to store; its body is read
+        """
+        entry = _to_entry(response)
+        self.memory.put(key, entry)
+        if self.disk is not None:
+            self.disk.put(key, entry)
+        self._count("stores")
+
+    def clear(self):
+        """Drop every cached entry from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+
+def _to_entry(response):
+    return {
+        "url": response.url,
+        "status_code": response.status_code,
+        "reason": response.reason,
+        # The stored body is already decoded, so drop transfer framing headers
+        "headers": {
+            name: value for name, value in response.headers.items()
+            if name.lower() not in _FRAMING_HEADERS
+        },
+        "body": base64.b64encode(response.content).decode("ascii"),
+        "stored_at": time.time(),
+    }
+
+
+def _to_response(entry):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    response = requests.Response()
+    response.status_code = entry["status_code"]
+    response.reason = entry.get("reason")
+    response.url = entry["url"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = base64.b64decode(entry["body"])
+    response._content_consumed = True
+    response.from_cache = True
+    return response
@@ -0,0 +1,194 @@
+"""Generate specialized fast-path validation functions from JSON schemas.
+
+The poem schemas are small, fixed-shape objects, so most of the work a
+generic validator does walking the schema tree is unnecessary. For schemas
+built only from the keywords in SUPPORTED_KEYWORDS this module emits Python
+source made of direct key-set and exact type checks, compiles it once and
+returns a predicate. The predicate is conservative: it may return False
+for data the schema accepts (e.g. subclasses of builtin types), but never
+True for data the schema rejects, so callers fall back to full validation
+whenever it returns False.
+"""
+
+SUPPORTED_KEYWORDS = frozenset({
+    "type", "properties", "required", "additionalProperties", "items",
+    # Annotations that do not affect validation
+    "$schema", "$id", "title", "description", "$comment",
+})
+
+_TYPE_EXPRESSIONS = {
+    "string": "str",
+    "integer": "int",
+    "number": "int, float",
+    "boolean": "bool",
+    "array": "list",
+    "object": "dict",
+    "null": "type(None)",
+}
+
+
+class UnsupportedSchema(Exception):
+    """Raised when a schema uses keywords the generator cannot translate."""
+
+
+class _Generator:
+    """Accumulates the source of one generated validation function."""
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self._names = 0
+
+    def new_name(self, prefix):
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def constant(self, value):
+        name = self.new_name("_k")
+        self.constants[name] = value
+        return name
+
+    def emit(self, depth, line):
+        self.lines.append("    " * depth + line)
+
+    def check(self, schema, var, depth):
+        """Emit statements that ``return False`` unless ``var`` matches ``schema``."""
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"boolean or non-object schema: {schema!r}")
+        unsupported = set(schema) - SUPPORTED_KEYWORDS
+        if unsupported:
+            raise UnsupportedSchema(f"unsupported keywords: {sorted(unsupported)}")
+
+        types = schema.get("type")
+        if types is not None:
+            self._check_type(types, var, depth)
+        object_keywords = {"properties", "required", "additionalProperties"} & set(schema)
+        if object_keywords:
+            if types not in ("object", ["object"]):
+                raise UnsupportedSchema("object keywords without type 'object'")
+            self._check_object(schema, var, depth)
+        if "items" in schema:
+            if types not in ("array", ["array"]):
+                raise UnsupportedSchema("'items' without type 'array'")
+            item = self.new_name("_item")
+            self.emit(depth, f"for {item} in {var}:")
+            self.check(schema["items"], item, depth + 1)
+
+    def _check_type(self, types, var, depth):
+        if isinstance(types, str):
+            types = [types]
+        try:
+            expressions = [_TYPE_EXPRESSIONS[name] for name in types]
+        except KeyError as exc:
+            raise UnsupportedSchema(f"unknown type {exc.args[0]!r}") from None
+        if len(expressions) == 1 and "," not in expressions[0]:
+            self.emit(depth, f"if type({var}) is not {expressions[0]}:")
+        else:
+            self.emit(depth, f"if type({var}) not in ({', '.join(expressions)},):")
+        self.emit(depth + 1, "return False")
+
+    def _check_object(self, schema, var, depth):
+        properties = schema.get("properties", {})
+        required = frozenset(schema.get("required", ()))
+        additional = schema.get("additionalProperties", True)
+        if additional not in (True, False):
+            raise UnsupportedSchema("additionalProperties must be a boolean")
+
+        keys = self.new_name("_keys")
+        self.emit(depth, f"{keys} = {var}.keys()")
+        if additional is False and required == frozenset(properties):
+            # Fixed shape: one set comparison covers both keywords
+            self.emit(depth, f"if {keys} != {self.constant(required)}:")
+            self.emit(depth + 1, "return False")
+            optional = False
+        else:
+            if required:
+                self.emit(depth, f"if not {self.constant(required)} <= {keys}:")
+                self.emit(depth + 1, "return False")
+            if additional is False:
+                self.emit(depth, f"if not {keys} <= {self.constant(frozenset(properties))}:")
+                self.emit(depth + 1, "return False")
+            optional = True
+
+        for name, subschema in properties.items():
+            value = self.new_name("_v")
+            if optional and name not in required:
+                self.emit(depth, f"if {name!r} in {var}:")
+                self.emit(depth + 1, f"{value} = {var}[{name!r}]")
+                self.check(subschema, value, depth + 1)
+            else:
+                self.emit(depth, f"{value} = {var}[{name!r}]")
+                self.check(subschema, value, depth)
+
+
+def generate_source(schema, function_name="fast_check"):
+    """Generate the source of a fast-path validation function.
+
+    Args:
+        schema (dict): JSON schema to translate
+        function_name (str, optional): Name of the generated function
+
+    Returns:
+        tuple: (source code str, dict of constants the code refers to)
+
+    Raises:
+        UnsupportedSchema: If the schema cannot be translated
+    """
+    generator = _Generator()
+    generator.emit(0, f"def {function_name}(instance):")
+    generator.check(schema, "instance", 1)
+    generator.emit(1, "return True")
+    return "\n".join(generator.lines) + "\n", generator.constants
+
+
+def compile_fast_check(schema):
+    """Generate and compile a fast-path validation function without loading it.
+
+    The code object and constants can be stored with ``marshal`` and
+    turned back into the predicate by load_fast_check.
+
+    Args:
+        schema (dict): JSON schema to translate
+
+    Returns:
+        tuple: (code object, dict of constants, source str)
+
+    Raises:
+        UnsupportedSchema: If the schema cannot be translated
+    """
+    source, constants = generate_source(schema)
+    return compile(source, "<schema fast path>", "exec"), constants, source
+
+
+def load_fast_check(code, constants, source=None):
+    """Turn the output of compile_fast_check into the predicate.
+
+    Args:
+        code (code): Compiled module code defining ``fast_check``
+        constants (dict): Constants the code refers to
+        source (str, optional): Generated source, kept as the function's ``source``
+
+    Returns:
+        callable: Predicate returning True only for valid instances
+    """
+    namespace = dict(constants)
+    exec(code, namespace)
+    fast_check = namespace["fast_check"]
+    fast_check.source = source
+    return fast_check
+
+
+def build_fast_check(schema):
+    """Compile a fast-path validation function for a schema.
+
+    Args:
+        schema (dict): JSON schema to translate
+
+    Returns:
+        callable or None: Predicate returning True only for valid instances,
+        or None if the schema uses keywords the generator does not support
+    """
+    try:
+        return load_fast_check(*compile_fast_check(schema))
+    except UnsupportedSchema:
+        return None
@@ -0,0 +1,346 @@
+"""Compiled, cached JSON schema validators.
+
+jsonschema is imported the first time a full validator is needed. With a
+``cache_dir``, a SchemaRegistry also stores each schema's generated fast
+path (as a marshalled code object) and the fact that the schema passed its
+metaschema check, keyed by the schema's content. Later runs load the fast
+path from disk and only build the full validator, importing jsonschema,
+when an instance fails the fast path.
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from utilities import schema_codegen
+
+# Digest of the code generator's source and the interpreter, see _codegen_fingerprint
+_fingerprint = [None]
+
+
+def _full_validator(schema, check=True):
+    """Build the jsonschema validator for the draft a schema declares.
+
+    Raises:
+        jsonschema.exceptions.SchemaError: If ``check`` and the schema is invalid
+    """
+    from jsonschema import validators as jsonschema_validators
+
+    validator_class = jsonschema_validators.validator_for(schema)
+    if check:
+        validator_class.check_schema(schema)
+    return validator_class(schema)
+
+
+def _document_order(error):
+    """Sort key placing array indexes in numeric order and keys in lexical order."""
+    return [(0, part) if isinstance(part, int) else (1, part) for part in error.absolute_path]
+
+
+class CompiledSchema:
+    """A JSON schema checked and compiled into a reusable validator.
+
+    When the schema is simple enough, a generated fast-path check runs
+    first and the full validator only runs when it fails, to confirm the
+    failure and produce a precise error. Also keeps running timing
+    statistics for every validation done with it.
+    """
+
+    def __init__(self, name, schema, validator, compile_seconds, fast_check=None):
+        """Initialize the compiled schema.
+
+        Args:
+            name (str): Display name of the schema
+            schema (dict): The schema itself
+            validator (jsonschema.protocols.Validator): Validator built for the schema,
+                or None to build it on first use
+            compile_seconds (float): Time spent checking and compiling the schema
+            fast_check (callable, optional): Generated predicate accepting only valid instances
+        """
+        self.name = name
+        self.schema = schema
+        self._validator = validator
+        self.compile_seconds = compile_seconds
+        self.fast_check = fast_check
+        self.calls = 0
+        self.failures = 0
+        self.fast_path_hits = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def validator(self):
+        """jsonschema.protocols.Validator: Full validator, built on first use."""
+        if self._validator is None:
+            with self._lock:
+                if self._validator is None:
+                    self._validator = _full_validator(self.schema, check=False)
+        return self._validator
+
+    def first_error(self, instance):
+        """Validate an instance, stopping at the first error.
+
+        Args:
+            instance (dict or list): Data to validate
+
+        Returns:
+            jsonschema.exceptions.ValidationError or None: The error, None if valid
+        """
+        start = time.perf_counter()
+        if self.fast_check is not None and self.fast_check(instance):
+            self._record(time.perf_counter() - start, False, fast_path=True)
+            return None
+        error = next(self.validator.iter_errors(instance), None)
+        self._record(time.perf_counter() - start, error is not None)
+        return error
+
+    def validate(self, instance):
+        """Validate an instance, stopping at the first error.
+
+        Args:
+            instance (dict or list): Data to validate
+
+        Raises:
+            jsonschema.exceptions.ValidationError: If validation fails
+        """
+        error = self.first_error(instance)
+        if error is not None:
+            raise error
+
+    def collect_errors(self, instance):
+        """Validate an instance and collect every error.
+
+        Args:
+            instance (dict or list): Data to validate
+
+        Returns:
+            list: ValidationError objects in document order
+        """
+        start = time.perf_counter()
+        if self.fast_check is not None and self.fast_check(instance):
+            self._record(time.perf_counter() - start, False, fast_path=True)
+            return []
+        errors = sorted(self.validator.iter_errors(instance), key=_document_order)
+        self._record(time.perf_counter() - start, bool(errors))
+        return errors
+
+    def stats(self):
+        """Return the timing statistics of this schema.
+
+        Returns:
+            dict: Call, failure and fast-path hit counts, total/mean
+            validation seconds and compile seconds
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "failures": self.failures,
+                "fast_path_hits": self.fast_path_hits,
+                "total_seconds": self.total_seconds,
+                "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+                "compile_seconds": self.compile_seconds,
+            }
+
+    def reset_stats(self):
+        """Zero the timing statistics."""
+        with self._lock:
+            self.calls = 0
+            self.failures = 0
+            self.fast_path_hits = 0
+            self.total_seconds = 0.0
+
+    def _record(self, elapsed, failed, fast_path=False):
+        with self._lock:
+            self.calls += 1
+            self.total_seconds += elapsed
+            if failed:
+                self.failures += 1
+            if fast_path:
+                self.fast_path_hits += 1
+
+
+class SchemaRegistry:
+    """Cache of compiled validators keyed by schema identity.
+
+    Each schema is checked against its metaschema and turned into a
+    validator once, using the Draft class its ``$schema`` declares (the
+    latest draft when it declares none), and reused on every later call.
+    Schemas found in ``cache_dir`` were checked by an earlier run; their
+    validator is built on first use.
+    """
+
+    def __init__(self, fast_path=True, cache_dir=None):
+        """Initialize the registry.
+
+        Args:
+            fast_path (bool, optional): Generate fast-path checks for simple schemas
+            cache_dir (str, optional): Directory persisting compiled fast paths between runs
+        """
+        self.fast_path = fast_path
+        self.cache_dir = cache_dir
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def compile(self, schema, name=None):
+        """Return the compiled validator for a schema, building it on first use.
+
+        Args:
+            schema (dict): JSON schema
+            name (str, optional): Display name used in timing reports
+
+        Returns:
+            CompiledSchema: Compiled schema
+        """
+        compiled = self._compiled.get(id(schema))
+        # The entry holds a reference to its schema, so a matching id can
+        # only be reused by a different object once the entry is replaced.
+        if compiled is not None and compiled.schema is schema:
+            if name and compiled.name != name:
+                compiled.name = name
+            return compiled
+        with self._lock:
+            compiled = self._compiled.get(id(schema))
+            if compiled is None or compiled.schema is not schema:
+                compiled = self._build(schema, name)
+                self._compiled[id(schema)] = compiled
+        return compiled
+
+    def register_module(self, module):
+        """Compile every ``*_SCHEMA`` dict defined in a module, named after its attribute.
+
+        Args:
+            module (module): Module holding schema constants, e.g. tests.schemas.poem_schema
+
+        Returns:
+            list: The CompiledSchema objects, one per schema
+        """
+        return [
+            self.compile(value, name)
+            for name, value in vars(module).items()
+            if name.endswith("_SCHEMA") and isinstance(value, dict)
+        ]
+
+    def validate(self, instance, schema):
+        """Validate an instance, stopping at the first error.
+
+        Args:
+            instance (dict or list): Data to validate
+            schema (dict): JSON schema to validate against
+
+        Raises:
+            jsonschema.exceptions.ValidationError: If validation fails
+        """
+        self.compile(schema).validate(instance)
+
+    def collect_errors(self, instance, schema):
+        """Validate an instance and collect every error.
+
+        Args:
+            instance (dict or list): Data to validate
+            schema (dict): JSON schema to validate against
+
+        Returns:
+            list: ValidationError objects in document order
+        """
+        return self.compile(schema).collect_errors(instance)
+
+    def stats(self):
+        """Return timing statistics for every compiled schema.
+
+        Returns:
+            dict: Schema name mapped to its statistics
+        """
+        return {compiled.name: compiled.stats() for compiled in list(self._compiled.values())}
+
+    def reset_stats(self):
+        """Zero the timing statistics of every compiled schema."""
+        for compiled in list(self._compiled.values()):
+            compiled.reset_stats()
+
+    def report(self):
+        """Format the timing statistics as a plain-text table.
+
+        Returns:
+            str: One line per schema that has been used, slowest first
+        """
+        rows = sorted(
+            ((name, stats) for name, stats in self.stats().items() if stats["calls"]),
+            key=lambda row: row[1]["total_seconds"],
+            reverse=True,
+        )
+        lines = [f"{'schema':<40} {'calls':>7} {'fails':>6} {'fast':>7} {'total ms':>10} {'mean us':>10} {'compile ms':>11}"]
+        for name, stats in rows:
+            lines.append(
+                f"{name:<40} {stats['calls']:>7} {stats['failures']:>6} {stats['fast_path_hits']:>7} "
+                f"{stats['total_seconds'] * 1e3:>10.2f} {stats['mean_seconds'] * 1e6:>10.1f} "
+                f"{stats['compile_seconds'] * 1e3:>11.2f}"
+            )
+        return "\n".join(lines)
+
+    def _build(self, schema, name):
+        start = time.perf_counter()
+        path = self._cache_path(schema) if self.cache_dir else None
+        entry = _load_entry(path) if path else None
+        if entry is None:
+            validator = _full_validator(schema)
+            try:
+                entry = schema_codegen.compile_fast_check(schema)
+            except schema_codegen.UnsupportedSchema:
+                entry = ()
+            if path:
+                _store_entry(path, entry)
+        else:
+            # The schema passed check_schema when its entry was written
+            validator = None
+        fast_check = schema_codegen.load_fast_check(*entry) if self.fast_path and entry else None
+        elapsed = time.perf_counter() - start
+        name = name or schema.get("title") or f"schema@{id(schema):x}"
+        return CompiledSchema(name, schema, validator, elapsed, fast_check)
+
+    def _cache_path(self, schema):
+        key = hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8"))
+        key.update(_codegen_fingerprint())
+        return os.path.join(self.cache_dir, f"{key.hexdigest()}.marshal")
+
+
+def _codegen_fingerprint():
+    """Identify the code generator and interpreter that cached code depends on."""
+    if _fingerprint[0] is None:
+        with open(schema_codegen.__file__, "rb") as source:
+            digest = hashlib.sha256(source.read())
+        digest.update(sys.implementation.cache_tag.encode("utf-8"))
+        _fingerprint[0] = digest.digest()
+    return _fingerprint[0]
+
+
+def _load_entry(path):
+    """Read a cached fast path.
+
+    Returns:
+        tuple or None: (code, constants, source), an empty tuple for a checked
+        schema without a fast path, or None when nothing usable is cached
+    """
+    try:
+        with open(path, "rb") as cache_file:
+            entry = marshal.load(cache_file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    return tuple(entry) if isinstance(entry, tuple) and len(entry) in (0, 3) else None
+
+
+def _store_entry(path, entry):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path), delete=False) as cache_file:
+            marshal.dump(tuple(entry), cache_file)
+        os.replace(cache_file.name, path)
+    except OSError:
+        # The cache only saves time; a read-only directory must not fail validation
+        pass
+
+
+default_registry = SchemaRegistry()
@@ -0,0 +1,289 @@
+"""Offline inverted index answering PoetryDB searches over captured poems.
+
+Text fields are lower-cased and split into word tokens; each token maps to
+its postings, one integer per occurrence packing the poem id, the line
+number (always 0 for title and author) and the token position within the
+line. A substring term is resolved through the tokens it must touch:
+
+* a term inside one word - every vocabulary token containing it, found
+  through a trigram index over the vocabulary
+* a term spanning words - a phrase match: its first word must end a token,
+  its last word start one, the words between match whole tokens, and all
+  of them must sit at consecutive positions of the same line
+
+Either way the result is a superset that is confirmed with
+utilities.poetrydb_query.matches, so answers follow PoetryDB semantics
+exactly (case-insensitive substring, ``:abs`` exact value, ``linecount``
+line count, AND across fields) while touching only candidate poems.
+
+    index = PoemIndex.from_file("tests/data/poems.json")
+    index.search(parse_search("title,author", "Winter;Shakespeare"))
+    index.answer("title,author/Winter;Shakespeare/title")
+"""
+import json
+import re
+from array import array
+from collections import defaultdict
+
+from utilities.poetrydb_query import (
+    NOT_FOUND,
+    matches,
+    parse_output,
+    parse_search,
+    parse_term,
+    project,
+)
+
+TEXT_FIELDS = ("title", "author", "lines")
+
+_WORD = re.compile(r"\w+")
+
+POSITION_BITS = 20
+LINE_BITS = 20
+_POSITION_MASK = (1 << POSITION_BITS) - 1
+_LINE_MASK = (1 << LINE_BITS) - 1
+
+
+def tokenize(text):
+    """Split text into lower-cased word tokens.
+
+    Args:
+        text (str): Title, author or line
+
+    Returns:
+        list: Tokens in order
+    """
+    return _WORD.findall(text.lower())
+
+
+def pack(poem_id, line, position):
+    """Pack one token occurrence into a single integer.
+
+    Args:
+        poem_id (int): Poem index in the corpus
+        line (int): Line number, 0 for title and author
+        position (int): Token position within the line
+
+    Returns:
+        int: Posting
+    """
+    return (poem_id << (LINE_BITS + POSITION_BITS)) | (line << POSITION_BITS) | position
+
+
+def unpack(posting):
+    """Inverse of pack.
+
+    Args:
+        posting (int): Packed posting
+
+    Returns:
+        tuple: (poem_id, line, position)
+    """
+    return (posting >> (LINE_BITS + POSITION_BITS),
+            (posting >> POSITION_BITS) & _LINE_MASK,
+            posting & _POSITION_MASK)
+
+
+def _trigrams(text):
+    return {text[start:start + 3] for start in range(len(text) - 2)}
+
+
+class FieldIndex:
+    """Token postings and vocabulary trigrams for one text field."""
+
+    def __init__(self):
+        self.postings = defaultdict(lambda: array("q"))
+        self.vocabulary_trigrams = defaultdict(set)
+
+    def add(self, poem_id, line, text):
+        for position, token in enumerate(tokenize(text)):
+            if position > _POSITION_MASK or line > _LINE_MASK:
+                raise ValueError(f"Poem {poem_id} line {line} is too long to index")
+            postings = self.postings[token]
+            if not postings:
+                for trigram in _trigrams(token):
+                    self.vocabulary_trigrams[trigram].add(token)
+            postings.append(pack(poem_id, line, position))
+
+    def tokens_containing(self, needle):
+        """Return the vocabulary tokens containing ``needle``.
+
+        Args:
+            needle (str): Lower-cased word fragment
+
+        Returns:
+            list: Matching tokens
+        """
+        if len(needle) < 3:
+            return [token for token in self.postings if needle in token]
+        index = self.vocabulary_trigrams
+        groups = sorted((index.get(trigram, set()) for trigram in _trigrams(needle)), key=len)
+        return [token for token in set.intersection(*groups) if needle in token]
+
+    def poem_ids(self, tokens):
+        shift = LINE_BITS + POSITION_BITS
+        return {posting >> shift for token in tokens for posting in self.postings.get(token, ())}
+
+    def phrase(self, words):
+        """Return the ids of poems where ``words`` occur as a phrase.
+
+        The first word may be the end of a token and the last the start of
+        one; the words between must be whole tokens.
+
+        Args:
+            words (list): Lower-cased words, at least two
+
+        Returns:
+            set: Candidate poem ids
+        """
+        first, *middle, last = words
+        following = set()
+        for token in self.tokens_containing(first):
+            if token.endswith(first):
+                following.update(posting + 1 for posting in self.postings[token])
+        for word in middle:
+            following = {posting + 1 for posting in self.postings.get(word, ()) if posting in following}
+            if not following:
+                return set()
+        shift = LINE_BITS + POSITION_BITS
+        return {
+            posting >> shift
+            for token in self.tokens_containing(last) if token.startswith(last)
+            for posting in self.postings[token] if posting in following
+        }
+
+
+class PoemIndex:
+    """Inverted index over a list of poems, answering PoetryDB queries."""
+
+    def __init__(self, poems):
+        """Index poems.
+
+        Args:
+            poems (iterable): Poems with title, author and lines
+        """
+        self.poems = []
+        self.fields = {field: FieldIndex() for field in TEXT_FIELDS}
+        self.exact = {field: defaultdict(list) for field in TEXT_FIELDS}
+        self.by_linecount = defaultdict(list)
+        for poem_id, poem in enumerate(poems):
+            poem = {
+                "title": poem["title"],
+                "author": poem["author"],
+                "lines": list(poem["lines"]),
+                "linecount": str(len(poem["lines"])),
+            }
+            self.poems.append(poem)
+            self.by_linecount[len(poem["lines"])].append(poem_id)
+            for field in ("title", "author"):
+                self.fields[field].add(poem_id, 0, poem[field])
+                self.exact[field][poem[field]].append(poem_id)
+            for line_number, line in enumerate(poem["lines"]):
+                self.fields["lines"].add(poem_id, line_number, line)
+            for line in dict.fromkeys(poem["lines"]):
+                self.exact["lines"][line].append(poem_id)
+
+    @classmethod
+    def from_file(cls, path):
+        """Index a JSON file holding an array of poems.
+
+        Args:
+            path (str): Poem dump, e.g. tests/data/poems.json
+
+        Returns:
+            PoemIndex: Index
+        """
+        with open(path, encoding="utf-8") as poems_file:
+            return cls(json.load(poems_file))
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        """Index the poems of a utilities.snapshot.Snapshot, author by author.
+
+        Args:
+            snapshot (Snapshot): Captured poems
+
+        Returns:
+            PoemIndex: Index
+        """
+        return cls(poem for author in snapshot.authors for poem in snapshot.poems_of(author))
+
+    def __len__(self):
+        return len(self.poems)
+
+    def positions(self, field, token):
+        """Return where a whole token occurs.
+
+        Args:
+            field (str): 'title', 'author' or 'lines'
+            token (str): Token, matched case-insensitively
+
+        Returns:
+            list: (poem_id, line, position) tuples
+        """
+        return [unpack(posting) for posting in self.fields[field].postings.get(token.lower(), ())]
+
+    def candidates(self, field, term):
+        """Return the ids of the poems matching one search criterion.
+
+        Args:
+            field (str): Input field
+            term (str): Search term, optionally ending in ':abs'
+
+        Returns:
+            set: Matching poem ids
+        """
+        text, absolute = parse_term(term)
+        if field == "linecount":
+            try:
+                return set(self.by_linecount.get(int(text), ()))
+            except ValueError:
+                return set()
+        if absolute:
+            return set(self.exact[field].get(text, ()))
+        words = tokenize(text)
+        field_index = self.fields[field]
+        if not words:
+            # Only spaces or punctuation: nothing to look up, check every poem
+            ids = range(len(self.poems))
+        elif len(words) == 1:
+            ids = field_index.poem_ids(field_index.tokens_containing(words[0]))
+        else:
+            ids = field_index.phrase(words)
+        return {poem_id for poem_id in ids if matches(self.poems[poem_id], field, term)}
+
+    def search(self, criteria):
+        """Return the poems matching all (field, term) criteria.
+
+        Args:
+            criteria (iterable): (field, term) tuples combined with AND
+
+        Returns:
+            list: Matching poems in corpus order
+        """
+        ids = None
+        # Title and author postings are short; narrow with them before lines
+        for field, term in sorted(criteria, key=lambda criterion: criterion[0] == "lines"):
+            found = self.candidates(field, term)
+            ids = found if ids is None else ids & found
+            if not ids:
+                return []
+        return [self.poems[poem_id] for poem_id in sorted(ids)]
+
+    def answer(self, path):
+        """Compute the JSON the API returns for a search path.
+
+        Args:
+            path (str): e.g. 'title,author/Winter;Shakespeare/title'
+
+        Returns:
+            list or dict: Projected poems, or the not-found status object
+
+        Raises:
+            QueryError: If the path is not a valid search
+        """
+        parts = path.strip("/").split("/")
+        criteria = parse_search(parts[0], parts[1])
+        fields, _ = parse_output(parts[2] if len(parts) > 2 else None)
+        poems = self.search(criteria)
+        return [project(poem, fields) for poem in poems] if poems else dict(NOT_FOUND)
@@ -0,0 +1,170 @@
+"""Single-flight deduplication of concurrent identical requests.
+
+While a call for a key is in flight, later callers asking for the same key
+wait for it and share its result (or exception) instead of issuing their
+own upstream request. Works for threads via ``do`` and for asyncio tasks
+via ``do_async``; one instance can be shared by sync and async clients,
+whose calls for the same key (the request URL) then coalesce with each other.
+"""
+import threading
+
+UNCOALESCED_ENDPOINTS = ("random",)
+
+
+class _Call:
+    """An in-flight call that waiting threads block on."""
+
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Merges concurrent identical calls into one execution."""
+
+    def __init__(self, coalesce_random=False):
+        """Initialize the group.
+
+        Args:
+            coalesce_random (bool, optional): Also merge calls to endpoints in
+                UNCOALESCED_ENDPOINTS; off by default because concurrent
+                /random callers expect independent samples
+        """
+        self.coalesce_random = coalesce_random
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self._in_flight = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def coalescible(self, endpoint):
+        """Check whether calls to an endpoint may be merged.
+
+        Args:
+            endpoint (str): Endpoint path relative to the base URL
+
+        Returns:
+            bool: True if concurrent identical calls may share one result
+        """
+        first_segment = endpoint.lstrip("/").split("/", 1)[0]
+        return self.coalesce_random or first_segment not in UNCOALESCED_ENDPOINTS
+
+    def do(self, key, function):
+        """Run ``function`` once for all threads concurrently asking for ``key``.
+
+        Args:
+            key (hashable): Identity of the call, e.g. the request URL
+            function (callable): Performs the call
+
+        Returns:
+            object: The result of the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, coroutine_function):
+        """Await ``coroutine_function()`` once for all tasks concurrently asking for ``key``.
+
+        Args:
+            key (hashable): Identity of the call
+            coroutine_function (callable): Returns the awaitable performing the call
+
+        Returns:
+            object: The result of the shared call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        # Only reachable from a running event loop, so asyncio is loaded by now
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            future = self._futures.get(loop_key)
+            call = self._in_flight.get(key) if future is None else None
+            leader = future is None and call is None
+            if leader:
+                future = self._futures[loop_key] = loop.create_future()
+                # Threads and other event loops asking for the key wait on this
+                call = self._in_flight[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if future is not None:
+                return await asyncio.shield(future)
+            # Led by a thread or another event loop: wait off this loop's thread
+            await loop.run_in_executor(None, call.event.wait)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = await coroutine_function()
+        except asyncio.CancelledError as exc:
+            call.error = exc
+            future.cancel()
+            raise
+        except BaseException as exc:
+            call.error = exc
+            future.set_exception(exc)
+            # Mark the exception retrieved in case no other task was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(call.result)
+            return call.result
+        finally:
+            with self._lock:
+                del self._futures[loop_key]
+                del self._in_flight[key]
+            call.event.set()
+
+    def stats(self):
+        """Return the coalescing counters.
+
+        Returns:
+            dict: Calls made, upstream executions, coalesced calls and calls in flight
+        """
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                # Async leaders are registered in both tables
+                "in_flight": len(self._in_flight),
+            }
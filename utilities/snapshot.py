@@ -0,0 +1,313 @@
+"""Corpus snapshots and diffs for detecting upstream data drift.
+
+A snapshot stores every captured poem once, under the SHA-256 of its
+canonical JSON, and per author the ordered list of those hashes plus two
+digests:
+
+* ``fingerprint`` - hash of the cheap ``author/{name}:abs/title,linecount``
+  probe; when it matches the previous snapshot the author's poems are
+  reused instead of fetched again
+* ``digest`` - hash of the author's poem hashes, so a diff skips authors
+  whose digests match without looking at their poems
+
+A fingerprint only covers titles and linecounts, so a line edited in
+place is missed by incremental capture; pass ``verify=True`` (or capture
+without a previous snapshot) to refetch everything.
+
+    python -m utilities.snapshot capture today.json --previous yesterday.json
+    python -m utilities.snapshot diff yesterday.json today.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from utilities.api_client import PoetryDBClient
+
+VERSION = 1
+
+
+def content_hash(data):
+    """Hash JSON-serializable data by its canonical encoding.
+
+    Args:
+        data (object): Poem or other JSON data
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def _poem_list(response):
+    response.raise_for_status()
+    data = response.json()
+    # PoetryDB reports a miss as a status object in a 200 response
+    return data if isinstance(data, list) else []
+
+
+def _keyed(hashes, poems):
+    """Map (title, occurrence) to poem hash, telling apart repeated titles."""
+    keyed = {}
+    seen = {}
+    for poem_hash in hashes:
+        title = poems[poem_hash]["title"]
+        occurrence = seen.get(title, 0)
+        seen[title] = occurrence + 1
+        keyed[(title, occurrence)] = poem_hash
+    return keyed
+
+
+class Snapshot:
+    """Content-addressed capture of the poems of a set of authors."""
+
+    def __init__(self, authors=None, poems=None, meta=None):
+        """Initialize a snapshot.
+
+        Args:
+            authors (dict, optional): Author name mapped to
+                ``{"fingerprint": str, "digest": str, "poems": [hash, ...]}``
+            poems (dict, optional): Poem hash mapped to poem
+            meta (dict, optional): Capture details such as the base URL and counters
+        """
+        self.authors = authors or {}
+        self.poems = poems or {}
+        self.meta = meta or {}
+
+    def __len__(self):
+        return sum(len(entry["poems"]) for entry in self.authors.values())
+
+    def poems_of(self, author):
+        """Return the poems of an author in API order.
+
+        Args:
+            author (str): Author name
+
+        Returns:
+            list: Poems, empty if the author was not captured
+        """
+        entry = self.authors.get(author)
+        return [self.poems[poem_hash] for poem_hash in entry["poems"]] if entry else []
+
+    def to_dict(self):
+        return {"version": VERSION, "meta": self.meta, "authors": self.authors, "poems": self.poems}
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != VERSION:
+            raise ValueError(f"Unsupported snapshot version: {data.get('version')}")
+        return cls(data["authors"], data["poems"], data.get("meta"))
+
+    def save(self, path):
+        """Write the snapshot as JSON, atomically.
+
+        Args:
+            path (str): Destination file
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(descriptor, "w", encoding="utf-8") as temp_file:
+            json.dump(self.to_dict(), temp_file, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a snapshot written by save.
+
+        Args:
+            path (str): Snapshot file
+
+        Returns:
+            Snapshot: Loaded snapshot
+        """
+        with open(path, encoding="utf-8") as snapshot_file:
+            return cls.from_dict(json.load(snapshot_file))
+
+
+def capture(client, authors=None, previous=None, verify=False, max_workers=8):
+    """Capture the poems of some or all authors.
+
+    Args:
+        client (PoetryDBClient): Client to capture through
+        authors (iterable, optional): Authors to capture; all authors if None
+        previous (Snapshot, optional): Earlier snapshot whose poems are reused
+            for authors with an unchanged fingerprint
+        verify (bool, optional): Refetch every author even if its fingerprint matches
+        max_workers (int, optional): Authors captured concurrently
+
+    Returns:
+        Snapshot: New snapshot; ``meta`` counts fetched and reused authors
+
+    Raises:
+        requests.HTTPError: If an upstream request fails
+    """
+    if authors is None:
+        response = client.list_authors()
+        response.raise_for_status()
+        authors = response.json()["authors"]
+    previous_authors = previous.authors if previous is not None else {}
+
+    def capture_author(author):
+        fingerprint = content_hash(_poem_list(client.get_by_author(f"{author}:abs", "title,linecount")))
+        old = previous_authors.get(author)
+        if not verify and old is not None and old["fingerprint"] == fingerprint:
+            return author, fingerprint, [(poem_hash, previous.poems[poem_hash]) for poem_hash in old["poems"]], False
+        poems = _poem_list(client.get_by_author(f"{author}:abs"))
+        return author, fingerprint, [(content_hash(poem), poem) for poem in poems], True
+
+    snapshot = Snapshot(meta={
+        "base_url": client.base_url,
+        "captured_at": time.time(),
+        "fetched": 0,
+        "reused": 0,
+    })
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for author, fingerprint, poems, fetched in pool.map(capture_author, dict.fromkeys(authors)):
+            hashes = [poem_hash for poem_hash, _ in poems]
+            snapshot.authors[author] = {
+                "fingerprint": fingerprint,
+                "digest": content_hash(hashes),
+                "poems": hashes,
+            }
+            snapshot.poems.update(poems)
+            snapshot.meta["fetched" if fetched else "reused"] += 1
+    return snapshot
+
+
+PoemChange = namedtuple("PoemChange", ["author", "title", "old", "new"])
+
+
+class SnapshotDiff:
+    """Differences between two snapshots, keyed by (author, title)."""
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.changed = []
+        self.authors_compared = 0
+        self.authors_skipped = 0
+
+    @property
+    def linecount_changes(self):
+        """list: Changed poems whose linecount differs."""
+        return [
+            change for change in self.changed
+            if change.old.get("linecount") != change.new.get("linecount")
+        ]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def to_dict(self):
+        def brief(poem):
+            return {"title": poem.get("title"), "author": poem.get("author"), "linecount": poem.get("linecount")}
+
+        return {
+            "added": [brief(poem) for poem in self.added],
+            "removed": [brief(poem) for poem in self.removed],
+            "changed": [
+                {"author": change.author, "title": change.title,
+                 "linecount": [change.old.get("linecount"), change.new.get("linecount")]}
+                for change in self.changed
+            ],
+            "authors_compared": self.authors_compared,
+            "authors_skipped": self.authors_skipped,
+        }
+
+    def format(self):
+        """Render a one line per difference summary.
+
+        Returns:
+            str: Report text
+        """
+        lines = [
+            f"{len(self.added)} added, {len(self.removed)} removed, {len(self.changed)} changed "
+            f"({len(self.linecount_changes)} linecount) across {self.authors_compared} authors "
+            f"({self.authors_skipped} unchanged)"
+        ]
+        lines += [f"+ {poem['author']}: {poem['title']}" for poem in self.added]
+        lines += [f"- {poem['author']}: {poem['title']}" for poem in self.removed]
+        for change in self.changed:
+            detail = ""
+            if change.old.get("linecount") != change.new.get("linecount"):
+                detail = f" (linecount {change.old.get('linecount')} -> {change.new.get('linecount')})"
+            lines.append(f"~ {change.author}: {change.title}{detail}")
+        return "\n".join(lines)
+
+
+def diff_snapshots(old, new):
+    """Compare two snapshots.
+
+    Authors with equal digests are skipped; for the rest poems are matched
+    through (title, occurrence) -> hash indexes, so the cost is linear in
+    the number of poems of changed authors.
+
+    Args:
+        old (Snapshot): Earlier snapshot
+        new (Snapshot): Later snapshot
+
+    Returns:
+        SnapshotDiff: Added, removed and changed poems
+    """
+    diff = SnapshotDiff()
+    for author in dict.fromkeys(list(old.authors) + list(new.authors)):
+        diff.authors_compared += 1
+        old_entry = old.authors.get(author, {"digest": None, "poems": []})
+        new_entry = new.authors.get(author, {"digest": None, "poems": []})
+        if old_entry["digest"] == new_entry["digest"]:
+            diff.authors_skipped += 1
+            continue
+        old_keyed = _keyed(old_entry["poems"], old.poems)
+        new_keyed = _keyed(new_entry["poems"], new.poems)
+        for key, poem_hash in new_keyed.items():
+            old_hash = old_keyed.get(key)
+            if old_hash is None:
+                diff.added.append(new.poems[poem_hash])
+            elif old_hash != poem_hash:
+                diff.changed.append(PoemChange(author, key[0], old.poems[old_hash], new.poems[poem_hash]))
+        diff.removed.extend(old.poems[poem_hash] for key, poem_hash in old_keyed.items() if key not in new_keyed)
+    return diff
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture and diff PoetryDB corpus snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    capture_command = commands.add_parser("capture", help="Capture a snapshot")
+    capture_command.add_argument("output", help="Snapshot file to write")
+    capture_command.add_argument("--base-url", help="API to capture (default: public PoetryDB)")
+    capture_command.add_argument("--previous", help="Earlier snapshot to reuse unchanged authors from")
+    capture_command.add_argument("--author", action="append", dest="authors",
+                                 help="Capture only this author, may be repeated")
+    capture_command.add_argument("--verify", action="store_true", help="Refetch unchanged authors too")
+    capture_command.add_argument("--workers", type=int, default=8)
+
+    diff_command = commands.add_parser("diff", help="Diff two snapshots")
+    diff_command.add_argument("old")
+    diff_command.add_argument("new")
+    diff_command.add_argument("--json", action="store_true", help="Print the diff as JSON")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        diff = diff_snapshots(Snapshot.load(args.old), Snapshot.load(args.new))
+        print(json.dumps(diff.to_dict(), indent=2) if args.json else diff.format())
+        return 1 if diff else 0
+
+    previous = Snapshot.load(args.previous) if args.previous else None
+    with PoetryDBClient(args.base_url) as client:
+        snapshot = capture(client, args.authors, previous, args.verify, args.workers)
+    snapshot.save(args.output)
+    print(f"Captured {len(snapshot)} poems by {len(snapshot.authors)} authors "
+          f"({snapshot.meta['fetched']} fetched, {snapshot.meta['reused']} reused)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
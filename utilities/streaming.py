@@ -0,0 +1,230 @@
+import codecs
+import json
+
+from utilities.poetrydb_query import POEM_FIELDS, parse_output
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_DELIMITERS = _WHITESPACE + ",]"
+
+
+def iter_json_array(chunks):
+    """Incrementally parse a JSON array, yielding its elements as they complete.
+
+    Only the text of the element currently being parsed is buffered, so
+    memory stays bounded by the largest element rather than the whole
+    document.
+
+    Args:
+        chunks (iterable): Byte chunks of a UTF-8 encoded JSON document
+
+    Yields:
+        object: Each decoded element of the top-level array
+
+    Raises:
+        ValueError: If the document is not a JSON array or is malformed
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    state = "start"
+    # Length of pending text needed before retrying a failed element parse,
+    # so a large element split over many chunks is not re-parsed per chunk
+    retry_at = 0
+
+    chunks = iter(chunks)
+    final = False
+    while not final:
+        chunk = next(chunks, None)
+        if chunk is None:
+            final = True
+            buffer += text_decoder.decode(b"", final=True)
+        else:
+            buffer += text_decoder.decode(chunk)
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == len(buffer) or state == "done":
+                break
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError(f"Expected a JSON array, got {buffer[pos:pos + 80]!r}")
+                pos += 1
+                state = "first"
+            elif state in ("first", "value"):
+                if state == "first" and char == "]":
+                    pos += 1
+                    state = "done"
+                    continue
+                if not final and len(buffer) - pos < retry_at:
+                    break
+                try:
+                    element, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    if final:
+                        raise ValueError(f"Malformed JSON array element at {buffer[pos:pos + 80]!r}") from None
+                    retry_at = 2 * (len(buffer) - pos)
+                    break
+                if not final and (end == len(buffer) or buffer[end] not in _DELIMITERS):
+                    # A number cut at a chunk boundary (e.g. "-6" of "-6.5")
+                    # parses early; wait until a delimiter follows it
+                    retry_at = len(buffer) - pos + 1
+                    break
+                retry_at = 0
+                pos = end
+                state = "separator"
+                yield element
+            elif state == "separator":
+                if char == ",":
+                    state = "value"
+                elif char == "]":
+                    state = "done"
+                else:
+                    raise ValueError(f"Expected ',' or ']' in JSON array, got {char!r}")
+                pos += 1
+
+        if state == "done" and pos < len(buffer):
+            raise ValueError(f"Unexpected data after JSON array: {buffer[pos:pos + 80]!r}")
+        buffer = buffer[pos:]
+        pos = 0
+
+    if state != "done":
+        raise ValueError("Truncated JSON array")
+
+
+def iter_poems(response, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the poems of a streamed PoetryDB response one at a time.
+
+    Args:
+        response (requests.Response): Response requested with ``stream=True``
+        chunk_size (int, optional): Bytes to read from the socket at a time
+
+    Yields:
+        dict: Each poem of the response array
+    """
+    try:
+        yield from iter_json_array(response.iter_content(chunk_size=chunk_size))
+    finally:
+        response.close()
+
+
+def iter_lines(chunks):
+    """Split a stream of UTF-8 byte chunks into text lines.
+
+    Only the current partial line is buffered.
+
+    Args:
+        chunks (iterable): Byte chunks
+
+    Yields:
+        str: Each line without its line ending
+    """
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in chunks:
+        pending += text_decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line[:-1] if line.endswith("\r") else line
+    pending += text_decoder.decode(b"", final=True)
+    if pending:
+        yield pending[:-1] if pending.endswith("\r") else pending
+
+
+def parse_text_poems(lines, fields=None):
+    """Parse PoetryDB ``.text`` output into the poems the JSON output would hold.
+
+    The format writes each field name on its own line followed by its value;
+    ``lines`` is followed by one line per poem line and ends at the next
+    ``linecount`` header or at the header starting the next poem. A poem
+    line that is itself exactly such a field name is therefore read as a
+    header; the format offers no way to tell them apart.
+
+    Args:
+        lines (iterable): Text lines without line endings
+        fields (str or iterable, optional): Requested output, e.g. 'title,author'
+            or 'title.text'; inferred from the first poem if omitted
+
+    Yields:
+        dict: Each poem, with values as strings like the JSON output
+
+    Raises:
+        ValueError: If the text does not follow the format
+    """
+    if isinstance(fields, str):
+        fields = parse_output(fields)[0]
+    elif fields is not None:
+        fields = tuple(field for field in POEM_FIELDS if field in fields)
+    first_field = fields[0] if fields else None
+
+    poem = None
+    last_index = -1
+    pending = None
+    in_lines = False
+    number = 0
+    for number, line in enumerate(lines, 1):
+        if pending is not None:
+            poem[pending] = line
+            pending = None
+            continue
+        if in_lines:
+            ends_lines = line == first_field or (
+                line == "linecount" and (fields is None or "linecount" in fields)
+            )
+            if not ends_lines:
+                poem["lines"].append(line)
+                continue
+            in_lines = False
+        if line not in POEM_FIELDS or (fields is not None and line not in fields):
+            raise ValueError(f"Line {number}: expected a field name, got {line[:80]!r}")
+        index = POEM_FIELDS.index(line)
+        if poem is None or line == first_field:
+            if poem is not None:
+                fields = _finish_text_poem(poem, fields, number)
+                yield poem
+            poem = {}
+            first_field = line
+        elif index <= last_index:
+            raise ValueError(f"Line {number}: field {line!r} out of order")
+        last_index = index
+        if line == "lines":
+            poem["lines"] = []
+            in_lines = True
+        else:
+            pending = line
+    if pending is not None:
+        raise ValueError(f"Line {number}: truncated, no value for {pending!r}")
+    if poem is not None:
+        _finish_text_poem(poem, fields, number)
+        yield poem
+
+
+def _finish_text_poem(poem, fields, number):
+    """Check a parsed poem has every field; returns the fields later poems need."""
+    if fields is None:
+        return tuple(field for field in POEM_FIELDS if field in poem)
+    missing = [field for field in fields if field not in poem]
+    if missing:
+        raise ValueError(f"Line {number}: poem is missing {', '.join(missing)}")
+    return fields
+
+
+def iter_text_poems(response, fields=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the poems of a streamed ``.text`` PoetryDB response one at a time.
+
+    Args:
+        response (requests.Response): Response requested with ``stream=True``
+        fields (str or iterable, optional): Requested output, e.g. 'title.text'
+        chunk_size (int, optional): Bytes to read from the socket at a time
+
+    Yields:
+        dict: Each poem, as the JSON output would hold it
+    """
+    try:
+        yield from parse_text_poems(iter_lines(response.iter_content(chunk_size=chunk_size)), fields)
+    finally:
+        response.close()
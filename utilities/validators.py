@@ -1,16 +1,84 @@
-import jsonschema
+import io
+from collections.abc import Iterator
+from itertools import islice
+
+from utilities.instrumentation import default_instrumentation
+from utilities.schema_registry import default_registry
+from utilities.streaming import parse_text_poems
 
 def validate_response_schema(response_data, schema):
     """Validate API response against a JSON schema.
     
+    The schema is compiled once by the default schema registry and the
+    cached validator is reused, stopping at the first error. An iterator of
+    items (e.g. from utilities.streaming.iter_poems) is consumed and each
+    item is checked against the array schema's ``items`` as it arrives.
+    Eager validations are reported to ``default_instrumentation``.
+    
     Args:
-        response_data (dict or list): Response data to validate
+        response_data (dict, list or iterator): Response data to validate
         schema (dict): JSON schema to validate against
         
     Raises:
         jsonschema.exceptions.ValidationError: If validation fails
     """
-    jsonschema.validate(instance=response_data, schema=schema)
+    if isinstance(response_data, Iterator):
+        for _ in iter_validated(response_data, schema):
+            pass
+    elif default_instrumentation.hooks:
+        with default_instrumentation.validating(default_registry.compile(schema).name):
+            default_registry.validate(response_data, schema)
+    else:
+        default_registry.validate(response_data, schema)
+
+def iter_validated(items, schema=None, check_linecount=False):
+    """Validate a stream of items one at a time, passing each one through.
+    
+    Lets a single pass over a streamed response validate, count and inspect
+    poems while only holding one poem in memory.
+    
+    Args:
+        items (iterable): Items of an array response, e.g. streamed poems
+        schema (dict, optional): Array schema (its ``items`` are used) or item schema
+        check_linecount (bool, optional): Also check each poem with validate_poem_linecount
+        
+    Yields:
+        dict: Each item once it has passed validation
+        
+    Raises:
+        jsonschema.exceptions.ValidationError: If an item fails the schema
+        ValueError: If a poem's linecount does not match its lines
+    """
+    item_schema = None
+    if schema is not None:
+        item_schema = schema["items"] if schema.get("type") == "array" else schema
+        compiled = default_registry.compile(item_schema)
+    for index, item in enumerate(items):
+        if item_schema is not None:
+            error = compiled.first_error(item)
+            if error is not None:
+                error.relative_path.appendleft(index)
+                raise error
+        if check_linecount and not validate_poem_linecount(item):
+            raise ValueError(f"Poem {index} linecount does not match its lines: {item.get('title')!r}")
+        yield item
+
+def collect_schema_errors(response_data, schema):
+    """Collect every schema violation in an API response.
+    
+    Args:
+        response_data (dict or list): Response data to validate
+        schema (dict): JSON schema to validate against
+        
+    Returns:
+        list: jsonschema.exceptions.ValidationError objects, empty if valid
+    """
+    if not default_instrumentation.hooks:
+        return default_registry.collect_errors(response_data, schema)
+    with default_instrumentation.validating(default_registry.compile(schema).name) as event:
+        errors = default_registry.collect_errors(response_data, schema)
+        event.ok = not errors
+    return errors
 
 def validate_poem_title(poem, expected_title):
     """Validate that a poem has the expected title.
@@ -48,7 +116,8 @@ def validate_poem_linecount(poem):
     if 'lines' not in poem or 'linecount' not in poem:
         return False
     
-    actual_count = len(poem['lines'])
+    lines = poem['lines']
+    actual_count = len(lines) if hasattr(lines, '__len__') else sum(1 for _ in lines)
     reported_count = int(poem['linecount']) if isinstance(poem['linecount'], str) else poem['linecount']
     
     return actual_count == reported_count
@@ -56,9 +125,13 @@ def validate_poem_linecount(poem):
 def validate_text_format(response_text, field_name):
     """Validate that a text format response has the expected structure.
     
+    The text is parsed line by line with utilities.streaming.parse_text_poems,
+    so every field header must be followed by its value and fields must
+    appear in PoetryDB order.
+    
     Args:
         response_text (str): Response text to validate
-        field_name (str): Field name that should be present in each section
+        field_name (str): Field name that should be present in each poem
         
     Returns:
         bool: True if the text format is valid, False otherwise
@@ -66,27 +139,30 @@ def validate_text_format(response_text, field_name):
     if not response_text:
         return False
     
-    lines = response_text.strip().split('\n')
-    
-    # Text format should have at least one field entry
-    if not lines:
+    lines = (line.rstrip("\r\n") for line in io.StringIO(response_text))
+    found = False
+    try:
+        for poem in parse_text_poems(lines):
+            if field_name not in poem:
+                return False
+            found = True
+    except ValueError:
         return False
     
-    # Each section should start with the field name
-    for i in range(0, len(lines), 2):
-        if i < len(lines) and not lines[i].startswith(field_name):
-            return False
-    
-    return True
+    return found
 
 def validate_response_count(response_data, expected_count):
     """Validate that a response contains the expected number of items.
     
+    An iterator is consumed only up to one item past ``expected_count``.
+    
     Args:
-        response_data (list): Response data
+        response_data (list or iterator): Response data
         expected_count (int): Expected number of items
         
     Returns:
         bool: True if the count matches, False otherwise
     """
+    if isinstance(response_data, Iterator):
+        return sum(1 for _ in islice(response_data, expected_count + 1)) == expected_count
     return len(response_data) == expected_count 
\ No newline at end of file